@@ -0,0 +1,151 @@
+import os
+import hashlib
+import marshal
+import threading
+
+from pack_store import PackStore
+from generator_version import generator_version
+
+
+# Default on-disk location of the build cache, relative to the project root.
+# CI jobs can point SSG_CACHE_DIR at a directory they restore and save.
+DEFAULT_CACHE_DIR = os.environ.get("SSG_CACHE_DIR", ".ssg-cache")
+
+
+class BlockCache:
+    """
+    Content-addressed cache of rendered block HTML, persisted across builds.
+
+    Entries are keyed by a hash of the generator version (which covers the
+    generator's own source files), the block type and the block text, so an
+    unchanged block is a lookup instead of a parse and render. Besides HTML
+    the cache holds each block's node tree (as document_cache's tuples),
+    under separate keys, so a document tree can be rebuilt from unchanged
+    blocks too. Entries live in a single PackStore at
+    <cache_dir>/blocks.pack. Safe to share between threads.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, store=None, version=None):
+        """
+        Args:
+            cache_dir (str): Root directory of the build cache
+            store (PackStore, optional): Store to use instead of the default
+            version (str, optional): Generator version (default: generator_version())
+        """
+        self.version = version if version is not None else generator_version()
+        self.store = store if store is not None else PackStore(os.path.join(cache_dir, "blocks"))
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()  # guards the counters; the store locks itself
+
+    def key(self, block_type, lines):
+        """
+        Compute the cache key of a parsed block.
+
+        Args:
+            block_type (BlockType): The type of the block
+            lines (list[str]): The lines of the block
+
+        Returns:
+            str: Hex digest identifying the block's rendered HTML
+        """
+        return self._key(b"html", block_type, lines)
+
+    def node_key(self, block_type, lines):
+        """
+        Args:
+            block_type (BlockType): The type of the block
+            lines (list[str]): The lines of the block
+
+        Returns:
+            str: Hex digest identifying the block's node tree
+        """
+        return self._key(b"node", block_type, lines)
+
+    def get(self, key):
+        """
+        Look up rendered HTML, counting a hit or a miss.
+
+        Args:
+            key (str): Key from key()
+
+        Returns:
+            str or None: The cached HTML, or None if the block is not cached
+        """
+        data = self.store.get(key)
+        with self._lock:
+            if data is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return data.decode('utf-8')
+
+    def put(self, key, html):
+        """
+        Store rendered HTML for a block.
+
+        Args:
+            key (str): Key from key()
+            html (str): Rendered HTML of the block
+        """
+        self.store.put(key, html.encode('utf-8'))
+
+    def get_node(self, key):
+        """
+        Look up a block's node tree, counting a hit or a miss.
+
+        Args:
+            key (str): Key from node_key()
+
+        Returns:
+            tuple or None: The tree as node_to_tuple() made it, or None if
+                the block is not cached (or the entry is unreadable)
+        """
+        data = self.store.get(key)
+        tree = None
+        if data is not None:
+            try:
+                tree = marshal.loads(data)
+            except (EOFError, ValueError, TypeError):
+                pass
+        with self._lock:
+            if tree is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return tree
+
+    def put_node(self, key, tree):
+        """
+        Store a block's node tree.
+
+        Args:
+            key (str): Key from node_key()
+            tree (tuple): The block's tree, from node_to_tuple()
+        """
+        self.store.put(key, marshal.dumps(tree))
+
+    def close(self):
+        """
+        Flush the cache index to disk.
+        """
+        self.store.close()
+
+    def hit_rate(self):
+        """
+        Returns:
+            float: Fraction of lookups that were hits (0.0 when there were none)
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def _key(self, kind, block_type, lines):
+        digest = hashlib.sha256()
+        digest.update(self.version.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(kind)
+        digest.update(b'\0')
+        digest.update(block_type.value.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update('\n'.join(lines).encode('utf-8'))
+        return digest.hexdigest()
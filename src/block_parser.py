@@ -0,0 +1,184 @@
+from block_type import BlockType, heading_level
+
+
+def parse_blocks(markdown):
+    """
+    Split and classify a markdown document in a single line-oriented pass.
+
+    This is the fused replacement for calling markdown_to_blocks() and then
+    block_to_block_type() on every block: each line is visited once, the block
+    type is decided incrementally as lines arrive, and the already-split lines
+    are handed to the converters so nothing has to split the block again.
+
+    Args:
+        markdown (str): Raw markdown text representing a full document
+
+    Returns:
+        list[tuple[BlockType, list[str]]]: (block_type, lines) for every block
+
+    Example:
+        >>> parse_blocks("# Title\\n\\n- a\\n- b")
+        [(BlockType.HEADING, ['# Title']), (BlockType.UNORDERED_LIST, ['- a', '- b'])]
+    """
+    return list(iter_parsed_blocks(markdown.split('\n')))
+
+
+def iter_blocks(fileobj):
+    """
+    Stream (block_type, lines) pairs from an open markdown file.
+
+    The file is read line by line, so memory use is proportional to the
+    largest block rather than to the whole document.
+
+    Args:
+        fileobj (file): A text-mode file object (or any iterable of lines)
+
+    Yields:
+        tuple[BlockType, list[str]]: The type and stripped lines of each block
+    """
+    return iter_parsed_blocks(_strip_newlines(fileobj))
+
+
+def _strip_newlines(fileobj):
+    for line in fileobj:
+        if line.endswith('\n'):
+            line = line[:-1]
+        yield line
+
+
+def iter_parsed_blocks(lines):
+    """
+    Generate (block_type, lines) pairs from an iterable of markdown lines.
+
+    Lines must not contain their trailing newline. Blocks are separated by
+    empty lines, exactly like markdown_to_blocks(), with one exception: a
+    fenced code block (a block whose first line starts with ```, unless that
+    line also closes it, as inline code like ```x``` does) keeps blank
+    lines until a line ending with ``` closes the fence. If the fence is never
+    closed, the buffered lines are split on blank lines as before, so invalid
+    documents render exactly like the multi-pass path.
+
+    Args:
+        lines (iterable[str]): Lines of a markdown document
+
+    Yields:
+        tuple[BlockType, list[str]]: The type and stripped lines of each block
+    """
+    builder = _BlockBuilder()
+    fence_lines = None  # Raw lines of an open ``` fence, None when not in one
+
+    for line in lines:
+        if fence_lines is not None:
+            fence_lines.append(line)
+            if line.rstrip().endswith('```'):
+                # Fence closed - the whole fence belongs to the current block
+                for fence_line in fence_lines:
+                    builder.add(fence_line)
+                fence_lines = None
+            continue
+
+        if line == "":
+            # Blank line ends the current block
+            if builder.lines:
+                yield builder.finish()
+                builder = _BlockBuilder()
+            continue
+
+        if not builder.lines and _opens_fence(line):
+            # First line of the block opens a fence
+            fence_lines = [line]
+            continue
+
+        builder.add(line)
+
+    if fence_lines is not None:
+        # Unclosed fence: fall back to plain blank-line splitting
+        for line in fence_lines:
+            if line == "":
+                if builder.lines:
+                    yield builder.finish()
+                    builder = _BlockBuilder()
+            else:
+                builder.add(line)
+
+    if builder.lines:
+        yield builder.finish()
+
+
+def _opens_fence(line):
+    # A line like ```x``` is inline code that closes itself, not an opening fence
+    stripped = line.strip()
+    return stripped.startswith('```') and not (len(stripped) > 3 and stripped.endswith('```'))
+
+
+class _BlockBuilder:
+    """
+    Accumulates the lines of one block and classifies it as they arrive.
+
+    Leading and trailing whitespace of the block is trimmed the same way
+    str.strip() trims it in markdown_to_blocks(). Every line except the last is
+    folded into the quote / list flags as soon as the next line arrives; the
+    last line is only checked in finish(), once its trailing whitespace is gone.
+    """
+
+    def __init__(self):
+        self.lines = []
+        self._pending_blank = []  # Whitespace-only lines that may be trailing
+        self._is_quote = True
+        self._is_unordered = True
+        self._is_ordered = True
+
+    def add(self, line):
+        if not line.strip():
+            # Leading whitespace-only lines are dropped, inner ones are kept
+            if self.lines:
+                self._pending_blank.append(line)
+            return
+
+        if not self.lines:
+            line = line.lstrip()
+        for blank in self._pending_blank:
+            self._append(blank)
+        self._pending_blank = []
+        self._append(line)
+
+    def finish(self):
+        """
+        Trim the last line and return the classified block.
+
+        Returns:
+            tuple[BlockType, list[str]]: The block type and its lines
+        """
+        lines = self.lines
+        lines[-1] = lines[-1].rstrip()
+        self._fold(len(lines) - 1)
+
+        if heading_level(lines[0]):
+            block_type = BlockType.HEADING
+        elif len(lines) >= 2 and lines[0].startswith('```') and lines[-1].endswith('```'):
+            block_type = BlockType.CODE
+        elif self._is_quote:
+            block_type = BlockType.QUOTE
+        elif self._is_unordered:
+            block_type = BlockType.UNORDERED_LIST
+        elif self._is_ordered:
+            block_type = BlockType.ORDERED_LIST
+        else:
+            block_type = BlockType.PARAGRAPH
+
+        return block_type, lines
+
+    def _append(self, line):
+        if self.lines:
+            # The previous line is no longer last, so its text is final
+            self._fold(len(self.lines) - 1)
+        self.lines.append(line)
+
+    def _fold(self, index):
+        line = self.lines[index]
+        if self._is_quote and not line.startswith('>'):
+            self._is_quote = False
+        if self._is_unordered and not line.startswith('- '):
+            self._is_unordered = False
+        if self._is_ordered and not line.startswith(f"{index + 1}. "):
+            self._is_ordered = False
@@ -33,18 +33,8 @@ def block_to_block_type(block):
     lines = block.split('\n')
     
     # Check for heading (1-6 # characters followed by space)
-    if lines[0].startswith('#'):
-        # Count consecutive # characters at the start
-        hash_count = 0
-        for char in lines[0]:
-            if char == '#':
-                hash_count += 1
-            else:
-                break
-        
-        # Must be 1-6 # characters followed by a space
-        if 1 <= hash_count <= 6 and len(lines[0]) > hash_count and lines[0][hash_count] == ' ':
-            return BlockType.HEADING
+    if heading_level(lines[0]):
+        return BlockType.HEADING
     
     # Check for code block (starts and ends with ```)
     if len(lines) >= 2 and lines[0].startswith('```') and lines[-1].endswith('```'):
@@ -66,6 +56,30 @@ def block_to_block_type(block):
     return BlockType.PARAGRAPH
 
 
+def heading_level(line):
+    """
+    Return the heading level of a line, or 0 if it is not a heading.
+    
+    Args:
+        line (str): First line of a block
+        
+    Returns:
+        int: 1-6 for a valid heading ("# " through "###### "), otherwise 0
+    """
+    # Count consecutive # characters at the start
+    hash_count = 0
+    for char in line:
+        if char == '#':
+            hash_count += 1
+        else:
+            break
+    
+    # Must be 1-6 # characters followed by a space
+    if 1 <= hash_count <= 6 and len(line) > hash_count and line[hash_count] == ' ':
+        return hash_count
+    return 0
+
+
 def _is_ordered_list(lines):
     """
     Helper function to check if lines form a valid ordered list.
@@ -0,0 +1,184 @@
+import os
+import json
+import time
+import argparse
+
+from pack_store import PackStore
+from block_cache import DEFAULT_CACHE_DIR
+
+
+# Names of the PackStores that make up the build cache
+CACHE_STORES = ("blocks", "documents")
+
+# Default size limit enforced at the end of every build
+DEFAULT_MAX_CACHE_BYTES = 512 * 1024 * 1024
+
+# Number of builds kept in the hit-rate history
+HISTORY_LENGTH = 20
+
+HISTORY_FILE = "history.json"
+
+
+def collect_garbage(cache_dir, max_bytes):
+    """
+    Evict least recently used entries until the cache fits in max_bytes.
+
+    Entries from every store compete in one LRU order, so a large store
+    doesn't keep stale entries just because another store is small.
+
+    Args:
+        cache_dir (str): Root directory of the build cache
+        max_bytes (int): Size limit for all cached values together
+
+    Returns:
+        tuple[int, int]: (entries evicted, bytes freed)
+    """
+    stores = _open_existing_stores(cache_dir)
+    try:
+        candidates = []
+        total = 0
+        for name, store in stores.items():
+            for key, size, last_used in store.entries():
+                candidates.append((last_used, name, key, size))
+                total += size
+
+        if total <= max_bytes:
+            return 0, 0
+
+        evicted = {name: set() for name in stores}
+        freed = 0
+        # Oldest first; ties broken by store and key so eviction is deterministic
+        for last_used, name, key, size in sorted(candidates):
+            if total - freed <= max_bytes:
+                break
+            evicted[name].add(key)
+            freed += size
+
+        for name, store in stores.items():
+            if evicted[name]:
+                dropped = evicted[name]
+                store.compact(keep=lambda key: key not in dropped)
+        return sum(len(keys) for keys in evicted.values()), freed
+    finally:
+        for store in stores.values():
+            store.close()
+
+
+def cache_stats(cache_dir, oldest=5):
+    """
+    Summarize the contents of the build cache.
+
+    Args:
+        cache_dir (str): Root directory of the build cache
+        oldest (int): Number of least recently used entries to list
+
+    Returns:
+        dict: entries, live_bytes, file_bytes, per-store counts, recent hit
+            rate and the oldest entries as (last_used, store, key, size)
+    """
+    stores = _open_existing_stores(cache_dir)
+    try:
+        all_entries = []
+        per_store = {}
+        file_bytes = 0
+        for name, store in stores.items():
+            entries = store.entries()
+            per_store[name] = (len(entries), sum(size for _, size, _ in entries))
+            file_bytes += store.file_bytes()
+            all_entries.extend((last_used, name, key, size) for key, size, last_used in entries)
+    finally:
+        for store in stores.values():
+            store.close()
+
+    history = load_history(cache_dir)
+    hits = sum(build["hits"] for build in history)
+    lookups = hits + sum(build["misses"] for build in history)
+
+    return {
+        "entries": len(all_entries),
+        "live_bytes": sum(entry[3] for entry in all_entries),
+        "file_bytes": file_bytes,
+        "stores": per_store,
+        "builds": len(history),
+        "hit_rate": hits / lookups if lookups else 0.0,
+        "oldest": sorted(all_entries)[:oldest],
+    }
+
+
+def record_build(cache_dir, hits, misses):
+    """
+    Append one build's cache hits and misses to the history file.
+
+    Args:
+        cache_dir (str): Root directory of the build cache
+        hits (int): Cache hits during the build
+        misses (int): Cache misses during the build
+    """
+    history = load_history(cache_dir)
+    history.append({"time": int(time.time()), "hits": hits, "misses": misses})
+    history = history[-HISTORY_LENGTH:]
+
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, HISTORY_FILE)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(history, f)
+    os.replace(temp_path, path)
+
+
+def load_history(cache_dir):
+    """
+    Args:
+        cache_dir (str): Root directory of the build cache
+
+    Returns:
+        list[dict]: Recent builds, oldest first, each with time, hits and misses
+    """
+    try:
+        with open(os.path.join(cache_dir, HISTORY_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return []
+
+
+def cache_main(argv):
+    """
+    Entry point for `main.py cache stats|gc`.
+
+    Args:
+        argv (list[str]): Arguments after the `cache` command
+    """
+    parser = argparse.ArgumentParser(prog="main.py cache", description="Inspect or shrink the build cache.")
+    parser.add_argument("action", choices=["stats", "gc"])
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, metavar="PATH")
+    parser.add_argument("--max-mb", type=int, default=DEFAULT_MAX_CACHE_BYTES // (1024 * 1024), metavar="MB",
+                        help="Size limit for `gc` (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    if args.action == "gc":
+        evicted, freed = collect_garbage(args.cache_dir, args.max_mb * 1024 * 1024)
+        print(f"🧹 Evicted {evicted} entries, freed {freed} bytes from {args.cache_dir}")
+        return
+
+    stats = cache_stats(args.cache_dir)
+    print(f"🗄️  Build cache: {args.cache_dir}")
+    print(f"   Entries: {stats['entries']}")
+    print(f"   Bytes: {stats['live_bytes']} live, {stats['file_bytes']} on disk")
+    for name, (count, size) in stats["stores"].items():
+        print(f"   📦 {name}: {count} entries, {size} bytes")
+    print(f"   Hit rate over last {stats['builds']} builds: {stats['hit_rate']:.0%}")
+    if stats["oldest"]:
+        print(f"   Oldest entries:")
+        now = time.time()
+        for last_used, name, key, size in stats["oldest"]:
+            age_days = (now - last_used) / 86400
+            print(f"      {name}/{key[:16]} {size} bytes, last used {age_days:.1f} days ago")
+
+
+def _open_existing_stores(cache_dir):
+    stores = {}
+    for name in CACHE_STORES:
+        path = os.path.join(cache_dir, name)
+        if os.path.exists(path + ".pack"):
+            stores[name] = PackStore(path)
+    return stores
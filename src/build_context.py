@@ -0,0 +1,46 @@
+from output_writer import OutputWriter
+
+
+class BuildContext:
+    """
+    Options and shared state for one site build.
+
+    Created once in main() and passed down through generate_pages_recursive()
+    to generate_page(), so build features such as caches and worker pools
+    don't each need their own parameter on every function in between.
+    """
+
+    def __init__(self, block_workers=None, block_cache=None, inline_cache=None,
+                 document_cache=None, file_index=None, incremental=False, version=None,
+                 shard=None, render_times=None, cache_dir=None, log=None, journal=None,
+                 output_writer=None):
+        """
+        Args:
+            block_workers (int, optional): Worker processes for very large pages
+            block_cache (BlockCache, optional): Persistent cache of rendered blocks
+            inline_cache (InlineCache, optional): LRU cache of inline parses
+            document_cache (DocumentCache, optional): Cache of parsed documents
+            file_index (FileIndex, optional): Source hashes and output records
+            incremental (bool): Keep existing outputs and skip up-to-date ones
+            version (str, optional): Generator version, part of every output key
+            shard (Shard, optional): Build only this shard's pages
+            render_times (RenderTimes, optional): Per-page render times for scheduling
+            cache_dir (str, optional): Build cache location, for worker processes
+            log (callable, optional): Receives each progress message (default: print)
+            journal (BuildJournal, optional): Log of completed pages, for --resume
+            output_writer (OutputWriter, optional): Puts outputs in place, skipping
+                unchanged ones (default: a writer for this context alone)
+        """
+        self.block_workers = block_workers
+        self.block_cache = block_cache
+        self.inline_cache = inline_cache
+        self.document_cache = document_cache
+        self.file_index = file_index
+        self.incremental = incremental
+        self.version = version
+        self.shard = shard
+        self.render_times = render_times
+        self.cache_dir = cache_dir
+        self.log = log if log is not None else print
+        self.journal = journal
+        self.output_writer = output_writer if output_writer is not None else OutputWriter()
@@ -0,0 +1,176 @@
+import os
+import time
+import posixpath
+import tarfile
+import zipfile
+
+from discovery import SourceFile, discover_pages
+
+
+# Archive name suffixes a content source can read; tar compression is detected from the stream
+TAR_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz")
+ZIP_SUFFIXES = (".zip",)
+
+
+class FilesystemSource:
+    """
+    Markdown pages in a directory tree (the default content source).
+
+    Every content source has the same two methods: check() before a build
+    and pages(), which yields a SourceFile per page with rel_dest already
+    mapped to the .html output. Pages read from a file have data None;
+    sources without files (archives) yield each page's bytes as data, and
+    source is then only a name for it in logs and render times.
+    """
+
+    def __init__(self, root):
+        """
+        Args:
+            root (str): Directory containing markdown content files
+        """
+        self.root = root
+
+    def check(self):
+        """
+        Returns:
+            str or None: Why the content can't be read, or None if it can
+        """
+        if not os.path.exists(self.root):
+            return f"Content directory does not exist: {self.root}"
+        if not os.path.isdir(self.root):
+            return f"Content path is not a directory: {self.root}"
+        return None
+
+    def pages(self):
+        """
+        Yields:
+            SourceFile: One record per .md file, as discover_pages() finds them
+        """
+        return discover_pages(self.root)
+
+
+class TarSource:
+    """
+    Markdown pages read straight from a tar archive, compressed or not.
+
+    The archive is read as a stream in member order, never extracted: each
+    .md member is read into memory when it is reached and yielded, so a
+    serial build renders it before the next member is read. Member paths
+    are kept as the pages' paths relative to the content root.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): Archive, e.g. "export.tar.gz"
+        """
+        self.path = path
+
+    def check(self):
+        """See FilesystemSource.check()"""
+        return _check_archive(self.path)
+
+    def pages(self):
+        """
+        Yields:
+            SourceFile: One record per .md member, with its contents as data
+
+        Raises:
+            tarfile.TarError: If the archive is corrupt
+        """
+        with tarfile.open(self.path, "r|*") as archive:
+            for member in archive:
+                if not member.isfile():
+                    continue
+                rel_path = _member_path(member.name)
+                if rel_path is None or not rel_path.endswith('.md'):
+                    continue
+                data = archive.extractfile(member).read()
+                yield _archive_page(self.path, rel_path, member.mtime, data)
+
+
+class ZipSource:
+    """
+    Markdown pages read straight from a zip archive.
+
+    Members are read one at a time in archive order and never extracted;
+    see TarSource.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): Archive, e.g. "export.zip"
+        """
+        self.path = path
+
+    def check(self):
+        """See FilesystemSource.check()"""
+        return _check_archive(self.path)
+
+    def pages(self):
+        """
+        Yields:
+            SourceFile: One record per .md member, with its contents as data
+
+        Raises:
+            zipfile.BadZipFile: If the archive is corrupt
+        """
+        with zipfile.ZipFile(self.path) as archive:
+            for info in archive.infolist():
+                if info.is_dir():
+                    continue
+                rel_path = _member_path(info.filename)
+                if rel_path is None or not rel_path.endswith('.md'):
+                    continue
+                data = archive.read(info)
+                yield _archive_page(self.path, rel_path, time.mktime(info.date_time + (0, 0, -1)), data)
+
+
+def is_content_archive(path):
+    """
+    Args:
+        path (str): Content path
+
+    Returns:
+        bool: True if the path names an archive a content source can read
+    """
+    return path.endswith(TAR_SUFFIXES + ZIP_SUFFIXES)
+
+
+def open_content_source(path):
+    """
+    Pick the content source for a path by its name.
+
+    Args:
+        path (str): A content directory, or a .tar, .tar.gz, .tgz, .tar.bz2,
+            .tar.xz or .zip archive of markdown files
+
+    Returns:
+        FilesystemSource, TarSource or ZipSource
+    """
+    if path.endswith(ZIP_SUFFIXES):
+        return ZipSource(path)
+    if path.endswith(TAR_SUFFIXES):
+        return TarSource(path)
+    return FilesystemSource(path)
+
+
+def _check_archive(path):
+    if not os.path.isfile(path):
+        return f"Content archive does not exist: {path}"
+    return None
+
+
+def _member_path(name):
+    # Member name as a relative path; None (with a warning) if it would leave the content root
+    rel_path = posixpath.normpath(name)
+    if rel_path.startswith("/") or rel_path == ".." or rel_path.startswith("../"):
+        print(f"⚠️  Skipping archive member outside the content root: {name}")
+        return None
+    return rel_path.replace("/", os.sep)
+
+
+def _archive_page(archive_path, rel_path, mtime, data):
+    return SourceFile(os.path.join(archive_path, rel_path), rel_path[:-3] + '.html',
+                      len(data), mtime, None, data)
@@ -1,8 +1,12 @@
 import os
 import shutil
+import hashlib
 
+from discovery import discover
+from output_writer import OutputWriter
 
-def copy_files_recursive(source_dir_path, dest_dir_path):
+
+def copy_files_recursive(source_dir_path, dest_dir_path, context=None, clean=True):
     """
     Recursively copy all files and directories from source to destination.
     
@@ -12,21 +16,30 @@ def copy_files_recursive(source_dir_path, dest_dir_path):
     3. Copies all files and subdirectories recursively
     4. Logs each operation for debugging
     
+    In an incremental build (context.incremental) the destination is kept
+    and files whose source is unchanged since the last copy are skipped.
+    
     Args:
         source_dir_path (str): Path to the source directory
         dest_dir_path (str): Path to the destination directory
+        context (BuildContext, optional): Build options and the file index
+        clean (bool): Remove the destination first; pass False when the
+            caller has prepared it and other files are being written there
     """
     print(f"🚀 Starting copy operation: {source_dir_path} → {dest_dir_path}")
     
+    incremental = context is not None and context.file_index is not None and context.incremental
+    
     # Step 1: Clean the destination directory
-    if os.path.exists(dest_dir_path):
+    if clean and os.path.exists(dest_dir_path) and not incremental:
         print(f"🧹 Cleaning existing destination: {dest_dir_path}")
         shutil.rmtree(dest_dir_path)
         print(f"✅ Removed existing directory: {dest_dir_path}")
     
     # Step 2: Create the destination directory
     print(f"📁 Creating destination directory: {dest_dir_path}")
-    os.makedirs(dest_dir_path, exist_ok=True)
+    writer = context.output_writer if context is not None else OutputWriter()
+    writer.ensure_dir(dest_dir_path)
     
     # Step 3: Check if source directory exists
     if not os.path.exists(source_dir_path):
@@ -35,64 +48,86 @@ def copy_files_recursive(source_dir_path, dest_dir_path):
     
     # Step 4: Start the recursive copying
     print(f"📋 Scanning source directory: {source_dir_path}")
-    copy_directory_contents(source_dir_path, dest_dir_path)
+    copy_directory_contents(source_dir_path, dest_dir_path, context)
     
     print(f"🎉 Copy operation completed successfully!")
 
 
-def copy_directory_contents(source_dir, dest_dir):
+def copy_directory_contents(source_dir, dest_dir, context=None):
     """
-    Helper function to recursively copy directory contents.
+    Copy directory contents into an existing destination directory.
     
-    This is where the actual recursion happens. For each item in the source:
-    - If it's a file: copy it directly
-    - If it's a directory: create it in destination and recurse into it
+    Walks the source with discover(), which yields each subdirectory before
+    its contents, so every directory (including empty ones) exists before
+    the files inside it are copied. Files are copied by the context's
+    output writer, on its background thread if it has one; a file the file
+    index has to hash is hashed from the writer's mapping of it, so it is
+    read once.
     
     Args:
         source_dir (str): Source directory path
         dest_dir (str): Destination directory path
+        context (BuildContext, optional): Build options and the file index
     """
-    # Get all items in the source directory
-    try:
-        items = os.listdir(source_dir)
-        print(f"📂 Processing directory: {source_dir} (found {len(items)} items)")
-    except PermissionError:
-        print(f"❌ Permission denied accessing: {source_dir}")
-        return
-    except FileNotFoundError:
-        print(f"❌ Directory not found: {source_dir}")
-        return
+    file_index = context.file_index if context is not None else None
+    incremental = file_index is not None and context.incremental
+    writer = context.output_writer if context is not None else OutputWriter()
+    skipped = 0
+    queued = []
+    digests = {}  # dest path -> digest computed by the writer, for files the index had to hash
     
-    # Process each item in the directory
-    for item in items:
-        source_item_path = os.path.join(source_dir, item)
-        dest_item_path = os.path.join(dest_dir, item)
+    for item in discover(source_dir, include_dirs=True):
+        dest_item_path = os.path.join(dest_dir, item.rel_dest)
         
-        if os.path.isfile(source_item_path):
-            # It's a file - copy it
-            print(f"📄 Copying file: {source_item_path} → {dest_item_path}")
+        if item.size is None:
+            # It's a directory - create it
+            print(f"📁 Creating subdirectory: {dest_item_path}")
             try:
-                shutil.copy2(source_item_path, dest_item_path)
-                print(f"✅ File copied successfully: {item}")
+                writer.ensure_dir(dest_item_path)
             except Exception as e:
-                print(f"❌ Error copying file {item}: {e}")
-                
-        elif os.path.isdir(source_item_path):
-            # It's a directory - create it and recurse
-            print(f"📁 Creating subdirectory: {dest_item_path}")
+                print(f"❌ Error creating directory {item.rel_dest}: {e}")
+        else:
+            # It's a file - copy it unless the previous copy is still current
             try:
-                os.makedirs(dest_item_path, exist_ok=True)
-                print(f"✅ Directory created: {item}")
-                
-                # RECURSION: Process the subdirectory
-                print(f"🔄 Recursing into: {source_item_path}")
-                copy_directory_contents(source_item_path, dest_item_path)
-                
+                key = file_index.cached_digest(item.source, item.stat) if file_index is not None else None
+                if incremental and key is not None and file_index.output_is_current(dest_item_path, key):
+                    skipped += 1
+                    continue
+                on_source = None
+                if file_index is not None and key is None:
+                    on_source = _digest_recorder(file_index, item, dest_item_path, digests)
+                writer.submit(dest_item_path, source=item.source, on_source=on_source)
+                queued.append((item, dest_item_path, key))
             except Exception as e:
-                print(f"❌ Error creating directory {item}: {e}")
+                print(f"❌ Error copying file {item.rel_dest}: {e}")
+    
+    # The writer may still be copying; collect each outcome before recording it
+    for item, dest_item_path, key in queued:
+        try:
+            written = writer.take(dest_item_path).result()
+        except Exception as e:
+            print(f"❌ Error copying file {item.rel_dest}: {e}")
+            continue
+        if key is None:
+            key = digests.get(dest_item_path)
+        if key is not None and writer.on_disk:
+            file_index.record_output(dest_item_path, key)
+        if written:
+            print(f"✅ File copied: {item.source} → {dest_item_path}")
         else:
-            # It's neither a file nor directory (symlink, etc.)
-            print(f"⚠️  Skipping special item: {item}")
+            skipped += 1
+    
+    if incremental or skipped:
+        print(f"⏭️  Unchanged static files skipped: {skipped}")
+
+
+def _digest_recorder(file_index, item, dest_path, digests):
+    # Hashes a file from the mapping the writer copies it from (on the writer's thread)
+    def record(data):
+        digest = hashlib.sha256(data).hexdigest()
+        file_index.record(item.source, item.stat, digest)
+        digests[dest_path] = digest
+    return record
 
 
 # Convenience function for the main script
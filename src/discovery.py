@@ -0,0 +1,98 @@
+import os
+from collections import namedtuple
+
+
+# One discovered file: source path (under the root as given), destination
+# path relative to the output root, size in bytes, mtime and the full
+# os.stat_result for consumers that need more (e.g. the file index).
+# Directory records (include_dirs=True) have size None. Pages read from an
+# archive (see content_source) have no stat and carry their bytes as data.
+SourceFile = namedtuple("SourceFile", ["source", "rel_dest", "size", "mtime", "stat", "data"],
+                        defaults=(None,))
+
+
+def discover(root, rename=None, include_dirs=False):
+    """
+    Walk a directory tree with os.scandir and yield one record per file.
+
+    The walk uses an explicit stack instead of recursion and yields records
+    as soon as each directory is scanned, so callers can start working on
+    the first pages before the rest of the tree has been read. File types
+    come from the directory entries themselves, so there is no separate
+    isfile/isdir stat per item. Entries are visited in name order.
+
+    Args:
+        root (str): Directory to walk
+        rename (callable, optional): Maps a file's relative path to its
+            relative destination, or None to skip the file (default: keep it)
+        include_dirs (bool): Also yield a record for each subdirectory,
+            before any of its contents
+
+    Yields:
+        SourceFile: (source, rel_dest, size, mtime, stat) for each file found
+    """
+    try:
+        root_stat = os.stat(root)
+        visited = {(root_stat.st_dev, root_stat.st_ino)}
+    except OSError:
+        visited = set()
+    stack = [(root, "")]
+    while stack:
+        directory, rel_dir = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except PermissionError:
+            print(f"❌ Permission denied accessing: {directory}")
+            continue
+        except OSError as e:
+            print(f"❌ Error accessing directory {directory}: {e}")
+            continue
+
+        subdirectories = []
+        for entry in entries:
+            rel_path = os.path.join(rel_dir, entry.name)
+            try:
+                if entry.is_file():
+                    dest = rename(rel_path) if rename is not None else rel_path
+                    if dest is None:
+                        continue
+                    stat = entry.stat()
+                    yield SourceFile(entry.path, dest, stat.st_size, stat.st_mtime, stat)
+                elif entry.is_dir():
+                    stat = entry.stat()
+                    # Symlinked directories are followed, but only once
+                    identity = (stat.st_dev, stat.st_ino)
+                    if identity in visited:
+                        continue
+                    visited.add(identity)
+                    if include_dirs:
+                        yield SourceFile(entry.path, rel_path, None, stat.st_mtime, stat)
+                    subdirectories.append((entry.path, rel_path))
+                else:
+                    print(f"⚠️  Skipping special item: {entry.path}")
+            except OSError as e:
+                # Broken symlinks and files removed mid-walk
+                print(f"⚠️  Skipping unreadable item {entry.path}: {e}")
+
+        # Reversed so the stack pops subdirectories in name order
+        stack.extend(reversed(subdirectories))
+
+
+def discover_pages(content_dir):
+    """
+    Yield the markdown pages under a content directory.
+
+    Args:
+        content_dir (str): Root directory containing markdown content files
+
+    Yields:
+        SourceFile: One record per .md file, with rel_dest ending in .html
+    """
+    return discover(content_dir, rename=_markdown_to_html_path)
+
+
+def _markdown_to_html_path(rel_path):
+    if not rel_path.endswith('.md'):
+        return None
+    return rel_path[:-3] + '.html'
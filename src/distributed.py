@@ -0,0 +1,493 @@
+import os
+import json
+import math
+import time
+import socket
+import argparse
+import threading
+import socketserver
+import multiprocessing
+from collections import deque, Counter
+
+from generate_page import render_page
+from generate_pages_recursive import PagePlan
+from output_writer import OutputWriter
+from page_scheduler import lpt_order, report_schedule
+
+
+# Largest batch handed to one worker; batches shrink as the queue drains
+MAX_BATCH = 32
+
+# How long an idle worker waits before asking again while only in-flight
+# pages are left
+WAIT_SECONDS = 0.05
+
+# Copies of one page that may be in flight at once: the original plus one
+# speculative re-issue to an idle worker
+MAX_COPIES = 2
+
+# How long a worker keeps retrying to reach a coordinator that isn't up yet
+CONNECT_TIMEOUT = 10.0
+
+# How often a coordinator with local worker processes checks they are alive
+LIVENESS_SECONDS = 0.5
+
+
+def parse_address(spec):
+    """
+    Args:
+        spec (str): "host:port" (port 0 picks a free port) or "unix:/path"
+
+    Returns:
+        tuple: (socket family, address for bind/connect)
+
+    Raises:
+        ValueError: If spec is neither form
+    """
+    if spec.startswith("unix:"):
+        return socket.AF_UNIX, spec[len("unix:"):]
+    host, sep, port = spec.rpartition(":")
+    if not sep or not port.isdigit():
+        raise ValueError(f"Invalid address '{spec}': expected host:port or unix:/path")
+    return socket.AF_INET, (host or "127.0.0.1", int(port))
+
+
+class _Page:
+    """Coordinator-side state of one page."""
+
+    def __init__(self, source, dest):
+        self.source = source
+        self.dest = dest
+        self.copies = 0          # issues currently in flight
+        self.holders = set()     # connections holding one of them
+        self.issued_at = None    # time of the first issue
+        self.done = False
+
+
+class Coordinator:
+    """
+    Hand out pages to render over a socket and write back the results.
+
+    Workers connect, receive the template and basepath, then repeatedly ask
+    for a batch of pages (markdown included, so they need no shared
+    filesystem) and send back the rendered HTML. Batches are sized from the
+    remaining queue, so they shrink towards the end of the build. Once the
+    queue is empty, idle workers are given copies of pages still in flight
+    elsewhere; whichever copy finishes first is written and later ones are
+    discarded, so one slow worker can't hold up the whole build. Pages held
+    by a worker that disconnects go back to the front of the queue.
+
+    The protocol is one JSON object per line:
+        worker: {"type": "hello", "worker": name}
+        coordinator: {"type": "config", "template": ..., "basepath": ...}
+        worker: {"type": "request"}
+        coordinator: {"type": "batch", "pages": [{"id", "markdown"}]},
+            {"type": "wait", "seconds": s} or {"type": "done"}
+        worker: {"type": "results", "pages": [{"id", "html" and "seconds", or "error"}]}
+    """
+
+    def __init__(self, pages, template_content, basepath="/", address="127.0.0.1:0", output_writer=None):
+        """
+        Args:
+            pages (list[tuple[str, str]]): (markdown source, destination) pairs
+            template_content (str): HTML template sent to every worker
+            basepath (str): Base URL path for the site
+            address (str): Where to listen, "host:port" or "unix:/path"
+            output_writer (OutputWriter, optional): Writes the returned pages
+        """
+        self.template_content = template_content
+        self.output_writer = output_writer if output_writer is not None else OutputWriter()
+        self.basepath = basepath
+        self._pages = {str(i): _Page(source, dest) for i, (source, dest) in enumerate(pages)}
+        self._pending = deque(self._pages)
+        self._in_flight = set()  # ids issued and not done, candidates for speculation
+        self._lock = threading.Lock()
+        self._finished = threading.Event()
+        self._connections = 0
+        self._next_connection = 0
+
+        self.completed = []      # destinations written
+        self.durations = {}      # destination -> render seconds reported by the worker
+        self.failed = {}         # destination -> error message
+        self.speculative = 0
+        self.duplicates = 0
+        self.per_worker = Counter()
+        if not self._pages:
+            self._finished.set()
+
+        family, bind_address = parse_address(address)
+        server_class = _UnixServer if family == socket.AF_UNIX else _TCPServer
+        self._server = server_class(bind_address, _WorkerHandler)
+        self._server.coordinator = self
+
+    @property
+    def address(self):
+        """
+        Returns:
+            str: The address workers should connect to
+        """
+        if self._server.address_family == socket.AF_UNIX:
+            return f"unix:{self._server.server_address}"
+        host, port = self._server.server_address[:2]
+        return f"{host}:{port}"
+
+    def start(self):
+        """
+        Start accepting workers in a background thread.
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def wait(self, timeout=None):
+        """
+        Wait until every page is rendered or failed, then stop listening.
+
+        Args:
+            timeout (float, optional): Give up after this many seconds
+
+        Returns:
+            bool: True if every page finished
+        """
+        try:
+            return self._finished.wait(timeout)
+        finally:
+            self._server.shutdown()
+            self._server.server_close()
+            if self._server.address_family == socket.AF_UNIX and os.path.exists(self._server.server_address):
+                os.remove(self._server.server_address)
+
+    def serve(self, timeout=None, local_processes=()):
+        """
+        Serve workers until every page is rendered or failed.
+
+        With local worker processes, checks every LIVENESS_SECONDS that the
+        build can still finish: once no worker is connected and every local
+        process has exited (crashed, killed for memory), the pages left are
+        failed rather than waited for forever.
+
+        Args:
+            timeout (float, optional): Give up after this many seconds
+            local_processes (list[multiprocessing.Process]): Workers started
+                for this coordinator on this machine
+
+        Returns:
+            bool: True if every page finished (rendered or failed)
+        """
+        self.start()
+        if not local_processes:
+            return self.wait(timeout)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._finished.wait(LIVENESS_SECONDS):
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            with self._lock:
+                connected = self._connections > 0
+            if not connected and not any(process.is_alive() for process in local_processes):
+                codes = ", ".join(str(process.exitcode) for process in local_processes)
+                self.abandon(f"No worker left to render it: every local worker exited (exit codes {codes})")
+        return self.wait(0)
+
+    def abandon(self, error):
+        """
+        Fail every page that isn't done yet, finishing the build.
+
+        Results that arrive later are discarded as duplicates.
+
+        Args:
+            error (str): Reported for each abandoned page
+        """
+        with self._lock:
+            for page_id, page in self._pages.items():
+                if not page.done:
+                    page.done = True
+                    self._in_flight.discard(page_id)
+                    self.failed[page.dest] = error
+            self._pending.clear()
+            self._finished.set()
+
+    # Called from connection handler threads ---------------------------------
+
+    def _connect(self):
+        with self._lock:
+            self._connections += 1
+            self._next_connection += 1
+            return self._next_connection
+
+    def _disconnect(self, connection, held):
+        with self._lock:
+            self._connections -= 1
+            for page_id in held:
+                page = self._pages[page_id]
+                page.copies -= 1
+                page.holders.discard(connection)
+                if not page.done and page.copies == 0:
+                    # Nobody else is on it: put it back first in line
+                    self._in_flight.discard(page_id)
+                    self._pending.appendleft(page_id)
+
+    def _next_batch(self, connection, held):
+        with self._lock:
+            if self._finished.is_set():
+                return {"type": "done"}
+
+            batch = []
+            if self._pending:
+                size = math.ceil(len(self._pending) / (2 * max(1, self._connections)))
+                while self._pending and len(batch) < min(MAX_BATCH, size):
+                    page_id = self._pending.popleft()
+                    if not self._pages[page_id].done:
+                        batch.append(page_id)
+            if not batch:
+                page_id = self._pick_speculative(connection)
+                if page_id is None:
+                    return {"type": "wait", "seconds": WAIT_SECONDS}
+                self.speculative += 1
+                batch.append(page_id)
+
+            now = time.monotonic()
+            for page_id in batch:
+                page = self._pages[page_id]
+                page.copies += 1
+                page.holders.add(connection)
+                if page.issued_at is None:
+                    page.issued_at = now
+                self._in_flight.add(page_id)
+                held.add(page_id)
+
+        pages = []
+        for page_id in batch:
+            try:
+                with open(self._pages[page_id].source, 'r', encoding='utf-8') as f:
+                    pages.append({"id": page_id, "markdown": f.read()})
+            except (OSError, ValueError) as e:
+                held.discard(page_id)
+                self._finish(page_id, connection, None, None, f"Error reading markdown: {e}")
+        return {"type": "batch", "pages": pages}
+
+    def _pick_speculative(self, connection):
+        # The longest-running page that this connection isn't already working on
+        candidates = []
+        for page_id in self._in_flight:
+            page = self._pages[page_id]
+            if page.copies < MAX_COPIES and connection not in page.holders:
+                candidates.append((page.copies, page.issued_at, page_id))
+        return min(candidates)[2] if candidates else None
+
+    def _finish(self, page_id, connection, worker, html, error, seconds=None):
+        with self._lock:
+            page = self._pages[page_id]
+            if connection in page.holders:
+                page.copies -= 1
+                page.holders.discard(connection)
+            if page.done:
+                self.duplicates += 1
+                return
+            page.done = True
+            self._in_flight.discard(page_id)
+
+        if error is None:
+            try:
+                _write_page(page.dest, html, self.output_writer)
+            except OSError as e:
+                error = f"Error writing {page.dest}: {e}"
+
+        with self._lock:
+            if error is None:
+                self.completed.append(page.dest)
+                self.per_worker[worker] += 1
+                if seconds is not None:
+                    self.durations[page.dest] = seconds
+            else:
+                self.failed[page.dest] = error
+            if len(self.completed) + len(self.failed) == len(self._pages):
+                self._finished.set()
+
+
+class _WorkerHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        coordinator = self.server.coordinator
+        connection = coordinator._connect()
+        held = set()
+        worker = None
+        try:
+            for line in self.rfile:
+                message = json.loads(line)
+                if message["type"] == "hello":
+                    worker = message.get("worker") or f"connection-{connection}"
+                    self._send({"type": "config", "template": coordinator.template_content,
+                                "basepath": coordinator.basepath})
+                elif message["type"] == "request":
+                    self._send(coordinator._next_batch(connection, held))
+                elif message["type"] == "results":
+                    for result in message["pages"]:
+                        held.discard(result["id"])
+                        coordinator._finish(result["id"], connection, worker, result.get("html"),
+                                            result.get("error"), result.get("seconds"))
+        except (OSError, ValueError, KeyError):
+            # A broken or misbehaving worker is treated as disconnected
+            pass
+        finally:
+            coordinator._disconnect(connection, held)
+
+    def _send(self, message):
+        self.wfile.write((json.dumps(message) + "\n").encode('utf-8'))
+
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+    block_on_close = False
+
+
+class _UnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+    block_on_close = False
+
+
+def run_worker(address, name=None, context=None, connect_timeout=CONNECT_TIMEOUT):
+    """
+    Render pages for a coordinator until it has no more work.
+
+    Args:
+        address (str): Coordinator address, "host:port" or "unix:/path"
+        name (str, optional): Worker name shown in the coordinator's stats
+        context (BuildContext, optional): Caches to render with
+        connect_timeout (float): Keep retrying the connection this long
+
+    Returns:
+        int: Number of pages this worker rendered
+    """
+    family, connect_address = parse_address(address)
+    name = name or f"{socket.gethostname()}-{os.getpid()}"
+    sock = _connect(family, connect_address, connect_timeout)
+    rendered = 0
+    with sock, sock.makefile('r', encoding='utf-8', newline='\n') as reader:
+        def send(message):
+            sock.sendall((json.dumps(message) + "\n").encode('utf-8'))
+
+        send({"type": "hello", "worker": name})
+        config = json.loads(reader.readline())
+        while True:
+            send({"type": "request"})
+            line = reader.readline()
+            if not line:
+                break
+            message = json.loads(line)
+            if message["type"] == "done":
+                break
+            if message["type"] == "wait":
+                time.sleep(message["seconds"])
+                continue
+
+            results = []
+            for page in message["pages"]:
+                started = time.perf_counter()
+                try:
+                    html = render_page(page["markdown"], config["template"], config["basepath"], context)
+                    results.append({"id": page["id"], "html": html,
+                                    "seconds": time.perf_counter() - started})
+                except Exception as e:
+                    results.append({"id": page["id"], "error": str(e)})
+            send({"type": "results", "pages": results})
+            rendered += len(results)
+    return rendered
+
+
+def _connect(family, address, timeout):
+    deadline = time.monotonic() + timeout
+    while True:
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        try:
+            sock.connect(address)
+            return sock
+        except OSError:
+            sock.close()
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.1)
+
+
+def generate_pages_distributed(dir_path_content, template_path, dest_dir_path, basepath="/",
+                               context=None, address="127.0.0.1:0", local_workers=0):
+    """
+    Generate all pages through a coordinator and any number of workers.
+
+    Workers on other machines join with `main.py worker ADDRESS`; local
+    worker processes can be started as well. Pages skipped by an
+    incremental build or belonging to another shard are never sent out,
+    and the rest are queued longest expected render time first.
+
+    Args:
+        dir_path_content (str): Root directory containing markdown content files
+        template_path (str): Path to the HTML template file
+        dest_dir_path (str): Root directory where HTML files will be generated
+        basepath (str): Base URL path for the site (default: "/")
+        context (BuildContext, optional): Build options and shared caches
+        address (str): Where the coordinator listens
+        local_workers (int): Worker processes to start on this machine
+
+    Returns:
+        bool: True if every page was generated
+    """
+    with open(template_path, 'r', encoding='utf-8') as f:
+        template_content = f.read()
+
+    plan = PagePlan(dir_path_content, template_path, dest_dir_path, basepath, context)
+    discovered = list(plan)
+    scheduled = lpt_order(discovered, plan.render_times)
+    jobs = {job.dest: job for job in scheduled}
+
+    coordinator = Coordinator([(job.source, job.dest) for job in scheduled], template_content, basepath, address,
+                              output_writer=context.output_writer if context is not None else None)
+    print(f"🛰️  Coordinator listening on {coordinator.address}: {len(scheduled)} pages to render, longest first")
+    processes = [
+        multiprocessing.Process(target=run_worker, args=(coordinator.address, f"local-{i + 1}"))
+        for i in range(local_workers)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        coordinator.serve(local_processes=processes)
+    finally:
+        for process in processes:
+            process.join()
+
+    for dest_file_path in coordinator.completed:
+        plan.finished(jobs[dest_file_path], coordinator.durations.get(dest_file_path))
+    for dest_file_path, error in coordinator.failed.items():
+        print(f"   ❌ Error generating {dest_file_path}: {error}")
+        plan.finished(jobs[dest_file_path], error=error)
+
+    print(f"📊 Distributed generation: {len(coordinator.completed)} pages, {len(coordinator.failed)} failed, "
+          f"{coordinator.speculative} speculative re-issues, {coordinator.duplicates} duplicate results")
+    for worker, count in sorted(coordinator.per_worker.items()):
+        print(f"   🛠️  {worker}: {count} pages")
+    if coordinator.durations:
+        report_schedule(discovered, scheduled, coordinator.durations, max(1, len(coordinator.per_worker)))
+    plan.close()
+    return not coordinator.failed
+
+
+def worker_main(argv):
+    """
+    Entry point for `main.py worker ADDRESS`.
+
+    Args:
+        argv (list[str]): Arguments after the `worker` command
+    """
+    parser = argparse.ArgumentParser(prog="main.py worker",
+                                     description="Render pages for a distributed build coordinator.")
+    parser.add_argument("address", help="Coordinator address, host:port or unix:/path")
+    parser.add_argument("--name", help="Worker name shown in the coordinator's summary")
+    args = parser.parse_args(argv)
+
+    print(f"🛠️  Worker connecting to {args.address}")
+    rendered = run_worker(args.address, args.name)
+    print(f"✅ Worker finished: {rendered} pages rendered")
+
+
+def _write_page(dest_path, html, output_writer):
+    output_writer.ensure_dir(os.path.dirname(dest_path))
+    output_writer.write(dest_path, html.encode('utf-8'))
+
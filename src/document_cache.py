@@ -0,0 +1,222 @@
+import os
+import hashlib
+import marshal
+import threading
+
+from leafnode import LeafNode
+from parentnode import ParentNode
+from markdown_to_html import markdown_to_html_node, block_to_html_node
+from block_parser import parse_blocks
+from parallel_render import should_render_in_parallel, iter_chunks, ordered_parallel_map
+from block_cache import DEFAULT_CACHE_DIR
+from generator_version import generator_version
+from pack_store import PackStore
+from mmap_reader import map_file
+
+
+# Bump when the tuple layout below changes
+FORMAT_VERSION = 1
+
+# Larger files are streamed by generate_page instead of loaded as a tree
+DOCUMENT_CACHE_MAX_BYTES = 8 * 1024 * 1024
+
+# Node kinds in the serialized tuples
+_LEAF = 0
+_PARENT = 1
+
+
+def node_to_tuple(node):
+    """
+    Convert an HTMLNode tree into nested tuples that marshal can store.
+
+    Layout: (kind, tag, value_or_children, props) where props is a tuple of
+    (name, value) pairs or None, and children is a tuple of node tuples.
+
+    Args:
+        node (HTMLNode): A LeafNode or ParentNode tree
+
+    Returns:
+        tuple: The serializable form of the tree
+    """
+    props = tuple(node.props.items()) if node.props is not None else None
+    if isinstance(node, ParentNode):
+        children = tuple(node_to_tuple(child) for child in node.children)
+        return (_PARENT, node.tag, children, props)
+    return (_LEAF, node.tag, node.value, props)
+
+
+def tuple_to_node(data):
+    """
+    Rebuild an HTMLNode tree from node_to_tuple() output.
+
+    Args:
+        data (tuple): The serialized tree
+
+    Returns:
+        HTMLNode: An equivalent LeafNode or ParentNode tree
+    """
+    kind, tag, payload, props = data
+    props = dict(props) if props is not None else None
+    if kind == _PARENT:
+        return ParentNode(tag, [tuple_to_node(child) for child in payload], props)
+    return LeafNode(tag, payload, props)
+
+
+class DocumentCache:
+    """
+    On-disk cache of parsed markdown documents, keyed by file content hash.
+
+    Stores the output of markdown_to_html_node() as marshalled tuples, so
+    anything that needs the document tree (rendering, titles, excerpts, link
+    extraction) can load it without running the block or inline parser.
+    Entries live in a single PackStore at <cache_dir>/documents.pack.
+    Safe to share between threads.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, inline_cache=None, store=None, version=None):
+        """
+        Args:
+            cache_dir (str): Root directory of the build cache
+            inline_cache (InlineCache, optional): Used when a document must be parsed
+            store (PackStore, optional): Store to use instead of the default
+            version (str, optional): Generator version (default: generator_version())
+        """
+        self.version = version if version is not None else generator_version()
+        self.store = store if store is not None else PackStore(os.path.join(cache_dir, "documents"))
+        self.inline_cache = inline_cache
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()  # guards the counters; the store locks itself
+
+    def load(self, path, data=None, block_cache=None, workers=None):
+        """
+        Return the parsed tree of a markdown file, parsing it only on a miss.
+
+        The file is hashed through a memory mapping and only decoded on a
+        miss, so a hit never copies the file into memory. On a miss the
+        tree of each unchanged block comes from block_cache, so an edited
+        page only parses its changed blocks, and those are parsed by worker
+        processes if the page is large enough. The tree is the same either way.
+
+        Args:
+            path (str): Path to the markdown file
+            data (bytes or mmap.mmap, optional): The file contents, if the
+                caller has already mapped or read them
+            block_cache (BlockCache, optional): Block trees, used on a miss
+            workers (int, optional): Worker processes for a large page on a miss
+
+        Returns:
+            ParentNode: The document tree, as markdown_to_html_node() builds it
+        """
+        if data is None:
+            with map_file(path) as mapped:
+                return self.load(path, mapped, block_cache, workers)
+
+        key = self.key(data)
+        tree = self._read(key)
+        if tree is not None:
+            with self._lock:
+                self.hits += 1
+            return tuple_to_node(tree)
+
+        with self._lock:
+            self.misses += 1
+        markdown = _decode_markdown(data)
+        if block_cache is None and not should_render_in_parallel(len(markdown), workers):
+            node = markdown_to_html_node(markdown, inline_cache=self.inline_cache)
+        else:
+            node = self._build(markdown, block_cache, workers)
+        self._write(key, node_to_tuple(node))
+        return node
+
+    def key(self, data):
+        """
+        Args:
+            data (bytes or mmap.mmap): Raw contents of a markdown file
+
+        Returns:
+            str: Hex digest identifying the parsed tree of the file
+        """
+        digest = hashlib.sha256()
+        digest.update(f"{self.version}\0{FORMAT_VERSION}\0".encode('utf-8'))
+        digest.update(data)
+        return digest.hexdigest()
+
+    def hit_rate(self):
+        """
+        Returns:
+            float: Fraction of lookups that were hits (0.0 when there were none)
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def close(self):
+        """
+        Flush the cache index to disk.
+        """
+        self.store.close()
+
+    def _read(self, key):
+        data = self.store.get(key)
+        if data is None:
+            return None
+        try:
+            version, tree = marshal.loads(data)
+        except (EOFError, ValueError, TypeError):
+            # Unreadable entries are simply misses
+            return None
+        if version != FORMAT_VERSION:
+            return None
+        return tree
+
+    def _write(self, key, tree):
+        self.store.put(key, marshal.dumps((FORMAT_VERSION, tree)))
+
+    def _build(self, markdown, block_cache, workers):
+        # markdown_to_html_node(markdown), assembled from cached block trees
+        # where possible and with the rest parsed here or by workers
+        blocks = parse_blocks(markdown)
+        if not blocks:
+            return markdown_to_html_node(markdown)
+        children = [None] * len(blocks)
+        missing = []  # (index, node key) of blocks to parse
+        for index, (block_type, lines) in enumerate(blocks):
+            node_key = block_cache.node_key(block_type, lines) if block_cache is not None else None
+            tree = block_cache.get_node(node_key) if node_key is not None else None
+            if tree is None:
+                missing.append((index, node_key))
+            else:
+                children[index] = tuple_to_node(tree)
+
+        missing_blocks = [blocks[index] for index, _ in missing]
+        if should_render_in_parallel(len(markdown), workers):
+            trees = (tree for chunk in ordered_parallel_map(block_trees, iter_chunks(missing_blocks), workers)
+                     for tree in chunk)
+        else:
+            trees = (node_to_tuple(block_to_html_node(block_type, lines, self.inline_cache))
+                     for block_type, lines in missing_blocks)
+        for (index, node_key), tree in zip(missing, trees):
+            if node_key is not None:
+                block_cache.put_node(node_key, tree)
+            children[index] = tuple_to_node(tree)
+        return ParentNode("div", children)
+
+
+def block_trees(blocks):
+    """
+    Parse blocks into node trees in the serializable tuple form.
+
+    Module-level so it can be pickled and run in a worker process.
+
+    Args:
+        blocks (list[tuple[BlockType, list[str]]]): Parsed blocks
+
+    Returns:
+        list[tuple]: node_to_tuple() of each block's HTMLNode, in order
+    """
+    return [node_to_tuple(block_to_html_node(block_type, lines)) for block_type, lines in blocks]
+
+
+def _decode_markdown(data):
+    # Same text open(path, 'r', encoding='utf-8') would return
+    return str(data, 'utf-8').replace('\r\n', '\n').replace('\r', '\n')
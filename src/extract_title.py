@@ -26,8 +26,25 @@ def extract_title(markdown):
         raise ValueError("No h1 header found in empty markdown")
     
     # Split markdown into lines for processing
-    lines = markdown.split('\n')
+    return extract_title_from_lines(markdown.split('\n'))
+
+
+def extract_title_from_lines(lines):
+    """
+    Extract the h1 header from an iterable of markdown lines.
+    
+    Stops reading as soon as the title is found, so it can be given an open
+    file object without loading the whole document.
     
+    Args:
+        lines (iterable[str]): Lines of markdown text (trailing newlines allowed)
+        
+    Returns:
+        str: The title text without the # and whitespace
+        
+    Raises:
+        ValueError: If no h1 header is found
+    """
     for line in lines:
         # Strip leading/trailing whitespace from each line
         stripped_line = line.strip()
@@ -41,12 +58,6 @@ def extract_title(markdown):
                 return title
             else:
                 raise ValueError("No h1 header found - found '# ' but no title text")
-        
-        # Check for invalid h1 (# without space)
-        elif stripped_line.startswith('#') and len(stripped_line) > 1:
-            # This catches cases like "#NoSpace" or "##Multiple"
-            if not stripped_line.startswith('# '):
-                continue  # Keep looking, this isn't a valid h1
     
     # If we get here, no h1 header was found
     raise ValueError("No h1 header found in markdown")
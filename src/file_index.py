@@ -0,0 +1,255 @@
+import os
+import time
+import hashlib
+import marshal
+import threading
+
+from block_cache import DEFAULT_CACHE_DIR
+
+
+# Bump when the layout of the saved index changes
+FORMAT_VERSION = 2
+
+INDEX_FILE = "files.index"
+
+# Files modified this close to the last save may change again without a
+# visible size or mtime change, so their entries are re-hashed (like git's
+# "racily clean" entries)
+RACY_WINDOW_NS = 2 * 1_000_000_000
+
+
+class FileIndex:
+    """
+    Persistent index of file stat signatures and content hashes.
+
+    Each source file is recorded as (size, mtime_ns, inode, sha256). When a
+    file's stat signature is unchanged its recorded hash is returned without
+    reading the file, so a no-op rebuild costs one stat per file.
+
+    The index also remembers which inputs produced each output file, so an
+    incremental build can tell which outputs are already up to date. It is
+    saved at <cache_dir>/files.index.
+
+    A change source such as GitChangeSource can vouch for files instead:
+    with changed_paths set, any recorded file outside that set keeps its
+    hash without a stat comparison. The change source's snapshot (vcs_state)
+    is saved with the entries it describes; a build that changes entries
+    without one drops it, since the entries no longer match it.
+
+    Lookups and records may come from several threads at once (the static
+    copy and page generation run concurrently); save() runs after both.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        """
+        Args:
+            cache_dir (str): Root directory of the build cache
+        """
+        self.path = os.path.join(cache_dir, INDEX_FILE)
+        self.hashed = 0
+        self.unchanged = 0
+        self._saved_ns, self._files, self._outputs, self.previous_vcs_state = _load(self.path)
+        self.vcs_state = None
+        self.changed_paths = None
+        self._seen = set()
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def digest(self, path, stat=None):
+        """
+        Return the SHA-256 of a file, hashing it only if its stat changed.
+
+        Args:
+            path (str): Path to the file
+            stat (os.stat_result, optional): Stat of the file if already known
+
+        Returns:
+            str: Hex digest of the file contents
+        """
+        if stat is None:
+            stat = os.stat(path)
+        file_hash = self.cached_digest(path, stat)
+        if file_hash is None:
+            file_hash = hash_file(path)
+            self.record(path, stat, file_hash)
+        return file_hash
+
+    def cached_digest(self, path, stat):
+        """
+        Return the recorded hash of a file if it can be trusted, without hashing.
+
+        Args:
+            path (str): Path to the file
+            stat (os.stat_result): Current stat of the file
+
+        Returns:
+            str or None: Hex digest, or None if the file must be hashed
+        """
+        with self._lock:
+            self._seen.add(path)
+            entry = self._files.get(path)
+            if entry is None:
+                return None
+            if self.changed_paths is not None and os.path.abspath(path) not in self.changed_paths:
+                self.unchanged += 1
+                return entry[3]
+            if (entry[:3] == (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+                    and stat.st_mtime_ns < self._saved_ns - RACY_WINDOW_NS):
+                self.unchanged += 1
+                return entry[3]
+            return None
+
+    def record(self, path, stat, file_hash):
+        """
+        Record the hash of a file the caller has just hashed itself.
+
+        Args:
+            path (str): Path to the file
+            stat (os.stat_result): Stat of the file when it was hashed
+            file_hash (str): Hex SHA-256 digest of its contents
+        """
+        with self._lock:
+            self.hashed += 1
+            self._files[path] = (stat.st_size, stat.st_mtime_ns, stat.st_ino, file_hash)
+            self._seen.add(path)
+            self._dirty = True
+
+    def output_is_current(self, dest_path, key):
+        """
+        Check whether an output was built from the given inputs and is untouched.
+
+        Args:
+            dest_path (str): Path of the output file
+            key (str): Identifies the inputs the output should be built from
+
+        Returns:
+            bool: True if dest_path exists exactly as recorded for key
+        """
+        with self._lock:
+            entry = self._outputs.get(dest_path)
+        if entry is None or entry[0] != key:
+            return False
+        try:
+            stat = os.stat(dest_path)
+        except OSError:
+            return False
+        with self._lock:
+            self._seen.add(dest_path)
+        return entry[1:] == (stat.st_size, stat.st_mtime_ns)
+
+    def record_output(self, dest_path, key):
+        """
+        Remember that an output file was just written from the given inputs.
+
+        Args:
+            dest_path (str): Path of the output file
+            key (str): Identifies the inputs the output was built from
+        """
+        stat = os.stat(dest_path)
+        with self._lock:
+            self._outputs[dest_path] = (key, stat.st_size, stat.st_mtime_ns)
+            self._seen.add(dest_path)
+            self._dirty = True
+
+    def stale_outputs(self, output_dir):
+        """
+        List recorded outputs that this build neither wrote nor found current.
+
+        Call once every output has been written or checked; what is left
+        was produced by an earlier build from inputs that no longer exist
+        (a deleted or renamed page, a removed static file).
+
+        Args:
+            output_dir (str): Only consider outputs under this directory
+
+        Returns:
+            list[str]: Paths of the stale outputs, sorted
+        """
+        prefix = os.path.join(output_dir, "")
+        with self._lock:
+            return sorted(path for path in self._outputs
+                          if path.startswith(prefix) and path not in self._seen)
+
+    def forget_output(self, dest_path):
+        """
+        Args:
+            dest_path (str): Output file that was removed
+        """
+        with self._lock:
+            if self._outputs.pop(dest_path, None) is not None:
+                self._dirty = True
+
+    def move_outputs(self, old_dir, new_dir):
+        """
+        Re-key the output records under old_dir to the same files under new_dir.
+
+        Used when outputs move without changing, e.g. a hardlinked staging
+        copy of the output directory, or staging renamed into place.
+
+        Args:
+            old_dir (str): Directory the outputs were recorded under
+            new_dir (str): Directory they are now found under
+        """
+        prefix = os.path.join(old_dir, "")
+        with self._lock:
+            for path in [path for path in self._outputs if path.startswith(prefix)]:
+                new_path = os.path.join(new_dir, path[len(prefix):])
+                self._outputs[new_path] = self._outputs.pop(path)
+                if path in self._seen:
+                    self._seen.add(new_path)
+            self._dirty = True
+
+    def save(self):
+        """
+        Write the index to disk, dropping entries for files that no longer exist.
+
+        Nothing is written when the build didn't change any entry or the
+        change source snapshot.
+        """
+        if self.vcs_state is not None and self.vcs_state != self.previous_vcs_state:
+            self._dirty = True
+        for table in (self._files, self._outputs):
+            for path in [path for path in table if path not in self._seen]:
+                if not os.path.exists(path):
+                    del table[path]
+                    self._dirty = True
+        if not self._dirty:
+            return
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f:
+            marshal.dump((FORMAT_VERSION, time.time_ns(), self._files, self._outputs, self.vcs_state), f)
+        os.replace(temp_path, self.path)
+        self.previous_vcs_state = self.vcs_state
+        self._dirty = False
+
+
+def hash_file(path):
+    """
+    Args:
+        path (str): Path to the file
+
+    Returns:
+        str: Hex SHA-256 digest of the file contents
+    """
+    with open(path, 'rb', buffering=0) as f:
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        # Python < 3.11
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+        return digest.hexdigest()
+
+
+def _load(path):
+    try:
+        with open(path, 'rb') as f:
+            version, saved_ns, files, outputs, vcs_state = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        # Missing or unreadable: start empty, everything gets hashed
+        return 0, {}, {}, None
+    if version != FORMAT_VERSION:
+        return 0, {}, {}, None
+    return saved_ns, files, outputs, vcs_state
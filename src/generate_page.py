@@ -1,115 +1,216 @@
 import os
-from markdown_to_html import markdown_to_html_node
-from extract_title import extract_title
+from contextlib import nullcontext
+from markdown_to_html import iter_html_chunks
+from block_parser import iter_parsed_blocks
+from mmap_reader import map_file, iter_mapped_lines
+from parallel_render import should_render_in_parallel
+from build_context import BuildContext
+from document_cache import DOCUMENT_CACHE_MAX_BYTES
+from extract_title import extract_title_from_lines
 
 
-def generate_page(from_path, template_path, dest_path, basepath="/"):
+# Largest source rendered in memory and handed to a background output writer
+QUEUED_PAGE_MAX_BYTES = 1024 * 1024
+
+
+def generate_page(from_path, template_path, dest_path, basepath="/", context=None, markdown=None):
     """
     Generate a complete HTML page from markdown content and template.
     
     This function:
-    1. Reads markdown content from source file
-    2. Reads HTML template
-    3. Converts markdown to HTML
-    4. Extracts title from markdown
-    5. Replaces template placeholders with content and title
-    6. Updates all absolute paths to use the correct basepath
-    7. Writes complete HTML page to destination
+    1. Reads HTML template
+    2. Extracts title from markdown (stops at the first h1)
+    3. Replaces the title placeholder and splits the template around the content
+    4. Streams markdown blocks from the source file, converting each to HTML
+    5. Updates all absolute paths to use the correct basepath
+    6. Writes each block's HTML to the destination as soon as it is rendered
+    
+    The markdown file is never loaded whole: it is memory-mapped, decoded a
+    segment of whole blocks at a time, and blocks are rendered and written
+    one at a time, so memory use is bounded by the segment size.
+    Sources larger than PARALLEL_THRESHOLD_CHARS are rendered in chunks by
+    context.block_workers processes when that is set, and blocks found in
+    context.block_cache are not rendered at all. Pages small enough for
+    context.document_cache are rendered from their cached parse tree.
+    The page is put in place by context.output_writer, which leaves an
+    identical existing file untouched. With a background writer, pages up
+    to QUEUED_PAGE_MAX_BYTES are rendered in memory and queued instead, and
+    the caller takes the outcome from the writer (see PagePlan.finished).
+    Progress messages go to context.log.
     
     Args:
         from_path (str): Path to the markdown source file
         template_path (str): Path to the HTML template file
         dest_path (str): Path where the generated HTML page will be written
         basepath (str): Base URL path for the site (default: "/")
+        context (BuildContext, optional): Build options and shared caches
+        markdown (bytes, optional): The source contents, for pages that
+            aren't files (archive members); from_path then only names the page
     """
-    print(f"📄 Generating page from {from_path} to {dest_path} using {template_path}")
-    print(f"🔗 Using basepath: {basepath}")
+    if context is None:
+        context = BuildContext()
+    log = context.log
     
-    # Step 1: Read the markdown file
-    print(f"📖 Reading markdown file: {from_path}")
-    try:
-        with open(from_path, 'r', encoding='utf-8') as f:
-            markdown_content = f.read()
-        print(f"✅ Successfully read {len(markdown_content)} characters from {from_path}")
-    except FileNotFoundError:
-        raise FileNotFoundError(f"Markdown file not found: {from_path}")
-    except Exception as e:
-        raise Exception(f"Error reading markdown file {from_path}: {e}")
+    log(f"📄 Generating page from {from_path} to {dest_path} using {template_path}")
+    log(f"🔗 Using basepath: {basepath}")
     
-    # Step 2: Read the template file
-    print(f"📑 Reading template file: {template_path}")
+    # Step 1: Read the template file
+    log(f"📑 Reading template file: {template_path}")
     try:
         with open(template_path, 'r', encoding='utf-8') as f:
             template_content = f.read()
-        print(f"✅ Successfully read template from {template_path}")
+        log(f"✅ Successfully read template from {template_path}")
     except FileNotFoundError:
         raise FileNotFoundError(f"Template file not found: {template_path}")
     except Exception as e:
         raise Exception(f"Error reading template file {template_path}: {e}")
     
-    # Step 3: Convert markdown to HTML
-    print(f"🔄 Converting markdown to HTML...")
-    try:
-        html_node = markdown_to_html_node(markdown_content)
-        content_html = html_node.to_html()
-        print(f"✅ Successfully converted markdown to HTML ({len(content_html)} characters)")
-    except Exception as e:
-        raise Exception(f"Error converting markdown to HTML: {e}")
-    
-    # Step 4: Extract title from markdown
-    print(f"🏷️  Extracting title from markdown...")
+    # Step 2: Extract title from markdown
+    log(f"🏷️  Extracting title from markdown: {from_path}")
     try:
-        page_title = extract_title(markdown_content)
-        print(f"✅ Extracted title: '{page_title}'")
+        if markdown is not None:
+            page_title = extract_title_from_lines(iter_mapped_lines(markdown))
+        else:
+            with open(from_path, 'r', encoding='utf-8') as f:
+                page_title = extract_title_from_lines(f)
+        log(f"✅ Extracted title: '{page_title}'")
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Markdown file not found: {from_path}")
     except Exception as e:
         raise Exception(f"Error extracting title from markdown: {e}")
     
-    # Step 5: Replace placeholders in template
-    print(f"🔧 Replacing template placeholders...")
-    try:
-        # Replace the placeholders with actual content
-        full_html = template_content.replace("{{ Title }}", page_title)
-        full_html = full_html.replace("{{ Content }}", content_html)
-        print(f"✅ Template placeholders replaced successfully")
-    except Exception as e:
-        raise Exception(f"Error replacing template placeholders: {e}")
+    # Step 3: Replace the title and split the template around the content
+    log(f"🔧 Replacing template placeholders...")
+    template_with_title = template_content.replace("{{ Title }}", page_title)
+    head, _, tail = template_with_title.partition("{{ Content }}")
     
-    # Step 6: Update absolute paths to use basepath
-    print(f"🔗 Updating absolute paths with basepath: {basepath}")
+    # Step 4: Ensure destination directory exists (checked once per build)
+    writer = context.output_writer
+    dest_dir = os.path.dirname(dest_path)
     try:
-        # Replace href="/ with href="{basepath}
-        full_html = full_html.replace('href="/', f'href="{basepath}')
-        
-        # Replace src="/ with src="{basepath}  
-        full_html = full_html.replace('src="/', f'src="{basepath}')
-        
-        print(f"✅ Absolute paths updated for basepath: {basepath}")
+        if writer.ensure_dir(dest_dir):
+            log(f"📁 Created destination directory: {dest_dir}")
     except Exception as e:
-        raise Exception(f"Error updating paths with basepath: {e}")
+        raise Exception(f"Error creating destination directory {dest_dir}: {e}")
     
-    # Step 7: Ensure destination directory exists
-    dest_dir = os.path.dirname(dest_path)
-    if dest_dir and not os.path.exists(dest_dir):
-        print(f"📁 Creating destination directory: {dest_dir}")
-        try:
-            os.makedirs(dest_dir, exist_ok=True)
-            print(f"✅ Created directory: {dest_dir}")
-        except Exception as e:
-            raise Exception(f"Error creating destination directory {dest_dir}: {e}")
-    
-    # Step 8: Write the complete HTML page to destination
-    print(f"💾 Writing HTML page to: {dest_path}")
+    # Step 5: Stream blocks from the markdown file into the destination
+    log(f"🔄 Converting markdown to HTML and writing to: {dest_path}")
+    source_size = len(markdown) if markdown is not None else os.path.getsize(from_path)
+    # Small pages go to the background writer whole; large ones are streamed
+    # to a temporary file, so a failed render never leaves half a page
+    queued = writer.background and source_size <= QUEUED_PAGE_MAX_BYTES
+    temp_path = None if queued else writer.temp_path(dest_path)
+    workers = None
+    if should_render_in_parallel(source_size, context.block_workers):
+        log(f"⚡ Rendering blocks with {context.block_workers} worker processes")
+        workers = context.block_workers
+    use_document_cache = (
+        context.document_cache is not None
+        and source_size <= DOCUMENT_CACHE_MAX_BYTES
+    )
     try:
-        with open(dest_path, 'w', encoding='utf-8') as f:
-            f.write(full_html)
-        print(f"✅ Successfully wrote {len(full_html)} characters to {dest_path}")
+        characters_written = 0
+        with nullcontext(markdown) if markdown is not None else map_file(from_path) as source:
+            if use_document_cache:
+                # Small page - render the cached tree, no markdown parsing on a hit
+                content_chunks = [context.document_cache.load(from_path, source, context.block_cache,
+                                                              workers).to_html()]
+            else:
+                content_chunks = iter_html_chunks(
+                    iter_parsed_blocks(iter_mapped_lines(source)),
+                    workers, context.block_cache, context.inline_cache
+                )
+            
+            if "{{ Content }}" in tail:
+                # Content is used more than once - render it in memory
+                content_html = "".join(content_chunks)
+                chunks = [template_with_title.replace("{{ Content }}", content_html)]
+            else:
+                chunks = _iter_page_chunks(head, content_chunks, tail)
+            
+            if queued:
+                page = "".join(_apply_basepath(chunk, basepath) for chunk in chunks)
+                characters_written = len(page)
+                writer.submit(dest_path, page.encode('utf-8'))
+            else:
+                with open(temp_path, 'wb') as out:
+                    for chunk in chunks:
+                        chunk = _apply_basepath(chunk, basepath)
+                        out.write(chunk.encode('utf-8'))
+                        characters_written += len(chunk)
+        if queued:
+            log(f"📤 Queued {characters_written} characters for writing to {dest_path}")
+        elif writer.commit(temp_path, dest_path):
+            log(f"✅ Successfully wrote {characters_written} characters to {dest_path}")
+        else:
+            log(f"⏭️  Output unchanged, kept: {dest_path}")
     except Exception as e:
-        raise Exception(f"Error writing HTML file {dest_path}: {e}")
+        if temp_path is not None and os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise Exception(f"Error converting markdown to HTML: {e}")
     
-    print(f"🎉 Page generation completed successfully!")
+    log(f"🎉 Page generation completed successfully!")
     return dest_path
 
 
+def render_page(markdown, template_content, basepath="/", context=None):
+    """
+    Render a complete HTML page in memory.
+    
+    Produces exactly what generate_page() writes for the same markdown, for
+    callers that don't have the source or destination on disk (such as
+    workers of a distributed build).
+    
+    Args:
+        markdown (str): Markdown source, as read in text mode
+        template_content (str): HTML template
+        basepath (str): Base URL path for the site (default: "/")
+        context (BuildContext, optional): Shared caches
+    
+    Returns:
+        str: The finished page
+    
+    Raises:
+        ValueError: If the markdown has no h1 title or is invalid
+    """
+    if context is None:
+        context = BuildContext()
+    
+    lines = markdown[:-1].split('\n') if markdown.endswith('\n') else markdown.split('\n')
+    page_title = extract_title_from_lines(lines)
+    template_with_title = template_content.replace("{{ Title }}", page_title)
+    head, _, tail = template_with_title.partition("{{ Content }}")
+    
+    content_html = "".join(iter_html_chunks(
+        iter_parsed_blocks(lines), None, context.block_cache, context.inline_cache
+    ))
+    if "{{ Content }}" in tail:
+        chunks = [template_with_title.replace("{{ Content }}", content_html)]
+    else:
+        chunks = _iter_page_chunks(head, [content_html], tail)
+    return "".join(_apply_basepath(chunk, basepath) for chunk in chunks)
+
+
+def _iter_page_chunks(head, content_chunks, tail):
+    yield head
+    yield from content_chunks
+    yield tail
+
+
+def _apply_basepath(html, basepath):
+    """
+    Update absolute paths in an HTML fragment to use the basepath.
+    
+    Safe to apply per block: the href="/ and src="/ patterns never span
+    the boundary between two rendered blocks.
+    """
+    # Replace href="/ with href="{basepath}
+    html = html.replace('href="/', f'href="{basepath}')
+    
+    # Replace src="/ with src="{basepath}
+    return html.replace('src="/', f'src="{basepath}')
+
+
 def read_file(file_path):
     """
     Utility function to read a file and return its contents.
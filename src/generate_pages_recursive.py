@@ -1,16 +1,26 @@
 import os
+import time
+import hashlib
+from collections import namedtuple, deque
 from generate_page import generate_page
+from content_source import open_content_source
 
 
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath="/"):
+def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath="/", context=None):
     """
     Recursively generate HTML pages for all markdown files in a directory structure.
     
+    The content may also be a tar or zip archive of markdown files, or any
+    content source object (see content_source); archive members are rendered
+    as they are read, without extracting the archive.
+    
     Args:
-        dir_path_content (str): Root directory containing markdown content files
+        dir_path_content (str or content source): Root directory containing
+            markdown content files, or an archive of them
         template_path (str): Path to the HTML template file
         dest_dir_path (str): Root directory where HTML files will be generated
         basepath (str): Base URL path for the site (default: "/")
+        context (BuildContext, optional): Build options and shared caches
     """
     print(f"🔄 Starting recursive page generation:")
     print(f"   📁 Content directory: {dir_path_content}")
@@ -19,87 +29,190 @@ def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, bas
     print(f"   🔗 Basepath: {basepath}")
     print()
     
-    # Verify the content directory exists
-    if not os.path.exists(dir_path_content):
-        print(f"❌ Content directory does not exist: {dir_path_content}")
-        return
-    
-    if not os.path.isdir(dir_path_content):
-        print(f"❌ Content path is not a directory: {dir_path_content}")
+    # Verify the content directory (or archive) exists
+    content = open_content_source(dir_path_content) if isinstance(dir_path_content, str) else dir_path_content
+    problem = content.check()
+    if problem is not None:
+        print(f"❌ {problem}")
         return
     
-    # Start the recursive processing
-    total_pages = _process_directory_recursive(dir_path_content, template_path, dest_dir_path, dir_path_content, basepath)
+    # Pages are generated as discovery yields them, while the walk continues
+    plan = PagePlan(content, template_path, dest_dir_path, basepath, context)
+    total_pages = 0
+    for job in plan:
+        print(f"📄 Generating: {job.source} → {job.rel_dest}")
+        
+        started = time.perf_counter()
+        try:
+            generate_page(job.source, template_path, job.dest, basepath, context, markdown=job.data)
+            total_pages += 1
+            plan.finished(job, time.perf_counter() - started)
+            print(f"   ✅ Successfully generated: {job.dest}")
+            
+        except Exception as e:
+            print(f"   ❌ Error generating page from {job.source}: {e}")
+            plan.finished(job, error=str(e))
     
     print(f"\n🎉 Recursive generation completed!")
     print(f"📊 Total pages generated: {total_pages}")
+    plan.close()
+
 
+# One page to generate: source markdown, destination relative to the output
+# directory and absolute, source size, the page key (None without a file
+# index) and the source bytes when they aren't read from the source path
+PageJob = namedtuple("PageJob", ["source", "rel_dest", "dest", "size", "key", "data"], defaults=(None,))
 
-def _process_directory_recursive(current_dir, template_path, dest_base_dir, content_base_dir, basepath):
+
+class PagePlan:
     """
-    Helper function that recursively processes a directory and all its subdirectories.
+    The pages a build has to generate, and the bookkeeping once they are done.
+    
+    Iterating yields a PageJob for every page that the content source finds, except
+    pages that belong to another shard and, in an incremental build, pages
+    whose output is already current, or that the interrupted build being
+    resumed already completed. Every way of generating pages (serial,
+    --jobs, --threads, distributed) reports each job back through
+    finished(), which updates the file index, the build journal, the shard
+    manifest and the render times.
+    
+    A page queued on a background output writer is only recorded once the
+    writer has put it in place: finished() records pages whose writes are
+    done and keeps the rest for a later call, and close() waits for them.
     """
-    pages_generated = 0
     
-    try:
-        items = os.listdir(current_dir)
-        print(f"📂 Processing directory: {current_dir}")
-        print(f"   Found {len(items)} items")
-        
-    except PermissionError:
-        print(f"❌ Permission denied accessing: {current_dir}")
-        return 0
-    except Exception as e:
-        print(f"❌ Error accessing directory {current_dir}: {e}")
-        return 0
+    def __init__(self, dir_path_content, template_path, dest_dir_path, basepath="/", context=None):
+        """
+        Args:
+            dir_path_content (str or content source): Root directory containing
+                markdown content files, an archive of them, or a content source
+            template_path (str): Path to the HTML template file
+            dest_dir_path (str): Root directory where HTML files will be generated
+            basepath (str): Base URL path for the site
+            context (BuildContext, optional): Build options and shared caches
+        """
+        self.dir_path_content = dir_path_content
+        if isinstance(dir_path_content, str):
+            self.content = open_content_source(dir_path_content)
+        else:
+            self.content = dir_path_content
+        self.dest_dir_path = dest_dir_path
+        self.basepath = basepath
+        self.context = context
+        self.file_index = context.file_index if context is not None else None
+        self.shard = context.shard if context is not None else None
+        self.render_times = context.render_times if context is not None else None
+        self.journal = context.journal if context is not None else None
+        self.output_writer = context.output_writer if context is not None else None
+        # False when pages go to an archive or memory: there are no files to record
+        self.outputs_on_disk = self.output_writer is None or self.output_writer.on_disk
+        self.incremental = self.file_index is not None and context.incremental
+        self.template_digest = self.file_index.digest(template_path) if self.file_index is not None else None
+        self.skipped = 0
+        self.write_failures = 0
+        self._queued = deque()  # (job, seconds, write future), in the order finished
+    
+    def __iter__(self):
+        pages = self.content.pages()
+        if self.shard is not None:
+            pages = self.shard.select(pages)
+        for page in pages:
+            dest_file_path = os.path.join(self.dest_dir_path, page.rel_dest)
+            key = None
+            if self.file_index is not None:
+                if page.data is None:
+                    source_digest = self.file_index.digest(page.source, page.stat)
+                else:
+                    source_digest = hashlib.sha256(page.data).hexdigest()
+                key = page_key(source_digest, self.template_digest, self.basepath, self.context.version)
+                if self.incremental and self.file_index.output_is_current(dest_file_path, key):
+                    self.skipped += 1
+                    if self.shard is not None:
+                        self.shard.record_page(page.rel_dest, dest_file_path)
+                    continue
+                if self.journal is not None and self.journal.is_complete(page.rel_dest, key, dest_file_path):
+                    self.file_index.record_output(dest_file_path, key)
+                    if self.shard is not None:
+                        self.shard.record_page(page.rel_dest, dest_file_path)
+                    continue
+            yield PageJob(page.source, page.rel_dest, dest_file_path, page.size, key, page.data)
     
-    # Process each item in the directory
-    for item in items:
-        item_path = os.path.join(current_dir, item)
+    def finished(self, job, seconds=None, error=None):
+        """
+        Record the outcome of one job.
         
-        if os.path.isfile(item_path):
-            # It's a file - check if it's a markdown file
-            if item.endswith('.md'):
-                print(f"📄 Found markdown file: {item}")
-                
-                # Calculate the corresponding output path
-                relative_path = os.path.relpath(item_path, content_base_dir)
-                relative_html_path = relative_path[:-3] + '.html'  # Remove .md, add .html
-                dest_file_path = os.path.join(dest_base_dir, relative_html_path)
-                
-                print(f"   📝 Generating: {relative_path} → {relative_html_path}")
-                
-                try:
-                    # Generate the page with basepath
-                    generate_page(item_path, template_path, dest_file_path, basepath)
-                    pages_generated += 1
-                    print(f"   ✅ Successfully generated: {dest_file_path}")
-                    
-                except Exception as e:
-                    print(f"   ❌ Error generating page from {item_path}: {e}")
-            else:
-                print(f"📄 Skipping non-markdown file: {item}")
-                
-        elif os.path.isdir(item_path):
-            # It's a directory - recurse into it
-            print(f"📁 Found subdirectory: {item}")
-            print(f"   🔄 Recursing into: {item_path}")
-            
-            # RECURSION: Process the subdirectory
-            subdirectory_pages = _process_directory_recursive(
-                item_path, 
-                template_path, 
-                dest_base_dir, 
-                content_base_dir,
-                basepath
-            )
-            
-            pages_generated += subdirectory_pages
-            print(f"   📊 Subdirectory {item} generated {subdirectory_pages} pages")
-            
+        Args:
+            job (PageJob): The job from this plan
+            seconds (float, optional): How long the page took to render
+            error (str, optional): Why the page failed, if it did
+        """
+        write = self.output_writer.take(job.dest) if self.output_writer is not None else None
+        if write is not None and error is None:
+            self._queued.append((job, seconds, write))
         else:
-            print(f"⚠️  Skipping special item: {item}")
+            self._record(job, seconds, error)
+        self._settle()
+    
+    def close(self):
+        """
+        Wait for queued writes, report skipped pages and write the shard
+        manifest, if any.
+        
+        Returns:
+            int: Pages that rendered but could not be written
+        """
+        self._settle(wait=True)
+        if self.incremental:
+            print(f"⏭️  Unchanged pages skipped: {self.skipped}")
+        if self.journal is not None and self.journal.previous:
+            print(f"⏩ Resumed: {self.journal.resumed} pages already completed by the interrupted build")
+        if self.shard is not None:
+            self.shard.write_manifest(self.dest_dir_path)
+        return self.write_failures
+    
+    def _settle(self, wait=False):
+        # Record queued pages whose writes are done, in the order they finished
+        while self._queued and (wait or self._queued[0][2].done()):
+            job, seconds, write = self._queued.popleft()
+            try:
+                write.result()
+            except Exception as e:
+                self.write_failures += 1
+                print(f"   ❌ Error writing {job.dest}: {e}")
+                self._record(job, error=str(e))
+                continue
+            self._record(job, seconds)
     
-    print(f"✅ Completed directory {current_dir}: {pages_generated} pages generated")
-    return pages_generated
+    def _record(self, job, seconds=None, error=None):
+        if error is not None:
+            if self.shard is not None:
+                self.shard.record_failure(job.rel_dest)
+            return
+        if job.key is not None and self.outputs_on_disk:
+            self.file_index.record_output(job.dest, job.key)
+            if self.journal is not None:
+                self.journal.record(job.rel_dest, job.key, job.dest)
+        if self.shard is not None:
+            self.shard.record_page(job.rel_dest, job.dest)
+        if self.render_times is not None and seconds is not None:
+            self.render_times.record(job.source, job.size, seconds)
 
+
+def page_key(source_digest, template_digest, basepath, version):
+    """
+    Identify everything a generated page depends on.
+    
+    Args:
+        source_digest (str): Hash of the markdown source
+        template_digest (str): Hash of the HTML template
+        basepath (str): Base URL path the page is built for
+        version (str or None): Generator version
+    
+    Returns:
+        str: Hex digest that changes whenever the page output could change
+    """
+    digest = hashlib.sha256()
+    for part in (version or "", basepath, template_digest, source_digest):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
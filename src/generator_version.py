@@ -0,0 +1,38 @@
+import os
+import hashlib
+
+
+# Bump to invalidate every cache entry even when no source file changed
+GENERATOR_VERSION = "1"
+
+
+def generator_version(source_dir=None):
+    """
+    Identify the exact generator code that produced a cache entry.
+
+    Combines GENERATOR_VERSION with a hash of the generator's own source
+    files (tests excluded), so any code change invalidates every cache entry
+    without anyone having to remember to bump a version number. Cache keys
+    built from it are safe to share between CI jobs running different commits.
+
+    Args:
+        source_dir (str, optional): Directory of the generator sources
+            (default: the directory of this module)
+
+    Returns:
+        str: A version string like "1-3f2a9c0d1b7e4a55"
+    """
+    if source_dir is None:
+        source_dir = os.path.dirname(os.path.abspath(__file__))
+
+    digest = hashlib.sha256(GENERATOR_VERSION.encode('utf-8'))
+    for name in sorted(os.listdir(source_dir)):
+        if not name.endswith('.py') or name.startswith('test_'):
+            continue
+        with open(os.path.join(source_dir, name), 'rb') as f:
+            source = f.read()
+        digest.update(name.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(hashlib.sha256(source).digest())
+
+    return f"{GENERATOR_VERSION}-{digest.hexdigest()[:16]}"
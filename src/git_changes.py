@@ -0,0 +1,101 @@
+import os
+import subprocess
+
+
+# Site inputs whose changes git is asked about, relative to the project root
+DEFAULT_PATHSPECS = ("content", "static", "template.html")
+
+
+class GitChangeSource:
+    """
+    Ask git which site inputs changed since a previous build.
+
+    A snapshot is the HEAD commit plus the paths git reports as modified,
+    staged, untracked or ignored at the start of a build. It is stored with
+    the FileIndex, and on the next build every path that differs between
+    the two commits or was dirty in either snapshot counts as changed.
+    Everything else can reuse the hash the index already has.
+
+    Every method returns None when git can't answer (not installed, not a
+    repository, unknown commit), so callers fall back to the stat index.
+    """
+
+    def __init__(self, repo_dir=".", pathspecs=DEFAULT_PATHSPECS):
+        """
+        Args:
+            repo_dir (str): Directory inside the git work tree
+            pathspecs (tuple[str]): Inputs to watch, relative to repo_dir
+        """
+        self.repo_dir = repo_dir
+        self.pathspecs = tuple(pathspecs)
+
+    def snapshot(self):
+        """
+        Record the current commit and dirty inputs.
+
+        Returns:
+            tuple or None: (commit, dirty paths) with paths relative to the
+                repository root, or None if git is unavailable
+        """
+        head = self._git("rev-parse", "--verify", "HEAD")
+        status = self._git("status", "--porcelain", "-z", "--untracked-files=all", "--ignored",
+                           "--", *self.pathspecs)
+        if head is None or status is None:
+            return None
+        return head.strip(), tuple(sorted(_parse_status(status)))
+
+    def changed_since(self, previous, current):
+        """
+        List the inputs that may differ between two snapshots.
+
+        Args:
+            previous (tuple or None): Snapshot stored by the last build
+            current (tuple): Snapshot of this build from snapshot()
+
+        Returns:
+            set[str] or None: Absolute paths that changed, or None if git
+                can't tell (no previous snapshot, or its commit is gone)
+        """
+        if previous is None or current is None:
+            return None
+        previous_commit, previous_dirty = previous
+        commit, dirty = current
+
+        changed = set(previous_dirty) | set(dirty)
+        if previous_commit != commit:
+            diff = self._git("diff", "--name-only", "--no-renames", "-z", previous_commit, commit,
+                             "--", *self.pathspecs)
+            if diff is None:
+                return None
+            changed.update(path for path in diff.split("\0") if path)
+
+        root = self._git("rev-parse", "--show-toplevel")
+        if root is None:
+            return None
+        root = root.strip()
+        return {os.path.normpath(os.path.join(root, path)) for path in changed}
+
+    def _git(self, *args):
+        try:
+            result = subprocess.run(["git", "-C", self.repo_dir, *args],
+                                    capture_output=True, text=True, check=True)
+        except (OSError, subprocess.CalledProcessError):
+            return None
+        return result.stdout
+
+
+def _parse_status(output):
+    # Entries are "XY path"; renames and copies are followed by the old path
+    entries = output.split("\0")
+    paths = []
+    i = 0
+    while i < len(entries):
+        entry = entries[i]
+        i += 1
+        if not entry:
+            continue
+        paths.append(entry[3:])
+        if entry[0] in "RC":
+            paths.append(entries[i])
+            i += 1
+    return paths
@@ -0,0 +1,100 @@
+import sys
+import threading
+from collections import OrderedDict
+
+from textnode import TextNode
+from text_to_textnodes import text_to_textnodes
+
+
+class InlineCache:
+    """
+    Bounded LRU cache of inline markdown parses, keyed by the raw text.
+
+    Sites repeat a lot of inline text (list items, nav lines, disclaimers), so
+    parsing each distinct run once per process saves most of the inline work.
+    Results are stored as tuples of (text, text_type, url) tuples, which are
+    immutable and safe to share; every lookup builds fresh TextNodes from them.
+    The cache may be shared between threads: lookups and updates hold a lock,
+    parsing a miss doesn't.
+    """
+
+    def __init__(self, max_entries=4096, max_bytes=16 * 1024 * 1024):
+        """
+        Args:
+            max_entries (int): Maximum number of cached text runs
+            max_bytes (int): Approximate memory limit for keys and values
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # text -> (parsed tuple, size in bytes)
+        self._lock = threading.Lock()
+
+    def text_to_textnodes(self, text):
+        """
+        Cached equivalent of text_to_textnodes().
+
+        Args:
+            text (str): Raw markdown text to parse
+
+        Returns:
+            list[TextNode]: New TextNode objects for the parsed text
+
+        Raises:
+            ValueError: For invalid markdown, exactly like text_to_textnodes()
+        """
+        with self._lock:
+            entry = self._entries.get(text)
+            if entry is not None:
+                self._entries.move_to_end(text)
+                self.hits += 1
+            else:
+                self.misses += 1
+        if entry is not None:
+            parsed = entry[0]
+        else:
+            parsed = tuple((node.text, node.text_type, node.url) for node in text_to_textnodes(text))
+            with self._lock:
+                self._store(text, parsed)
+        return [TextNode(node_text, text_type, url) for node_text, text_type, url in parsed]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def hit_rate(self):
+        """
+        Returns:
+            float: Fraction of lookups that were hits (0.0 when there were none)
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def _store(self, text, parsed):
+        if text in self._entries:
+            # Another thread parsed the same text meanwhile
+            return
+        size = _entry_size(text, parsed)
+        if size > self.max_bytes or self.max_entries <= 0:
+            # Too big to ever fit - don't flush the whole cache for it
+            return
+
+        self._entries[text] = (parsed, size)
+        self.current_bytes += size
+
+        while len(self._entries) > self.max_entries or self.current_bytes > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self.current_bytes -= evicted_size
+            self.evictions += 1
+
+
+def _entry_size(text, parsed):
+    # Approximate: the key plus each node's strings and tuple overhead
+    size = sys.getsizeof(text) + sys.getsizeof(parsed)
+    for node_text, _, url in parsed:
+        size += sys.getsizeof(node_text) + 64
+        if url is not None:
+            size += sys.getsizeof(url)
+    return size
@@ -0,0 +1,173 @@
+import os
+import json
+import time
+import hashlib
+import threading
+
+
+
+# 2: outputs are identified by size and mtime_ns instead of a content hash
+JOURNAL_VERSION = 2
+
+# Completed pages are fsynced in batches: whichever limit is reached first.
+# A crash loses at most one batch, and those pages are simply rebuilt.
+SYNC_EVERY_PAGES = 256
+SYNC_EVERY_SECONDS = 1.0
+
+
+def journal_path(cache_dir, output_dir):
+    """
+    Args:
+        cache_dir (str): Root directory of the build cache
+        output_dir (str): The build's output directory
+
+    Returns:
+        str: Journal location; builds into different directories don't share one
+    """
+    name = hashlib.sha256(os.path.abspath(output_dir).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(cache_dir, f"build-{name}.journal")
+
+
+class BuildJournal:
+    """
+    Append-only log of the pages a build has completed.
+
+    Every page is journaled as soon as its output is written, so a build
+    that dies part-way (OOM, CI timeout) leaves a record of what it
+    finished; the file index and caches are only saved at the end. A
+    `--resume` run keeps the output directory and skips every journaled
+    page whose inputs are unchanged and whose output still has the
+    recorded size and mtime, the same check FileIndex.output_is_current()
+    makes. Recording a page is one stat, so a build that is never
+    interrupted pays almost nothing for its journal.
+
+    The first line is a JSON header describing the build (output
+    directory, basepath, generator version, shard); a journal from a
+    different build is ignored. Each further line is one JSON record. A
+    torn last line from a crash is ignored. The journal is deleted once
+    the build completes.
+    """
+
+    def __init__(self, path, header, resume=False):
+        """
+        Args:
+            path (str): Journal file, from journal_path()
+            header (dict): Describes the build; must match to resume
+            resume (bool): Keep and reuse the records of an interrupted build
+
+        Attributes:
+            previous (dict): rel_dest -> (key, size, mtime_ns) from the
+                interrupted build, empty when not resuming
+            mismatch (bool): A journal existed but was for a different build
+        """
+        self.path = path
+        self.header = dict(header, version=JOURNAL_VERSION)
+        self.previous = {}
+        self.mismatch = False
+        self.resumed = 0
+        if resume:
+            self.previous, self.mismatch = _load(path, self.header)
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if self.previous:
+            self._file = open(path, 'a', encoding='utf-8')
+            self._file.write("\n")  # end a torn last record rather than extend it
+        else:
+            self._file = open(path, 'w', encoding='utf-8')
+            self._file.write(json.dumps(self.header, sort_keys=True) + "\n")
+        self._lock = threading.Lock()
+        self._unsynced = 0
+        self._synced_at = time.monotonic()
+        self._sync()
+
+    def is_complete(self, rel_dest, key, dest_path):
+        """
+        Check whether the interrupted build already produced this page.
+
+        Args:
+            rel_dest (str): Page path relative to the output directory
+            key (str): Page key of the current inputs
+            dest_path (str): Where the page is written
+
+        Returns:
+            bool: True if the output exists as journaled for the same key
+        """
+        entry = self.previous.get(rel_dest)
+        if entry is None or entry[0] != key:
+            return False
+        try:
+            stat = os.stat(dest_path)
+        except OSError:
+            return False
+        if entry[1:] != (stat.st_size, stat.st_mtime_ns):
+            return False
+        self.resumed += 1
+        return True
+
+    def record(self, rel_dest, key, dest_path):
+        """
+        Journal a page whose output has just been written.
+
+        Args:
+            rel_dest (str): Page path relative to the output directory
+            key (str): Page key of the inputs it was built from
+            dest_path (str): The written page
+        """
+        stat = os.stat(dest_path)
+        line = json.dumps({"page": rel_dest, "key": key, "size": stat.st_size,
+                           "mtime_ns": stat.st_mtime_ns}) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._unsynced += 1
+            if (self._unsynced >= SYNC_EVERY_PAGES
+                    or time.monotonic() - self._synced_at >= SYNC_EVERY_SECONDS):
+                self._sync()
+
+    def close(self):
+        """
+        Sync and close the journal, keeping it for a later --resume.
+        """
+        with self._lock:
+            if self._file.closed:
+                return
+            self._sync()
+            self._file.close()
+
+    def complete(self):
+        """
+        The build finished: nothing is left to resume, so drop the journal.
+        """
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._synced_at = time.monotonic()
+
+
+def _load(path, header):
+    # Returns (records, mismatch); later records for a page replace earlier ones
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            lines = f.read().split("\n")
+    except FileNotFoundError:
+        return {}, False
+    try:
+        if json.loads(lines[0]) != header:
+            return {}, True
+    except ValueError:
+        return {}, True
+
+    records = {}
+    for line in lines[1:]:
+        try:
+            record = json.loads(line)
+            records[record["page"]] = (record["key"], record["size"], record["mtime_ns"])
+        except (ValueError, KeyError, TypeError):
+            continue  # the torn tail of a crashed build, or the final empty line
+    return records, False
@@ -1,6 +1,7 @@
 import os
 import sys
 import shutil
+import argparse
 from textnode import TextNode, TextType
 from htmlnode import HTMLNode
 from leafnode import LeafNode
@@ -14,9 +15,137 @@ from markdown_to_html import markdown_to_html_node
 from copy_static import copy_files_recursive
 from generate_page import generate_page
 from generate_pages_recursive import generate_pages_recursive
+from build_context import BuildContext
+from block_cache import BlockCache, DEFAULT_CACHE_DIR
+from inline_cache import InlineCache
+from document_cache import DocumentCache
+from build_cache import cache_main, collect_garbage, record_build, DEFAULT_MAX_CACHE_BYTES
+from generator_version import generator_version
+from file_index import FileIndex
+from git_changes import GitChangeSource
+from sharding import Shard, merge_main, STRATEGIES
+from distributed import generate_pages_distributed, worker_main
+from task_graph import TaskGraph
+from journal import BuildJournal, journal_path
+from publish import Publisher
+from output_writer import OutputWriter, DEFAULT_QUEUE_SIZE
+from output_sink import ArchiveSink, DURABILITY_POLICIES, ARCHIVE_FORMATS, archive_format
+from prune import prune_stale_outputs
+from content_source import is_content_archive
+from page_scheduler import RenderTimes, generate_pages_parallel
+from thread_render import generate_pages_threaded
 
 
-def main():
+def parse_args(argv=None):
+    """
+    Parse command line arguments.
+    
+    The optional positional basepath keeps the original interface:
+    `main.py` builds for development, `main.py /repo-name/` for production.
+    Other commands are separate: `main.py cache stats|gc`,
+    `main.py merge OUTPUT SHARD_DIR...` for sharded builds and
+    `main.py worker ADDRESS` to render pages for a `--coordinator` build.
+    """
+    parser = argparse.ArgumentParser(description="Build the static site.")
+    parser.add_argument("basepath", nargs="?", default=None,
+                        help="Base URL path; builds a production site into docs/ when given")
+    parser.add_argument("--block-workers", type=int, default=0, metavar="N",
+                        help="Render blocks of very large pages in N processes")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, metavar="PATH",
+                        help=f"Directory for the persistent build cache, may be shared between CI jobs "
+                             f"(default: $SSG_CACHE_DIR or .ssg-cache, currently {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Render every block without reading or writing the build cache")
+    parser.add_argument("--cache-max-mb", type=int, default=DEFAULT_MAX_CACHE_BYTES // (1024 * 1024), metavar="MB",
+                        help="Evict least recently used cache entries above this size (default: %(default)s)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Keep the output directory and only rebuild pages and files whose inputs changed")
+    parser.add_argument("--in-place", action="store_true",
+                        help="Clear and rebuild the output directory directly instead of swapping in a staged build")
+    parser.add_argument("--resume", action="store_true",
+                        help="Keep the output of an interrupted build and skip the pages it completed")
+    parser.add_argument("--git-changes", action="store_true",
+                        help="With --incremental, ask git which inputs changed instead of checking every file's stat")
+    parser.add_argument("--shard", metavar="I/N",
+                        help="Build only shard I of N of the content pages (1-based), for `main.py merge`")
+    parser.add_argument("--shard-by", choices=STRATEGIES, default="path",
+                        help="Assign pages by path hash or balance them by size (default: %(default)s)")
+    parser.add_argument("--jobs", type=int, default=1, metavar="N",
+                        help="Generate pages in N processes, longest expected render time first")
+    parser.add_argument("--threads", type=int, default=1, metavar="N",
+                        help="Generate pages on N threads; renders in parallel on free-threaded Python")
+    parser.add_argument("--coordinator", metavar="ADDRESS",
+                        help="Serve pages to `main.py worker` processes on host:port or unix:/path")
+    parser.add_argument("--local-workers", type=int, default=0, metavar="N",
+                        help="With --coordinator, also start N worker processes on this machine")
+    parser.add_argument("--task-workers", type=int, default=4, metavar="N",
+                        help="Run up to N build phases at once, e.g. static copy and pages (default: %(default)s)")
+    parser.add_argument("--content", default="content", metavar="PATH",
+                        help="Markdown content: a directory, or a .tar, .tar.gz, .tgz, .tar.bz2, .tar.xz "
+                             "or .zip archive read without extracting it (default: %(default)s)")
+    parser.add_argument("--archive", metavar="PATH",
+                        help="Stream the site into a tar or zip archive (by suffix: "
+                             f"{', '.join(ARCHIVE_FORMATS)}) instead of the output directory")
+    parser.add_argument("--write-queue", type=int, default=DEFAULT_QUEUE_SIZE, metavar="N",
+                        help="Write outputs on a background thread with up to N queued; 0 writes "
+                             "on the rendering thread (default: %(default)s)")
+    parser.add_argument("--fsync", choices=DURABILITY_POLICIES, default="none",
+                        help="Flush outputs to disk never, once at the end, or after every file "
+                             "(default: %(default)s)")
+    parser.add_argument("--inline-cache", type=int, default=0, metavar="ENTRIES",
+                        help="Memoize inline parsing of up to ENTRIES repeated text runs")
+    parser.add_argument("--inline-cache-mb", type=int, default=16, metavar="MB",
+                        help="Memory limit for the inline cache (default: 16)")
+    args = parser.parse_args(argv)
+    if args.incremental and args.no_cache:
+        parser.error("--incremental needs the build cache; drop --no-cache")
+    if args.resume and args.no_cache:
+        parser.error("--resume reads the build journal in the cache directory; drop --no-cache")
+    if args.git_changes and not args.incremental:
+        parser.error("--git-changes only applies to --incremental builds")
+    if args.local_workers and not args.coordinator:
+        parser.error("--local-workers needs --coordinator")
+    if args.jobs > 1 and args.coordinator:
+        parser.error("--jobs and --coordinator are alternatives; use --local-workers with a coordinator")
+    if args.threads > 1 and (args.jobs > 1 or args.coordinator):
+        parser.error("--threads can't be combined with --jobs or --coordinator")
+    if args.archive is not None:
+        try:
+            archive_format(args.archive)
+        except ValueError as e:
+            parser.error(str(e))
+        for flag, used in (("--incremental", args.incremental), ("--resume", args.resume),
+                           ("--in-place", args.in_place), ("--jobs", args.jobs > 1),
+                           ("--shard", args.shard is not None)):
+            if used:
+                parser.error(f"{flag} needs an output directory; it can't be combined with --archive")
+    if is_content_archive(args.content):
+        for flag, used in (("--jobs", args.jobs > 1), ("--coordinator", args.coordinator)):
+            if used:
+                parser.error(f"{flag} reads pages from files; it can't be combined with a content archive")
+    args.shard_spec = None
+    if args.shard is not None:
+        try:
+            args.shard_spec = Shard.parse(args.shard, args.shard_by)
+        except ValueError as e:
+            parser.error(str(e))
+    return args
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] == "cache":
+        cache_main(argv[1:])
+        return
+    if argv and argv[0] == "merge":
+        sys.exit(merge_main(argv[1:]))
+    if argv and argv[0] == "worker":
+        worker_main(argv[1:])
+        return
+    
+    args = parse_args(argv)
+    
     print("=" * 80)
     print("🚀 STATIC SITE GENERATOR - PRODUCTION DEPLOYMENT")
     print("=" * 80)
@@ -25,8 +154,8 @@ def main():
     print("\n🔧 === STEP 0: CONFIGURATION ===")
     
     # Get basepath from command line arguments
-    if len(sys.argv) > 1:
-        basepath = sys.argv[1]
+    if args.basepath is not None:
+        basepath = args.basepath
         output_dir = "docs"  # Production build goes to docs
         build_type = "PRODUCTION"
     else:
@@ -37,93 +166,226 @@ def main():
     print(f"🏗️  Build type: {build_type}")
     print(f"🔗 Basepath: {basepath}")
     print(f"📁 Output directory: {output_dir}")
+    if args.block_workers > 1:
+        print(f"⚡ Block workers for large pages: {args.block_workers}")
     
-    # Step 1: Clean and prepare the output directory
-    print(f"\n📁 === STEP 1: PREPARE OUTPUT DIRECTORY ===")
+    version = generator_version()
+    block_cache = None if args.no_cache else BlockCache(args.cache_dir, version=version)
+    print(f"🗄️  Block cache: {'disabled' if block_cache is None else args.cache_dir} (generator {version})")
+    inline_cache = None
+    if args.inline_cache > 0:
+        inline_cache = InlineCache(args.inline_cache, args.inline_cache_mb * 1024 * 1024)
+        print(f"🧠 Inline cache: {args.inline_cache} entries, {args.inline_cache_mb} MB")
+    document_cache = None if args.no_cache else DocumentCache(args.cache_dir, inline_cache, version=version)
+    file_index = None if args.no_cache else FileIndex(args.cache_dir)
+    render_times = None if args.no_cache else RenderTimes(args.cache_dir)
+    if args.jobs > 1:
+        print(f"🗂️  Page processes: {args.jobs}")
+    if is_content_archive(args.content):
+        print(f"📚 Content: pages read from {args.content} without extracting it")
+    if args.incremental:
+        print(f"♻️  Incremental build: unchanged outputs are kept")
+    if args.git_changes:
+        # Watch the content the build actually reads, which --content may move
+        git_changes = GitChangeSource(pathspecs=(args.content, "static", "template.html"))
+        file_index.vcs_state = git_changes.snapshot()
+        file_index.changed_paths = git_changes.changed_since(file_index.previous_vcs_state, file_index.vcs_state)
+        if file_index.changed_paths is None:
+            print(f"🔀 Git changes: unavailable for this build, checking file stats instead")
+        else:
+            print(f"🔀 Git changes since {file_index.previous_vcs_state[0][:12]}: "
+                  f"{len(file_index.changed_paths)} changed inputs")
+    journal = None
+    if not args.no_cache and args.archive is None:
+        shard = args.shard_spec
+        journal = BuildJournal(journal_path(args.cache_dir, output_dir), {
+            "output": os.path.abspath(output_dir),
+            "basepath": basepath,
+            "generator": version,
+            "shard": f"{shard.index}/{shard.count}/{shard.strategy}" if shard is not None else None,
+        }, resume=args.resume)
+        if journal.previous:
+            print(f"⏩ Resuming: {len(journal.previous)} pages journaled by the interrupted build")
+        elif args.resume:
+            reason = "was for a different build" if journal.mismatch else "has no completed pages"
+            print(f"⏩ Nothing to resume: the journal {reason}; keeping the output and rebuilding every page")
+    publisher = None if args.in_place or args.archive else Publisher(output_dir)
+    build_dir = output_dir if publisher is None else publisher.staging_dir
+    # With an archive, output paths under build_dir only name the entries
+    archive = None if args.archive is None else ArchiveSink(args.archive, build_dir, args.fsync)
+    # Outputs identical to the published ones are kept rather than rewritten
+    output_writer = OutputWriter(build_dir, previous_dir=None if publisher is None else output_dir,
+                                 queue_size=args.write_queue, durability=args.fsync, sink=archive)
+    writes = f"background thread, up to {args.write_queue} queued" if output_writer.background else "rendering thread"
+    print(f"💾 Output writes: {writes}; fsync: {args.fsync}")
+    context = BuildContext(block_workers=args.block_workers, block_cache=block_cache,
+                           inline_cache=inline_cache, document_cache=document_cache,
+                           file_index=file_index, incremental=args.incremental, version=version,
+                           shard=args.shard_spec, render_times=render_times,
+                           cache_dir=None if args.no_cache else args.cache_dir, journal=journal,
+                           output_writer=output_writer)
+    if args.shard_spec is not None:
+        print(f"🧩 Shard {args.shard_spec.index}/{args.shard_spec.count} (by {args.shard_spec.strategy})")
     
-    if os.path.exists(output_dir):
-        print(f"🧹 Cleaning existing {output_dir} directory")
-        shutil.rmtree(output_dir)
-        print(f"✅ Removed existing directory: {output_dir}")
+    # Steps 1-5 run as a task graph: static assets and pages are built at
+    # the same time, and the checks start as soon as their inputs exist
     
-    print(f"📁 Creating fresh {output_dir} directory")
-    os.makedirs(output_dir, exist_ok=True)
-    print(f"✅ Created directory: {output_dir}")
+    def prepare_output():
+        # Step 1: Clean and prepare the output directory
+        print(f"\n📁 === STEP 1: PREPARE OUTPUT DIRECTORY ===")
+        
+        if archive is not None:
+            print(f"📦 Streaming the site into {args.archive}; {output_dir} is left as it is")
+            return
+        
+        if publisher is not None:
+            # Build beside the published site, which stays complete until the swap
+            reuse = args.incremental or args.resume
+            kept = args.resume and os.path.isdir(build_dir)
+            reused = publisher.prepare(reuse=reuse, keep=args.resume)
+            if reuse and not kept and file_index is not None:
+                # The hardlinked files are the recorded outputs, under a new name
+                file_index.move_outputs(output_dir, build_dir)
+            if kept:
+                print(f"⏩ Continuing in the interrupted build's staging directory")
+            print(f"📁 Building into staging directory {build_dir}"
+                  + (f" ({reused} files hardlinked from {output_dir})" if reused else ""))
+            return
+        
+        if os.path.exists(output_dir) and not (args.incremental or args.resume):
+            print(f"🧹 Cleaning existing {output_dir} directory")
+            shutil.rmtree(output_dir)
+            print(f"✅ Removed existing directory: {output_dir}")
+        
+        print(f"📁 Creating fresh {output_dir} directory")
+        os.makedirs(output_dir, exist_ok=True)
+        print(f"✅ Created directory: {output_dir}")
     
-    # Step 2: Copy static files
-    print("\n📋 === STEP 2: COPY STATIC ASSETS ===")
-    try:
-        copy_files_recursive("static", output_dir)
-        print("✅ Static files copied successfully")
-    except Exception as e:
-        print(f"❌ Error copying static files: {e}")
-        return
+    def copy_static():
+        # Step 2: Copy static files
+        print("\n📋 === STEP 2: COPY STATIC ASSETS ===")
+        try:
+            # Step 1 already prepared the output directory, and pages are being written into it
+            copy_files_recursive("static", build_dir, context, clean=False)
+            print("✅ Static files copied successfully")
+        except Exception as e:
+            print(f"❌ Error copying static files: {e}")
+            raise
     
-    # Step 3: Generate ALL pages recursively with basepath
-    print("\n🔄 === STEP 3: RECURSIVE PAGE GENERATION ===")
-    try:
-        generate_pages_recursive(
-            dir_path_content="content",
-            template_path="template.html", 
-            dest_dir_path=output_dir,
-            basepath=basepath
-        )
+    def generate_pages():
+        # Step 3: Generate ALL pages recursively with basepath
+        print("\n🔄 === STEP 3: RECURSIVE PAGE GENERATION ===")
+        if args.coordinator:
+            generate_pages_distributed(args.content, "template.html", build_dir, basepath, context,
+                                       address=args.coordinator, local_workers=args.local_workers)
+        elif args.threads > 1:
+            generate_pages_threaded(args.content, "template.html", build_dir, basepath, context,
+                                    threads=args.threads)
+        elif args.jobs > 1:
+            generate_pages_parallel(args.content, "template.html", build_dir, basepath, context, jobs=args.jobs)
+        else:
+            generate_pages_recursive(
+                dir_path_content=args.content,
+                template_path="template.html", 
+                dest_dir_path=build_dir,
+                basepath=basepath,
+                context=context
+            )
         print("✅ All pages generated recursively")
-    except Exception as e:
-        print(f"❌ Error during recursive page generation: {e}")
-        import traceback
-        traceback.print_exc()
-        return
     
-    # Step 4: Verify the generated site
-    print(f"\n🔍 === STEP 4: VERIFY GENERATED SITE ===")
-    try:
-        # Check that key files exist
-        expected_files = [
-            f"{output_dir}/index.html",
-            f"{output_dir}/blog/glorfindel/index.html", 
-            f"{output_dir}/blog/tom/index.html",
-            f"{output_dir}/blog/majesty/index.html",
-            f"{output_dir}/contact/index.html",
-            f"{output_dir}/index.css",
-            f"{output_dir}/images/tolkien.png"
-        ]
-        
-        print("📋 Checking expected files:")
-        for file_path in expected_files:
-            if os.path.exists(file_path):
-                file_size = os.path.getsize(file_path)
-                print(f"✅ {file_path} ({file_size} bytes)")
+    def flush_outputs():
+        # Every page and static file has been collected; stop the writer and apply the fsync policy
+        output_writer.close()
+        if output_writer.synced:
+            print(f"💾 Synced {output_writer.synced} written outputs to disk")
+    
+    def prune_outputs():
+        print(f"\n🧹 === PRUNE STALE OUTPUTS ===")
+        prune_stale_outputs(build_dir, file_index)
+    
+    def verify_site():
+        # Step 4: Verify the generated site
+        print(f"\n🔍 === STEP 4: VERIFY GENERATED SITE ===")
+        try:
+            # Check that key files exist
+            expected_files = [
+                f"{build_dir}/index.html",
+                f"{build_dir}/blog/glorfindel/index.html", 
+                f"{build_dir}/blog/tom/index.html",
+                f"{build_dir}/blog/majesty/index.html",
+                f"{build_dir}/contact/index.html",
+                f"{build_dir}/index.css",
+                f"{build_dir}/images/tolkien.png"
+            ]
+            
+            # An archive's entries, as the paths they were written under
+            entries = None
+            if archive is not None:
+                entries = {os.path.join(build_dir, *name.split("/")): size
+                           for name, size in archive.sizes.items()}
+            
+            print("📋 Checking expected files:")
+            for file_path in expected_files:
+                if entries is not None:
+                    if file_path in entries:
+                        print(f"✅ {file_path} ({entries[file_path]} bytes, in {args.archive})")
+                    else:
+                        print(f"❌ Missing from {args.archive}: {file_path}")
+                elif os.path.exists(file_path):
+                    file_size = os.path.getsize(file_path)
+                    print(f"✅ {file_path} ({file_size} bytes)")
+                elif args.shard_spec is not None and file_path.endswith(".html"):
+                    print(f"🧩 Built by another shard: {file_path}")
+                else:
+                    print(f"❌ Missing: {file_path}")
+            
+            # Show complete directory structure, collecting the pages in the same walk
+            html_files = []
+            if entries is not None:
+                print(f"\n📦 {args.archive}: {len(entries)} files, {sum(entries.values())} bytes "
+                      f"({os.path.getsize(args.archive)} bytes archived)")
+                html_files = [path for path in entries if path.endswith('.html')]
             else:
-                print(f"❌ Missing: {file_path}")
-        
-        # Show complete directory structure
-        print(f"\n📊 Complete generated site structure:")
-        for root, dirs, files in os.walk(output_dir):
-            level = root.replace(output_dir, "").count(os.sep)
-            indent = " " * 2 * level
-            print(f"{indent}📁 {os.path.basename(root)}/")
-            subindent = " " * 2 * (level + 1)
-            for file in files:
-                file_path = os.path.join(root, file)
-                file_size = os.path.getsize(file_path)
-                print(f"{subindent}📄 {file} ({file_size} bytes)")
-        
-        # Count total pages generated
-        html_files = []
-        for root, dirs, files in os.walk(output_dir):
-            for file in files:
-                if file.endswith('.html'):
-                    html_files.append(os.path.join(root, file))
-        
-        print(f"\n📊 Summary: {len(html_files)} HTML pages generated")
-        for html_file in html_files:
-            print(f"   🌐 {html_file}")
-        
+                print(f"\n📊 Complete generated site structure:")
+                for root, dirs, files in os.walk(build_dir):
+                    level = root.replace(build_dir, "").count(os.sep)
+                    indent = " " * 2 * level
+                    print(f"{indent}📁 {os.path.basename(root)}/")
+                    subindent = " " * 2 * (level + 1)
+                    for file in files:
+                        file_path = os.path.join(root, file)
+                        file_size = os.path.getsize(file_path)
+                        print(f"{subindent}📄 {file} ({file_size} bytes)")
+                        if file.endswith('.html'):
+                            html_files.append(file_path)
+            
+            print(f"\n📊 Summary: {len(html_files)} HTML pages generated")
+            for html_file in html_files:
+                print(f"   🌐 {html_file}")
+            
+            print(f"💾 Outputs: {output_writer.written} written, "
+                  f"{output_writer.unchanged} unchanged and left untouched")
+            if block_cache is not None:
+                print(f"🗄️  Block cache: {block_cache.hits} hits, {block_cache.misses} misses "
+                      f"({block_cache.hit_rate():.0%} hit rate)")
+            if document_cache is not None:
+                print(f"🌳 Document cache: {document_cache.hits} hits, {document_cache.misses} misses "
+                      f"({document_cache.hit_rate():.0%} hit rate)")
+            if file_index is not None:
+                print(f"📇 File index: {file_index.hashed} files hashed, "
+                      f"{file_index.unchanged} reused as unchanged")
+            if inline_cache is not None:
+                print(f"🧠 Inline cache: {inline_cache.hits} hits, {inline_cache.misses} misses "
+                      f"({inline_cache.hit_rate():.0%} hit rate), {len(inline_cache)} entries, "
+                      f"{inline_cache.evictions} evictions")
+        except Exception as e:
+            print(f"❌ Error during verification: {e}")
+    
+    def verify_basepath():
         # Verify basepath configuration in generated files
-        if build_type == "PRODUCTION":
-            print(f"\n🔗 Verifying basepath configuration:")
-            sample_file = f"{output_dir}/index.html"
+        print(f"\n🔗 Verifying basepath configuration:")
+        sample_file = f"{build_dir}/index.html"
+        try:
             if os.path.exists(sample_file):
                 with open(sample_file, 'r') as f:
                     content = f.read()
@@ -131,24 +393,90 @@ def main():
                     print(f"✅ Basepath {basepath} correctly applied to links")
                 else:
                     print(f"⚠️  Basepath may not be applied correctly")
-                
-    except Exception as e:
-        print(f"❌ Error during verification: {e}")
+        except Exception as e:
+            print(f"❌ Error during verification: {e}")
+    
+    def publish_output():
+        # Step 6: Swap the finished build into place
+        print(f"\n🚚 === STEP 6: PUBLISH ===")
+        method = publisher.publish()
+        if file_index is not None:
+            file_index.move_outputs(build_dir, output_dir)
+        swap = "atomically exchanged with" if method == "exchange" else "renamed to"
+        print(f"✅ {build_dir} {swap} {output_dir}; removing the previous output in the background")
+    
+    def verify_system():
+        # Step 5: System verification
+        print("\n🔧 === STEP 5: SYSTEM VERIFICATION ===")
+        try:
+            # Quick markdown conversion test
+            test_md = "# Test Page\n\nThis has **bold** text."
+            html_result = markdown_to_html_node(test_md)
+            print("✅ Markdown conversion system working")
+            
+            # Quick HTML generation test
+            paragraph = ParentNode("p", [LeafNode("b", "Bold"), LeafNode(None, " text")])
+            print("✅ HTML generation system working")
+            
+        except Exception as e:
+            print(f"❌ System verification failed: {e}")
+    
+    graph = TaskGraph()
+    graph.add("prepare", prepare_output)
+    graph.add("static", copy_static, deps=["prepare"])
+    graph.add("pages", generate_pages, deps=["prepare"])
+    graph.add("flush", flush_outputs, deps=["static", "pages"])
+    if (args.incremental or args.resume) and file_index is not None:
+        # The output was kept: remove what no longer has a source instead of clearing it
+        graph.add("prune", prune_outputs, deps=["flush"])
+        graph.add("verify", verify_site, deps=["prune"])
+    else:
+        graph.add("verify", verify_site, deps=["flush"])
+    if build_type == "PRODUCTION":
+        graph.add("basepath", verify_basepath, deps=["pages"])
+    graph.add("system", verify_system)
+    if publisher is not None:
+        graph.add("publish", publish_output, deps=["verify", "basepath"] if build_type == "PRODUCTION" else ["verify"])
     
-    # Step 5: System verification
-    print("\n🔧 === STEP 5: SYSTEM VERIFICATION ===")
     try:
-        # Quick markdown conversion test
-        test_md = "# Test Page\n\nThis has **bold** text."
-        html_result = markdown_to_html_node(test_md)
-        print("✅ Markdown conversion system working")
-        
-        # Quick HTML generation test
-        paragraph = ParentNode("p", [LeafNode("b", "Bold"), LeafNode(None, " text")])
-        print("✅ HTML generation system working")
-        
-    except Exception as e:
-        print(f"❌ System verification failed: {e}")
+        succeeded = graph.run(workers=args.task_workers)
+    finally:
+        # Already closed by the flush task unless the build failed: then an archive is discarded
+        output_writer.close(commit=False)
+        # Persist the cache indexes even if generation failed part-way
+        for cache in (block_cache, document_cache):
+            if cache is not None:
+                cache.close()
+        if file_index is not None:
+            file_index.save()
+        if render_times is not None:
+            render_times.save()
+        if journal is not None:
+            # Kept unless the build succeeds, for a later --resume
+            journal.close()
+        if not args.no_cache:
+            record_build(args.cache_dir,
+                         block_cache.hits + document_cache.hits,
+                         block_cache.misses + document_cache.misses)
+            evicted, freed = collect_garbage(args.cache_dir, args.cache_max_mb * 1024 * 1024)
+            if evicted:
+                print(f"🧹 Cache over {args.cache_max_mb} MB: evicted {evicted} entries ({freed} bytes)")
+    
+    print()
+    graph.report()
+    if publisher is not None:
+        publisher.wait()
+    if not succeeded:
+        print("❌ Build failed")
+        if publisher is not None:
+            print(f"📁 {output_dir} was left as it was; the partial build is in {build_dir}")
+        if archive is not None:
+            print(f"📦 {args.archive} was not written")
+        if journal is not None:
+            print(f"⏩ Completed pages are journaled; rerun with --resume to continue")
+        return
+    if journal is not None:
+        journal.complete()
     
     print("\n" + "=" * 80)
     if build_type == "PRODUCTION":
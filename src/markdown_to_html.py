@@ -4,22 +4,32 @@ from leafnode import LeafNode
 from parentnode import ParentNode
 from text_to_html import text_node_to_html_node
 from text_to_textnodes import text_to_textnodes
-from markdown_to_blocks import markdown_to_blocks
-from block_type import BlockType, block_to_block_type
+from block_type import BlockType
+from block_parser import parse_blocks
+from parallel_render import should_render_in_parallel, iter_chunks, ordered_parallel_map
 
 
-def markdown_to_html_node(markdown):
+def markdown_to_html_node(markdown, workers=None, cache=None, inline_cache=None):
     """
     Convert a full markdown document into a single parent HTMLNode.
     
+    When workers is given and the document is larger than
+    PARALLEL_THRESHOLD_CHARS, chunks of blocks are rendered in a process pool.
+    When a BlockCache is given, unchanged blocks are looked up instead of
+    rendered. In both cases the div's children are raw-HTML leaf nodes and
+    to_html() returns byte-identical output.
+    
     Args:
         markdown (str): Raw markdown text representing a full document
+        workers (int, optional): Worker processes for block-level rendering
+        cache (BlockCache, optional): Persistent cache of rendered blocks
+        inline_cache (InlineCache, optional): LRU cache of inline parses
         
     Returns:
         ParentNode: A div containing all the converted HTML blocks
     """
-    # Step 1: Split markdown into blocks
-    blocks = markdown_to_blocks(markdown)
+    # Step 1: Split and classify the document in a single pass
+    blocks = parse_blocks(markdown)
     
     # Handle empty markdown - create div with empty paragraph
     if not blocks:
@@ -27,35 +37,159 @@ def markdown_to_html_node(markdown):
         return ParentNode("div", [empty_paragraph])
     
     # Step 2: Convert each block to an HTMLNode
-    block_nodes = []
-    for block in blocks:
-        # Determine the type of this block
-        block_type = block_to_block_type(block)
+    if not should_render_in_parallel(len(markdown), workers):
+        workers = None
+    if workers or cache is not None:
+        block_nodes = [LeafNode(None, html) for html in _iter_block_html(blocks, workers, cache, inline_cache)]
+    else:
+        block_nodes = [block_to_html_node(block_type, lines, inline_cache) for block_type, lines in blocks]
+    
+    # Step 3: Wrap all blocks in a parent div
+    return ParentNode("div", block_nodes)
+
+
+def iter_html_chunks(blocks, workers=None, cache=None, inline_cache=None):
+    """
+    Render a stream of parsed blocks to HTML one block at a time.
+    
+    Joining the yielded strings gives exactly markdown_to_html_node(...).to_html(),
+    but only one block's nodes are alive at any moment, so it can be fed
+    straight from iter_blocks() and written out as it goes.
+    
+    Args:
+        blocks (iterable[tuple[BlockType, list[str]]]): Parsed blocks
+        workers (int, optional): Render chunks of blocks in this many processes
+        cache (BlockCache, optional): Persistent cache of rendered blocks
+        inline_cache (InlineCache, optional): LRU cache of inline parses
         
-        # Convert block to appropriate HTMLNode based on type
-        if block_type == BlockType.PARAGRAPH:
-            block_node = paragraph_to_html_node(block)
-        elif block_type == BlockType.HEADING:
-            block_node = heading_to_html_node(block)
-        elif block_type == BlockType.CODE:
-            block_node = code_to_html_node(block)
-        elif block_type == BlockType.QUOTE:
-            block_node = quote_to_html_node(block)
-        elif block_type == BlockType.UNORDERED_LIST:
-            block_node = unordered_list_to_html_node(block)
-        elif block_type == BlockType.ORDERED_LIST:
-            block_node = ordered_list_to_html_node(block)
+    Yields:
+        str: HTML fragments in document order
+    """
+    yield "<div>"
+    
+    empty = True
+    for html in _iter_block_html(blocks, workers, cache, inline_cache):
+        empty = False
+        yield html
+    
+    # Handle empty markdown - same empty paragraph as markdown_to_html_node
+    if empty:
+        yield "<p></p>"
+    
+    yield "</div>"
+
+
+def _iter_block_html(blocks, workers=None, cache=None, inline_cache=None):
+    """
+    Yield the HTML of blocks in order, one string per block or per chunk.
+    
+    The inline cache lives in this process only; worker processes parse
+    inline text without it.
+    """
+    parallel = workers and workers > 1
+    
+    if cache is None:
+        if parallel:
+            yield from ordered_parallel_map(render_block_chunk, iter_chunks(blocks), workers)
+        else:
+            for block_type, lines in blocks:
+                yield block_to_html_node(block_type, lines, inline_cache).to_html()
+        return
+    
+    if parallel:
+        # Look up every block here, send only the misses' text to the workers
+        tasks = (_lookup_chunk(cache, chunk) for chunk in iter_chunks(blocks))
+        for results in ordered_parallel_map(render_cached_chunk, tasks, workers):
+            for key, html, rendered in results:
+                if rendered:
+                    cache.put(key, html)
+                yield html
+        return
+    
+    for block_type, lines in blocks:
+        key = cache.key(block_type, lines)
+        html = cache.get(key)
+        if html is None:
+            html = block_to_html_node(block_type, lines, inline_cache).to_html()
+            cache.put(key, html)
+        yield html
+
+
+def _lookup_chunk(cache, chunk):
+    entries = []
+    for block_type, lines in chunk:
+        key = cache.key(block_type, lines)
+        html = cache.get(key)
+        if html is None:
+            entries.append((key, block_type, lines, None))
         else:
-            # Fallback to paragraph for unknown types
-            block_node = paragraph_to_html_node(block)
+            entries.append((key, None, None, html))
+    return entries
+
+
+def render_block_chunk(blocks):
+    """
+    Render a list of parsed blocks to a single HTML string.
+    
+    Module-level so it can be pickled and run in a worker process.
+    
+    Args:
+        blocks (list[tuple[BlockType, list[str]]]): Parsed blocks
         
-        block_nodes.append(block_node)
+    Returns:
+        str: The concatenated HTML of the blocks
+    """
+    return "".join(block_to_html_node(block_type, lines).to_html() for block_type, lines in blocks)
+
+
+def render_cached_chunk(entries):
+    """
+    Render the cache misses of a chunk in a worker process.
     
-    # Step 3: Wrap all blocks in a parent div
-    return ParentNode("div", block_nodes)
+    Args:
+        entries (list[tuple]): (key, block_type, lines, cached_html) per block,
+            where cached_html is None for blocks that still need rendering
+        
+    Returns:
+        list[tuple[str, str, bool]]: (key, html, was_rendered) per block
+    """
+    results = []
+    for key, block_type, lines, html in entries:
+        if html is None:
+            results.append((key, block_to_html_node(block_type, lines).to_html(), True))
+        else:
+            results.append((key, html, False))
+    return results
 
 
-def text_to_children(text):
+def block_to_html_node(block_type, lines, inline_cache=None):
+    """
+    Convert one already-split block to an HTMLNode.
+    
+    Args:
+        block_type (BlockType): The type of the block
+        lines (list[str]): The lines of the block, as produced by the block parser
+        inline_cache (InlineCache, optional): LRU cache of inline parses
+        
+    Returns:
+        HTMLNode: The HTML node for the block
+    """
+    if block_type == BlockType.HEADING:
+        return _heading_lines_to_html_node(lines, inline_cache)
+    elif block_type == BlockType.CODE:
+        return _code_lines_to_html_node(lines)
+    elif block_type == BlockType.QUOTE:
+        return _quote_lines_to_html_node(lines, inline_cache)
+    elif block_type == BlockType.UNORDERED_LIST:
+        return _unordered_list_lines_to_html_node(lines, inline_cache)
+    elif block_type == BlockType.ORDERED_LIST:
+        return _ordered_list_lines_to_html_node(lines, inline_cache)
+    else:
+        # Paragraphs and unknown types
+        return _paragraph_lines_to_html_node(lines, inline_cache)
+
+
+def text_to_children(text, inline_cache=None):
     """
     Convert text with inline markdown to a list of HTMLNode children.
     
@@ -63,12 +197,16 @@ def text_to_children(text):
     
     Args:
         text (str): Text that may contain inline markdown
+        inline_cache (InlineCache, optional): LRU cache of inline parses
         
     Returns:
         list[HTMLNode]: List of HTMLNode objects representing the inline content
     """
     # Use existing pipeline: text -> TextNodes -> HTMLNodes
-    text_nodes = text_to_textnodes(text)
+    if inline_cache is not None:
+        text_nodes = inline_cache.text_to_textnodes(text)
+    else:
+        text_nodes = text_to_textnodes(text)
     return [text_node_to_html_node(node) for node in text_nodes]
 
 
@@ -82,10 +220,7 @@ def paragraph_to_html_node(block):
     Returns:
         ParentNode: A <p> tag containing the paragraph content
     """
-    # Convert newlines within paragraph to spaces (standard markdown behavior)
-    paragraph_text = block.replace('\n', ' ')
-    children = text_to_children(paragraph_text)
-    return ParentNode("p", children)
+    return _paragraph_lines_to_html_node(block.split('\n'))
 
 
 def heading_to_html_node(block):
@@ -98,21 +233,7 @@ def heading_to_html_node(block):
     Returns:
         ParentNode: An <h1> through <h6> tag containing the heading content
     """
-    # Count the number of # characters to determine heading level
-    level = 0
-    for char in block:
-        if char == '#':
-            level += 1
-        else:
-            break
-    
-    # Extract the heading text (everything after "# ")
-    heading_text = block[level + 1:]  # +1 to skip the space after #
-    
-    # Convert inline markdown in the heading text
-    children = text_to_children(heading_text)
-    
-    return ParentNode(f"h{level}", children)
+    return _heading_lines_to_html_node(block.split('\n'))
 
 
 def code_to_html_node(block):
@@ -127,9 +248,74 @@ def code_to_html_node(block):
     Returns:
         ParentNode: A <pre><code> structure containing the raw code
     """
-    # Split into lines
-    lines = block.split('\n')
+    return _code_lines_to_html_node(block.split('\n'))
+
+
+def quote_to_html_node(block):
+    """
+    Convert a quote block to an HTMLNode.
     
+    Args:
+        block (str): Quote block text with > prefixes
+        
+    Returns:
+        ParentNode: A <blockquote> tag containing the quote content
+    """
+    return _quote_lines_to_html_node(block.split('\n'))
+
+
+def unordered_list_to_html_node(block):
+    """
+    Convert an unordered list block to an HTMLNode.
+    
+    Args:
+        block (str): Unordered list block text with - prefixes
+        
+    Returns:
+        ParentNode: A <ul> tag containing <li> elements
+    """
+    return _unordered_list_lines_to_html_node(block.split('\n'))
+
+
+def ordered_list_to_html_node(block):
+    """
+    Convert an ordered list block to an HTMLNode.
+    
+    Args:
+        block (str): Ordered list block text with number prefixes
+        
+    Returns:
+        ParentNode: An <ol> tag containing <li> elements
+    """
+    return _ordered_list_lines_to_html_node(block.split('\n'))
+
+
+def _paragraph_lines_to_html_node(lines, inline_cache=None):
+    # Convert newlines within paragraph to spaces (standard markdown behavior)
+    paragraph_text = ' '.join(lines)
+    children = text_to_children(paragraph_text, inline_cache)
+    return ParentNode("p", children)
+
+
+def _heading_lines_to_html_node(lines, inline_cache=None):
+    # Count the number of # characters to determine heading level
+    level = 0
+    for char in lines[0]:
+        if char == '#':
+            level += 1
+        else:
+            break
+    
+    # Extract the heading text (everything after "# ")
+    heading_text = '\n'.join(lines)[level + 1:]  # +1 to skip the space after #
+    
+    # Convert inline markdown in the heading text
+    children = text_to_children(heading_text, inline_cache)
+    
+    return ParentNode(f"h{level}", children)
+
+
+def _code_lines_to_html_node(lines):
     # Remove the opening ``` line (first line) and closing ``` line (last line)
     # Keep everything in between, including empty lines
     if len(lines) >= 3:  # At least opening, content, closing
@@ -155,18 +341,8 @@ def code_to_html_node(block):
     return ParentNode("pre", [code_node])
 
 
-def quote_to_html_node(block):
-    """
-    Convert a quote block to an HTMLNode.
-    
-    Args:
-        block (str): Quote block text with > prefixes
-        
-    Returns:
-        ParentNode: A <blockquote> tag containing the quote content
-    """
+def _quote_lines_to_html_node(lines, inline_cache=None):
     # Remove the > prefix from each line
-    lines = block.split('\n')
     quote_lines = []
     for line in lines:
         # Remove the > and any following space
@@ -178,52 +354,32 @@ def quote_to_html_node(block):
             quote_lines.append(line)  # Shouldn't happen in valid quote
     
     quote_text = '\n'.join(quote_lines)
-    children = text_to_children(quote_text)
+    children = text_to_children(quote_text, inline_cache)
     
     return ParentNode("blockquote", children)
 
 
-def unordered_list_to_html_node(block):
-    """
-    Convert an unordered list block to an HTMLNode.
-    
-    Args:
-        block (str): Unordered list block text with - prefixes
-        
-    Returns:
-        ParentNode: A <ul> tag containing <li> elements
-    """
-    lines = block.split('\n')
+def _unordered_list_lines_to_html_node(lines, inline_cache=None):
     list_items = []
     
     for line in lines:
         # Remove the "- " prefix
         item_text = line[2:]  # Remove "- "
-        item_children = text_to_children(item_text)
+        item_children = text_to_children(item_text, inline_cache)
         list_item = ParentNode("li", item_children)
         list_items.append(list_item)
     
     return ParentNode("ul", list_items)
 
 
-def ordered_list_to_html_node(block):
-    """
-    Convert an ordered list block to an HTMLNode.
-    
-    Args:
-        block (str): Ordered list block text with number prefixes
-        
-    Returns:
-        ParentNode: An <ol> tag containing <li> elements
-    """
-    lines = block.split('\n')
+def _ordered_list_lines_to_html_node(lines, inline_cache=None):
     list_items = []
     
     for line in lines:
         # Find the ". " and remove everything up to and including it
         dot_index = line.find('. ')
         item_text = line[dot_index + 2:]  # Remove "1. " or "2. " etc.
-        item_children = text_to_children(item_text)
+        item_children = text_to_children(item_text, inline_cache)
         list_item = ParentNode("li", item_children)
         list_items.append(list_item)
     
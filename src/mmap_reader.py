@@ -0,0 +1,93 @@
+import os
+import mmap
+from contextlib import contextmanager
+
+
+# Target size of the text decoded at once by iter_mapped_lines()
+SEGMENT_BYTES = 256 * 1024
+
+
+@contextmanager
+def map_file(path):
+    """
+    Map a file read-only for the duration of a with block.
+
+    The mapping is backed by the page cache, so hashing, copying or
+    scanning it doesn't allocate a copy of the file. Empty files (which
+    can't be mapped) and filesystems without mmap support yield bytes.
+
+    Args:
+        path (str): Path to the file
+
+    Yields:
+        mmap.mmap or bytes: The file contents
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""
+            return
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            yield f.read()
+            return
+        with mapped:
+            yield mapped
+
+
+def iter_segments(data, segment_bytes=SEGMENT_BYTES):
+    """
+    Split raw markdown bytes into decoded segments of whole blocks.
+
+    Segment boundaries are found on the raw bytes: the last blank line
+    before segment_bytes, or the last line break if a single block is
+    longer than that. Only one segment is decoded at a time, and newlines
+    are normalized as text-mode open() would.
+
+    Args:
+        data (bytes or mmap.mmap): UTF-8 encoded markdown
+        segment_bytes (int): Target segment size in bytes
+
+    Yields:
+        str: Decoded text; every segment but the last ends with a newline
+    """
+    size = len(data)
+    start = 0
+    while start < size:
+        end = start + segment_bytes
+        if end >= size:
+            end = size
+        else:
+            cut = data.rfind(b"\n\n", start, end)
+            if cut == -1:
+                cut = data.rfind(b"\n", start, end)
+            if cut == -1:
+                # One line longer than a segment - take it whole
+                cut = data.find(b"\n", end)
+                if cut == -1:
+                    cut = size - 1
+            end = cut + 1
+
+        text = str(data[start:end], 'utf-8')
+        yield text.replace('\r\n', '\n').replace('\r', '\n')
+        start = end
+
+
+def iter_mapped_lines(data, segment_bytes=SEGMENT_BYTES):
+    """
+    Generate the lines of raw markdown bytes without trailing newlines.
+
+    Produces the same lines as iterating over the file in text mode and
+    stripping each '\\n', so the result can feed iter_parsed_blocks().
+
+    Args:
+        data (bytes or mmap.mmap): UTF-8 encoded markdown
+        segment_bytes (int): Target size of each decoded segment
+
+    Yields:
+        str: Each line of the document
+    """
+    for text in iter_segments(data, segment_bytes):
+        if text.endswith('\n'):
+            text = text[:-1]
+        yield from text.split('\n')
@@ -0,0 +1,438 @@
+import io
+import os
+import time
+import shutil
+import tarfile
+import zipfile
+import tempfile
+import threading
+
+from mmap_reader import map_file
+
+
+# Bytes compared at a time when checking an output against its new contents
+COMPARE_CHUNK_BYTES = 1024 * 1024
+
+# When output files are flushed to disk:
+#   none      leave it to the OS (fastest; a crash may lose recent outputs)
+#   end       fsync every written file once, when the sink is closed
+#   per-file  fsync each file and its directory before moving on
+DURABILITY_POLICIES = ("none", "end", "per-file")
+
+# Archive name suffix -> tarfile stream mode, or "zip"
+ARCHIVE_FORMATS = {
+    ".zip": "zip",
+    ".tar": "w|",
+    ".tar.gz": "w|gz",
+    ".tgz": "w|gz",
+    ".tar.bz2": "w|bz2",
+    ".tar.xz": "w|xz",
+}
+
+
+class DirectorySink:
+    """
+    Outputs as files in a directory tree (the default sink).
+
+    Every sink takes the same output paths (under the build directory) and
+    has the same methods: make_dir, write, write_file, temp_path and close.
+    on_disk tells callers whether the outputs can be found at those paths
+    afterwards, for the file index, build journal and shard manifest.
+
+    A new output is compared with the file already at its destination
+    (size first, then bytes) and, if identical, that file is kept as it is,
+    so its mtime and inode don't change. When the build writes into a fresh
+    staging directory, previous_dir is the published output: an output
+    identical to the published file at the same path becomes a hardlink to
+    it. Files are always replaced (temporary file, then rename), never
+    rewritten, since they may be hardlinks into the published output.
+    """
+
+    on_disk = True
+
+    def __init__(self, root=None, previous_dir=None, durability="none"):
+        """
+        Args:
+            root (str, optional): Directory the build writes into
+            previous_dir (str, optional): Previously published output to
+                reuse identical files from, when it isn't root
+            durability (str): One of DURABILITY_POLICIES
+
+        Raises:
+            ValueError: If the durability policy is unknown
+        """
+        if durability not in DURABILITY_POLICIES:
+            raise ValueError(f"Unknown durability policy: {durability}")
+        self.root = root
+        self.previous_dir = previous_dir
+        self.durability = durability
+        self.synced = 0
+        self._lock = threading.Lock()
+        self._unsynced = []  # written paths, for the "end" policy
+
+    def make_dir(self, path):
+        """
+        Args:
+            path (str): Output directory
+
+        Returns:
+            bool: True if it had to be created
+        """
+        if os.path.isdir(path):
+            return False
+        os.makedirs(path, exist_ok=True)
+        return True
+
+    def temp_path(self, path):
+        """
+        Args:
+            path (str): Output path
+
+        Returns:
+            str: Where to stream the output before write_file() puts it in place
+        """
+        return path + ".tmp"
+
+    def write(self, path, data, stat_source=None):
+        """
+        Write bytes to an output unless it already holds exactly those bytes.
+
+        Args:
+            path (str): Output path; its directory must exist
+            data (bytes or mmap.mmap): New contents
+            stat_source (str, optional): File whose mode and times a written
+                output takes (as shutil.copystat)
+
+        Returns:
+            bool: True if the output was written, False if it was kept
+        """
+        if self._keep_existing(path, data):
+            return False
+        temp_path = path + ".tmp"
+        try:
+            with open(temp_path, 'wb') as out:
+                out.write(data)
+                if self.durability == "per-file":
+                    out.flush()
+                    os.fsync(out.fileno())
+            if stat_source is not None:
+                shutil.copystat(stat_source, temp_path)
+            os.replace(temp_path, path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        self._written(path)
+        return True
+
+    def write_file(self, temp_path, path):
+        """
+        Move a finished temporary file into place unless the output is unchanged.
+
+        Args:
+            temp_path (str): Completely written new contents, from temp_path()
+            path (str): Output path
+
+        Returns:
+            bool: True if the output was written, False if it was kept
+        """
+        with map_file(temp_path) as data:
+            kept = self._keep_existing(path, data)
+        if kept:
+            os.remove(temp_path)
+            return False
+        if self.durability == "per-file":
+            _fsync_path(temp_path)
+        os.replace(temp_path, path)
+        self._written(path)
+        return True
+
+    def close(self, commit=True):
+        """
+        With the "end" policy, fsync everything written.
+
+        Args:
+            commit (bool): Unused; the files are already in place
+        """
+        with self._lock:
+            paths, self._unsynced = self._unsynced, []
+        if not paths:
+            return
+        for path in paths:
+            _fsync_path(path)
+        for directory in {os.path.dirname(path) or "." for path in paths}:
+            _fsync_path(directory)
+        with self._lock:
+            self.synced += len(paths)
+
+    def _written(self, path):
+        if self.durability == "per-file":
+            _fsync_path(os.path.dirname(path) or ".")
+        elif self.durability == "end":
+            with self._lock:
+                self._unsynced.append(path)
+
+    def _keep_existing(self, path, data):
+        # True if path now holds data without having been written
+        if _same_contents(path, data):
+            return True
+        previous_path = self._previous_path(path)
+        if previous_path is None or not _same_contents(previous_path, data):
+            return False
+        link_path = path + ".link"
+        try:
+            os.link(previous_path, link_path)
+        except OSError:
+            return False  # another filesystem, no hardlinks: write it after all
+        os.replace(link_path, path)
+        return True
+
+    def _previous_path(self, path):
+        if self.previous_dir is None or self.root is None:
+            return None
+        rel_path = os.path.relpath(path, self.root)
+        if rel_path.startswith(os.pardir):
+            return None
+        return os.path.join(self.previous_dir, rel_path)
+
+
+class MemorySink:
+    """
+    Outputs kept in a dict, for tests and for embedding the generator.
+
+    Nothing is written to disk: files maps each output's path relative to
+    root ('/'-separated) to its bytes.
+    """
+
+    on_disk = False
+
+    def __init__(self, root=""):
+        """
+        Args:
+            root (str): Build directory the output paths are given under
+        """
+        self.root = root
+        self.files = {}
+        self.dirs = set()
+        self.synced = 0
+        self._lock = threading.Lock()
+
+    def make_dir(self, path):
+        """Record an output directory; see DirectorySink.make_dir()"""
+        name = _entry_name(path, self.root)
+        with self._lock:
+            if name is None or name in self.dirs:
+                return False
+            self.dirs.add(name)
+            return True
+
+    def temp_path(self, path):
+        """A scratch file outside the build directory; see DirectorySink.temp_path()"""
+        return _scratch_file()
+
+    def write(self, path, data, stat_source=None):
+        """Store an output; False if it already held the same bytes"""
+        name = _entry_name(path, self.root)
+        data = bytes(data)
+        with self._lock:
+            if self.files.get(name) == data:
+                return False
+            self.files[name] = data
+            return True
+
+    def write_file(self, temp_path, path):
+        """Store a finished scratch file's contents, then delete it"""
+        try:
+            with map_file(temp_path) as data:
+                return self.write(path, data)
+        finally:
+            os.remove(temp_path)
+
+    def close(self, commit=True):
+        """Nothing to finish: every output is already in files"""
+
+    def read(self, name):
+        """
+        Args:
+            name (str): Output path relative to root, e.g. "blog/post.html"
+
+        Returns:
+            str: The output decoded as UTF-8
+        """
+        return self.files[name].decode('utf-8')
+
+
+class ArchiveSink:
+    """
+    Outputs streamed straight into a tar or zip archive, e.g. a deploy artifact.
+
+    Entries are appended as they are written, so the site is never written
+    out as a tree and read back. The archive is built under a temporary
+    name and renamed into place by close(), so a failed build leaves no
+    partial archive. A tar archive is compressed as a stream, per the name's
+    suffix (see ARCHIVE_FORMATS).
+    """
+
+    on_disk = False
+
+    def __init__(self, path, root="", durability="none"):
+        """
+        Args:
+            path (str): Archive to create, e.g. "site.tar.gz" or "site.zip"
+            root (str): Build directory the output paths are given under
+            durability (str): Anything but "none" fsyncs the archive on close
+
+        Raises:
+            ValueError: If the archive suffix or durability policy is unknown
+        """
+        self.format = archive_format(path)
+        if durability not in DURABILITY_POLICIES:
+            raise ValueError(f"Unknown durability policy: {durability}")
+        self.path = path
+        self.root = root
+        self.durability = durability
+        self.synced = 0
+        self.sizes = {}  # entry name -> size, in the order written
+        self.mtime = time.time()  # for entries with no source file
+        self._dirs = set()
+        self._lock = threading.Lock()
+        self._temp_path = f"{path}.{os.getpid()}.tmp"
+        if self.format == "zip":
+            self._archive = zipfile.ZipFile(self._temp_path, 'w', zipfile.ZIP_DEFLATED)
+        else:
+            self._archive = tarfile.open(self._temp_path, self.format)
+
+    def make_dir(self, path):
+        """Add a directory entry, so empty directories survive; see DirectorySink.make_dir()"""
+        name = _entry_name(path, self.root)
+        with self._lock:
+            if name is None or name in self._dirs:
+                return False
+            self._dirs.add(name)
+            if self.format == "zip":
+                info = _zip_info(name + "/", self.mtime, 0o40755)
+                info.external_attr |= 0x10  # MS-DOS directory flag
+                self._archive.writestr(info, b"")
+            else:
+                info = tarfile.TarInfo(name)
+                info.type = tarfile.DIRTYPE
+                info.mode = 0o755
+                info.mtime = self.mtime
+                self._archive.addfile(info)
+        return True
+
+    def temp_path(self, path):
+        """A scratch file outside the build directory; see DirectorySink.temp_path()"""
+        return _scratch_file()
+
+    def write(self, path, data, stat_source=None):
+        """Append an entry; returns True, as an archive has no previous contents"""
+        name = _entry_name(path, self.root)
+        mode, mtime = 0o644, self.mtime
+        if stat_source is not None:
+            stat = os.stat(stat_source)
+            mode, mtime = stat.st_mode & 0o777, stat.st_mtime
+        with self._lock:
+            if self.format == "zip":
+                info = _zip_info(name, mtime, 0o100000 | mode)
+                info.file_size = len(data)
+                with self._archive.open(info, 'w') as out:
+                    out.write(data)
+            else:
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                info.mode = mode
+                info.mtime = mtime
+                # bytes are wrapped without a copy; a mapped file is read directly
+                self._archive.addfile(info, io.BytesIO(data) if isinstance(data, bytes) else data)
+            self.sizes[name] = len(data)
+        return True
+
+    def write_file(self, temp_path, path):
+        """Store a finished scratch file's contents, then delete it"""
+        try:
+            with map_file(temp_path) as data:
+                return self.write(path, data)
+        finally:
+            os.remove(temp_path)
+
+    def close(self, commit=True):
+        """
+        Finish the archive and move it into place.
+
+        Args:
+            commit (bool): False discards the archive instead (a failed build)
+        """
+        with self._lock:
+            if self._archive is None:
+                return
+            self._archive.close()
+            self._archive = None
+        if not commit:
+            os.remove(self._temp_path)
+            return
+        if self.durability != "none":
+            _fsync_path(self._temp_path)
+            self.synced += 1
+        os.replace(self._temp_path, self.path)
+
+
+def archive_format(path):
+    """
+    Args:
+        path (str): Archive file name
+
+    Returns:
+        str: "zip", or the tarfile stream mode for the suffix
+
+    Raises:
+        ValueError: If the suffix isn't one of ARCHIVE_FORMATS
+    """
+    for suffix, mode in ARCHIVE_FORMATS.items():
+        if path.endswith(suffix):
+            return mode
+    raise ValueError(f"Unknown archive type: {path} (use one of {', '.join(ARCHIVE_FORMATS)})")
+
+
+def _entry_name(path, root):
+    # '/'-separated path relative to the build directory; None for the directory itself
+    name = os.path.relpath(path, root or os.curdir).replace(os.sep, "/")
+    return None if name == "." else name
+
+
+def _zip_info(name, mtime, mode):
+    # Zip timestamps start in 1980
+    info = zipfile.ZipInfo(name, date_time=time.localtime(max(mtime, 315532800))[:6])
+    info.external_attr = mode << 16
+    info.compress_type = zipfile.ZIP_DEFLATED
+    return info
+
+
+def _scratch_file():
+    # Large pages are streamed here when the sink has no directory to hold them
+    fd, path = tempfile.mkstemp(suffix=".tmp", prefix="page-")
+    os.close(fd)
+    return path
+
+
+def _same_contents(path, data):
+    try:
+        if os.path.getsize(path) != len(data):
+            return False
+        with map_file(path) as existing:
+            for start in range(0, len(data), COMPARE_CHUNK_BYTES):
+                end = start + COMPARE_CHUNK_BYTES
+                if existing[start:end] != data[start:end]:
+                    return False
+    except OSError:
+        return False
+    return True
+
+
+def _fsync_path(path):
+    # Files and directories alike: a directory's fsync makes renames in it durable
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
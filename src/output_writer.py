@@ -0,0 +1,233 @@
+import os
+import queue
+import threading
+from concurrent.futures import Future
+
+from mmap_reader import map_file
+from output_sink import DirectorySink, DURABILITY_POLICIES
+
+
+# Writes waiting for the background thread; renderers block when it is full,
+# which bounds the memory held by queued pages
+DEFAULT_QUEUE_SIZE = 64
+
+
+class OutputWriter:
+    """
+    Put finished output files in place through an output sink.
+
+    The sink decides where outputs go: a directory tree (DirectorySink,
+    the default, which leaves unchanged files untouched), a dict in memory
+    (MemorySink) or a tar or zip archive (ArchiveSink); see output_sink.
+
+    With a queue_size, submitted writes are done by a background thread so
+    comparing and writing outputs overlaps rendering the next page; the
+    caller collects each outcome with take(). Without one, submit() writes
+    before returning. Directories created through ensure_dir() are
+    remembered, so each is checked once per build.
+
+    Shared by every thread of a build; its state is locked.
+    """
+
+    def __init__(self, build_dir=None, previous_dir=None, queue_size=0, durability="none", sink=None):
+        """
+        Args:
+            build_dir (str, optional): Directory the build writes into
+            previous_dir (str, optional): Previously published output to
+                reuse identical files from, when it isn't build_dir
+            queue_size (int): Writes that may wait for the background
+                thread; 0 writes on the calling thread instead
+            durability (str): One of DURABILITY_POLICIES
+            sink (optional): Where outputs go (default: a DirectorySink
+                for build_dir, previous_dir and durability)
+
+        Raises:
+            ValueError: If the durability policy is unknown
+        """
+        if durability not in DURABILITY_POLICIES:
+            raise ValueError(f"Unknown durability policy: {durability}")
+        self.build_dir = build_dir
+        self.previous_dir = previous_dir
+        self.durability = durability
+        self.sink = sink if sink is not None else DirectorySink(build_dir, previous_dir, durability)
+        self.written = 0
+        self.unchanged = 0
+        self.synced = 0
+        self._lock = threading.Lock()
+        self._dirs = set()
+        self._pending = {}  # dest_path -> Future of a submitted write, until taken
+        self._queue = None
+        self._thread = None
+        if queue_size > 0:
+            self._queue = queue.Queue(maxsize=queue_size)
+            self._thread = threading.Thread(target=self._run, name="output-writer", daemon=True)
+            self._thread.start()
+
+    @property
+    def background(self):
+        """
+        bool: True if submitted writes are done by the background thread
+        """
+        return self._thread is not None
+
+    @property
+    def on_disk(self):
+        """
+        bool: True if outputs are files at their paths once written, which
+            the file index, build journal and shard manifest rely on
+        """
+        return self.sink.on_disk
+
+    def ensure_dir(self, path):
+        """
+        Create a directory and its parents unless this writer already has.
+
+        Args:
+            path (str): Directory that outputs are about to be written into
+
+        Returns:
+            bool: True if the directory had to be created
+        """
+        if not path:
+            return False
+        with self._lock:
+            if path in self._dirs:
+                return False
+        created = self.sink.make_dir(path)
+        with self._lock:
+            while path and path not in self._dirs:
+                self._dirs.add(path)
+                path = os.path.dirname(path)
+        return created
+
+    def temp_path(self, dest_path):
+        """
+        Args:
+            dest_path (str): Output path
+
+        Returns:
+            str: Where to stream an output too large to hold in memory, then
+                pass to commit()
+        """
+        return self.sink.temp_path(dest_path)
+
+    def submit(self, dest_path, data=None, source=None, on_source=None):
+        """
+        Write an output, on the background thread if there is one.
+
+        Blocks while the queue is full. The outcome is collected with
+        take(dest_path); until then nothing may rely on the file.
+
+        Args:
+            dest_path (str): Output path; its directory must exist
+            data (bytes, optional): New contents
+            source (str, optional): File to copy instead of data; the
+                output takes its mode and times
+            on_source (callable, optional): Called with source's mapped
+                contents before they are written, so the caller can hash
+                the file from the same mapping instead of reading it again
+
+        Returns:
+            Future: Resolves to True if written, False if kept unchanged
+        """
+        future = Future()
+        with self._lock:
+            self._pending[dest_path] = future
+        if self._queue is None:
+            self._do_write(future, dest_path, data, source, on_source)
+        else:
+            self._queue.put((future, dest_path, data, source, on_source))
+        return future
+
+    def take(self, dest_path):
+        """
+        Args:
+            dest_path (str): An output passed to submit()
+
+        Returns:
+            Future or None: The submitted write, which is forgotten; None if
+                nothing was submitted for dest_path since it was last taken
+        """
+        with self._lock:
+            return self._pending.pop(dest_path, None)
+
+    def commit(self, temp_path, dest_path):
+        """
+        Put a finished temporary file in place unless the output is unchanged.
+
+        Runs on the calling thread, for outputs too large to queue in memory.
+
+        Args:
+            temp_path (str): Completely written new contents, from temp_path()
+            dest_path (str): Output path
+
+        Returns:
+            bool: True if the output was written, False if it was kept
+        """
+        written = self.sink.write_file(temp_path, dest_path)
+        self.add_counts(int(written), int(not written))
+        return written
+
+    def write(self, dest_path, data, stat_source=None):
+        """
+        Write bytes to an output unless it already holds exactly those bytes.
+
+        Runs on the calling thread.
+
+        Args:
+            dest_path (str): Output path; its directory must exist
+            data (bytes or mmap.mmap): New contents
+            stat_source (str, optional): File whose mode and times a written
+                output takes (as shutil.copystat)
+
+        Returns:
+            bool: True if the output was written, False if it was kept
+        """
+        written = self.sink.write(dest_path, data, stat_source)
+        self.add_counts(int(written), int(not written))
+        return written
+
+    def add_counts(self, written, unchanged):
+        """
+        Args:
+            written (int): Outputs written, e.g. by a worker process's writer
+            unchanged (int): Outputs found unchanged and kept
+        """
+        with self._lock:
+            self.written += written
+            self.unchanged += unchanged
+
+    def close(self, commit=True):
+        """
+        Finish queued writes, stop the background thread and close the sink
+        (with the "end" policy, fsync everything written).
+
+        Safe to call more than once; outcomes not yet taken stay available.
+
+        Args:
+            commit (bool): False if the build failed, so a sink producing a
+                single artifact (an archive) discards it
+        """
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+            self._queue = None
+        self.sink.close(commit)
+        self.synced = self.sink.synced
+
+    def _run(self):
+        for future, dest_path, data, source, on_source in iter(self._queue.get, None):
+            self._do_write(future, dest_path, data, source, on_source)
+
+    def _do_write(self, future, dest_path, data, source, on_source=None):
+        try:
+            if source is None:
+                future.set_result(self.write(dest_path, data))
+            else:
+                with map_file(source) as mapped:
+                    if on_source is not None:
+                        on_source(mapped)
+                    future.set_result(self.write(dest_path, mapped, stat_source=source))
+        except Exception as e:
+            future.set_exception(e)
@@ -0,0 +1,421 @@
+import os
+import mmap
+import time
+import struct
+import zlib
+import threading
+import contextlib
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, single writer only
+    fcntl = None
+
+
+# Bump when the on-disk layout below changes; older files are discarded
+FORMAT_VERSION = 2
+
+PACK_MAGIC = b"SSGPACK\0"
+INDEX_MAGIC = b"SSGIDX\0\0"
+
+# Pack file: header, then records of (record header, data) appended in order
+_PACK_HEADER = struct.Struct("<8sI8s")      # magic, version, pack id
+_RECORD_HEADER = struct.Struct("<32sII")    # key, data length, crc32 of data
+
+# Index file: header, then fixed-width entries sorted by key
+_INDEX_HEADER = struct.Struct("<8sI8sQQ")   # magic, version, pack id, indexed pack size, entry count
+_INDEX_ENTRY = struct.Struct("<32sQIQ")     # key, data offset, data length, last used (unix time)
+
+
+class PackStore:
+    """
+    Packed key/value store: one append-only data file plus a sorted index.
+
+    Replaces one-file-per-entry caches. Values are appended to <path>.pack as
+    checksummed records; <path>.idx holds fixed-width (key, offset, length)
+    entries sorted by key, read through mmap with binary search. Entries
+    added since the index was last written are kept in memory and folded into
+    a new index by flush(). Each index entry also records when the value was
+    last read or written, which drives LRU eviction of the build cache.
+
+    Crash safety: a torn or corrupt record at the end of the pack is detected
+    by its checksum and truncated on open, records the index does not cover
+    yet are recovered by rescanning the tail, and an index that does not
+    belong to the pack (different pack id, or covering more bytes than the
+    pack has) is ignored and rebuilt from the pack.
+
+    Concurrency: several processes (e.g. CI jobs sharing one cache
+    directory) may use the same store. Appends, index writes and compaction
+    happen under an exclusive flock on <path>.lock; before writing, a process
+    picks up records other processes appended and reopens the pack if it was
+    replaced by compaction. Reads need no lock because records are immutable
+    once written. Within a process the store may be shared between threads:
+    a thread lock is taken alongside the flock (which doesn't exclude
+    threads of the same process) and around reads, so a read never sees
+    the pack being reopened under it.
+
+    Keys are 64-character hex digests (sha256), as produced by every cache
+    in the generator.
+    """
+
+    def __init__(self, path, fsync=False):
+        """
+        Args:
+            path (str): Path prefix; .pack and .idx are appended
+            fsync (bool): fsync the pack before every index write
+        """
+        self.pack_path = path + ".pack"
+        self.index_path = path + ".idx"
+        self.lock_path = path + ".lock"
+        self.fsync = fsync
+        directory = os.path.dirname(self.pack_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._file = None
+        self._index_file = None
+        self._index_map = None
+        self._index_count = 0
+        self._recent = {}  # key bytes -> (offset, length, last used) not in the index yet
+        self._touched = {}  # key bytes -> last used, for indexed entries read this session
+        self._now = int(time.time())
+        self._thread_lock = threading.RLock()
+        self._lock_file = open(self.lock_path, 'a')
+        try:
+            with self._locked():
+                self._open()
+        except BaseException:
+            self._close_files()
+            self._lock_file.close()
+            raise
+
+    # Public interface -----------------------------------------------------
+
+    def get(self, key):
+        """
+        Args:
+            key (str): Hex digest key
+
+        Returns:
+            bytes or None: The stored value, or None if the key is absent
+        """
+        key_bytes = bytes.fromhex(key)
+        with self._thread_lock:
+            location = self._locate(key_bytes)
+            if location is None:
+                return None
+            offset, length = location
+            if key_bytes not in self._recent:
+                self._touched[key_bytes] = self._now
+            return os.pread(self._file.fileno(), length, offset)
+
+    def put(self, key, data):
+        """
+        Append a value. Keys that are already stored are left unchanged.
+
+        Args:
+            key (str): Hex digest key
+            data (bytes): Value to store
+        """
+        key_bytes = bytes.fromhex(key)
+        with self._thread_lock:
+            if self._locate(key_bytes) is not None:
+                return
+        record = _RECORD_HEADER.pack(key_bytes, len(data), zlib.crc32(data))
+        with self._locked():
+            self._sync()
+            if self._locate(key_bytes) is not None:
+                # Another process stored it meanwhile
+                return
+            self._file.seek(self._end)
+            self._file.write(record + data)
+            self._file.flush()
+            self._recent[key_bytes] = (self._end + _RECORD_HEADER.size, len(data), self._now)
+            self._end += _RECORD_HEADER.size + len(data)
+
+    def __contains__(self, key):
+        with self._thread_lock:
+            return self._locate(bytes.fromhex(key)) is not None
+
+    def __len__(self):
+        return len(self._entries())
+
+    def keys(self):
+        """
+        Returns:
+            list[str]: All stored keys as hex digests, sorted
+        """
+        return sorted(key.hex() for key in self._entries())
+
+    def entries(self):
+        """
+        Returns:
+            list[tuple[str, int, int]]: (key, size in bytes, last used unix time)
+                for every stored value, sorted by key
+        """
+        entries = self._entries()
+        return [(key.hex(), entries[key][1], entries[key][2]) for key in sorted(entries)]
+
+    def live_bytes(self):
+        """
+        Returns:
+            int: Total size of all stored values
+        """
+        return sum(length for _, length, _ in self._entries().values())
+
+    def file_bytes(self):
+        """
+        Returns:
+            int: Size of the pack file, including dead records
+        """
+        return self._end
+
+    def flush(self):
+        """
+        Write a new index covering every record appended or read so far.
+        """
+        if not self._recent and not self._touched:
+            return
+        with self._locked():
+            self._sync()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            entries = self._entries()
+            # Keep newer last-used times written by other processes
+            for key_bytes, (_, _, last_used) in self._read_disk_index().items():
+                entry = entries.get(key_bytes)
+                if entry is not None and last_used > entry[2]:
+                    entries[key_bytes] = (entry[0], entry[1], last_used)
+            self._write_index(entries, self._pack_id, self._end)
+
+    def compact(self, keep=None):
+        """
+        Rewrite the pack with only live records, dropping dead space.
+
+        Args:
+            keep (callable, optional): keep(key) -> bool; keys for which it
+                returns False are dropped from the store
+        """
+        with self._locked():
+            self._sync()
+            self._compact(keep)
+
+    def _compact(self, keep):
+        entries = self._entries()
+        new_id = os.urandom(8)
+        temp_pack = self.pack_path + ".compact"
+        new_entries = {}
+        with open(temp_pack, 'wb') as out:
+            out.write(_PACK_HEADER.pack(PACK_MAGIC, FORMAT_VERSION, new_id))
+            position = _PACK_HEADER.size
+            for key_bytes in sorted(entries):
+                if keep is not None and not keep(key_bytes.hex()):
+                    continue
+                offset, length, last_used = entries[key_bytes]
+                data = os.pread(self._file.fileno(), length, offset)
+                out.write(_RECORD_HEADER.pack(key_bytes, length, zlib.crc32(data)))
+                out.write(data)
+                new_entries[key_bytes] = (position + _RECORD_HEADER.size, length, last_used)
+                position += _RECORD_HEADER.size + length
+            out.flush()
+            os.fsync(out.fileno())
+
+        self._close_files()
+        # If we crash between these renames the old index names the wrong
+        # pack id, so it is ignored and rebuilt from the new pack on open
+        os.replace(temp_pack, self.pack_path)
+        self._write_index(new_entries, new_id, position)
+        self._open()
+
+    def close(self):
+        """
+        Flush the index and release file handles.
+        """
+        with self._thread_lock:
+            if self._file is not None:
+                self.flush()
+                self._close_files()
+            self._lock_file.close()
+
+    # Internals ------------------------------------------------------------
+
+    @contextlib.contextmanager
+    def _locked(self):
+        # Not reentrant: the inner LOCK_UN would drop the outer flock
+        with self._thread_lock:
+            if fcntl is None:
+                yield
+                return
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _sync(self):
+        """Catch up with other processes. Must be called with the lock held."""
+        try:
+            disk = os.stat(self.pack_path)
+        except FileNotFoundError:
+            disk = None
+        if disk is None or disk.st_ino != os.fstat(self._file.fileno()).st_ino:
+            # The pack was compacted (or removed) by someone else - start over
+            self._close_files()
+            self._open()
+            return
+        if disk.st_size > self._end:
+            position = self._end
+            self._end = disk.st_size
+            self._scan_tail(position)
+
+    def _read_disk_index(self):
+        """Read the current index file's entries if it belongs to our pack."""
+        try:
+            with open(self.index_path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return {}
+        if len(data) < _INDEX_HEADER.size:
+            return {}
+        magic, version, pack_id, _, count = _INDEX_HEADER.unpack_from(data, 0)
+        if (magic != INDEX_MAGIC or version != FORMAT_VERSION or pack_id != self._pack_id
+                or len(data) != _INDEX_HEADER.size + count * _INDEX_ENTRY.size):
+            return {}
+        entries = {}
+        for key_bytes, offset, length, last_used in _INDEX_ENTRY.iter_unpack(data[_INDEX_HEADER.size:]):
+            entries[key_bytes] = (offset, length, last_used)
+        return entries
+
+    def _open(self):
+        """Open (or create) the pack and its index. Called with the lock held."""
+        self._recent = {}
+        self._touched = {}
+        if not self._valid_pack_header():
+            with open(self.pack_path, 'wb') as f:
+                f.write(_PACK_HEADER.pack(PACK_MAGIC, FORMAT_VERSION, os.urandom(8)))
+        self._file = open(self.pack_path, 'r+b')
+        _, _, self._pack_id = _PACK_HEADER.unpack(self._file.read(_PACK_HEADER.size))
+        self._end = os.fstat(self._file.fileno()).st_size
+
+        scan_from = _PACK_HEADER.size
+        indexed_size = self._load_index()
+        if indexed_size is not None:
+            scan_from = indexed_size
+        self._scan_tail(scan_from)
+
+    def _valid_pack_header(self):
+        try:
+            with open(self.pack_path, 'rb') as f:
+                header = f.read(_PACK_HEADER.size)
+        except FileNotFoundError:
+            return False
+        if len(header) < _PACK_HEADER.size:
+            return False
+        magic, version, _ = _PACK_HEADER.unpack(header)
+        return magic == PACK_MAGIC and version == FORMAT_VERSION
+
+    def _load_index(self):
+        """Map the index if it belongs to this pack; return the size it covers."""
+        try:
+            index_file = open(self.index_path, 'rb')
+        except FileNotFoundError:
+            return None
+        header = index_file.read(_INDEX_HEADER.size)
+        if len(header) < _INDEX_HEADER.size:
+            index_file.close()
+            return None
+        magic, version, pack_id, indexed_size, count = _INDEX_HEADER.unpack(header)
+        expected_size = _INDEX_HEADER.size + count * _INDEX_ENTRY.size
+        if (magic != INDEX_MAGIC or version != FORMAT_VERSION or pack_id != self._pack_id
+                or indexed_size > self._end
+                or os.fstat(index_file.fileno()).st_size != expected_size):
+            index_file.close()
+            return None
+        if count:
+            self._index_map = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._index_file = index_file
+        self._index_count = count
+        return indexed_size
+
+    def _scan_tail(self, position):
+        """Recover records past the index; truncate a torn or corrupt tail."""
+        fd = self._file.fileno()
+        while position + _RECORD_HEADER.size <= self._end:
+            key_bytes, length, crc = _RECORD_HEADER.unpack(os.pread(fd, _RECORD_HEADER.size, position))
+            data_offset = position + _RECORD_HEADER.size
+            if data_offset + length > self._end:
+                break
+            if zlib.crc32(os.pread(fd, length, data_offset)) != crc:
+                break
+            self._recent[key_bytes] = (data_offset, length, self._now)
+            position = data_offset + length
+        if position < self._end:
+            self._file.truncate(position)
+            self._end = position
+
+    def _locate(self, key_bytes):
+        entry = self._recent.get(key_bytes)
+        if entry is not None:
+            return entry[0], entry[1]
+        return self._index_lookup(key_bytes)
+
+    def _index_lookup(self, key_bytes):
+        low, high = 0, self._index_count
+        index_map = self._index_map
+        while low < high:
+            middle = (low + high) // 2
+            start = _INDEX_HEADER.size + middle * _INDEX_ENTRY.size
+            candidate = index_map[start:start + 32]
+            if candidate < key_bytes:
+                low = middle + 1
+            elif candidate > key_bytes:
+                high = middle
+            else:
+                _, offset, length, _ = _INDEX_ENTRY.unpack_from(index_map, start)
+                return offset, length
+        return None
+
+    def _entries(self):
+        with self._thread_lock:
+            entries = {}
+            for i in range(self._index_count):
+                key_bytes, offset, length, last_used = _INDEX_ENTRY.unpack_from(
+                    self._index_map, _INDEX_HEADER.size + i * _INDEX_ENTRY.size
+                )
+                entries[key_bytes] = (offset, length, self._touched.get(key_bytes, last_used))
+            entries.update(self._recent)
+            return entries
+
+    def _write_index(self, entries, pack_id, indexed_size):
+        temp_index = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(temp_index, 'wb') as out:
+            out.write(_INDEX_HEADER.pack(INDEX_MAGIC, FORMAT_VERSION, pack_id, indexed_size, len(entries)))
+            for key_bytes in sorted(entries):
+                offset, length, last_used = entries[key_bytes]
+                out.write(_INDEX_ENTRY.pack(key_bytes, offset, length, last_used))
+            if self.fsync:
+                out.flush()
+                os.fsync(out.fileno())
+        os.replace(temp_index, self.index_path)
+
+        if self._file is not None:
+            # Remap the new index and forget the entries it now covers
+            self._close_index()
+            self._recent = {}
+            self._touched = {}
+            self._load_index()
+
+    def _close_index(self):
+        if self._index_map is not None:
+            self._index_map.close()
+            self._index_map = None
+        if self._index_file is not None:
+            self._index_file.close()
+            self._index_file = None
+        self._index_count = 0
+
+    def _close_files(self):
+        self._close_index()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,299 @@
+import os
+import json
+import time
+import heapq
+import queue
+import multiprocessing
+
+from block_cache import BlockCache, DEFAULT_CACHE_DIR
+from document_cache import DocumentCache
+from inline_cache import InlineCache
+from build_context import BuildContext
+from generate_page import generate_page
+from generate_pages_recursive import PagePlan
+from output_writer import OutputWriter
+
+
+RENDER_TIMES_FILE = "render-times.json"
+
+# Cost per source byte assumed until some pages have been timed
+DEFAULT_SECONDS_PER_BYTE = 2e-6
+
+# Weight of the newest measurement in a page's smoothed render time
+SMOOTHING = 0.5
+
+
+class RenderTimes:
+    """
+    Persistent render time of each page, used as its scheduling cost.
+
+    Times are smoothed across builds so one noisy measurement doesn't
+    reorder the schedule. Pages that were never timed are estimated from
+    their source size, at the average seconds per byte of the timed pages.
+    Saved as JSON at <cache_dir>/render-times.json.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        """
+        Args:
+            cache_dir (str or None): Root directory of the build cache, or
+                None to keep times in memory only
+        """
+        self.path = os.path.join(cache_dir, RENDER_TIMES_FILE) if cache_dir is not None else None
+        self._times = {}  # source -> [seconds, size]
+        if self.path is not None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._times = json.load(f)
+            except (OSError, ValueError):
+                pass
+
+    def cost(self, source, size):
+        """
+        Args:
+            source (str): Path of the markdown source
+            size (int): Size of the source in bytes
+
+        Returns:
+            float: Expected render time in seconds
+        """
+        entry = self._times.get(source)
+        if entry is not None:
+            return entry[0]
+        return size * self.seconds_per_byte()
+
+    def seconds_per_byte(self):
+        """
+        Returns:
+            float: Average render cost per source byte over the timed pages
+        """
+        seconds = sum(entry[0] for entry in self._times.values())
+        size = sum(entry[1] for entry in self._times.values())
+        if seconds <= 0 or size <= 0:
+            return DEFAULT_SECONDS_PER_BYTE
+        return seconds / size
+
+    def record(self, source, size, seconds):
+        """
+        Args:
+            source (str): Path of the markdown source
+            size (int): Size of the source in bytes
+            seconds (float): Measured render time
+        """
+        entry = self._times.get(source)
+        if entry is not None:
+            seconds = SMOOTHING * seconds + (1 - SMOOTHING) * entry[0]
+        self._times[source] = [seconds, size]
+
+    def save(self):
+        """
+        Write the times to disk, if this instance is persistent.
+        """
+        if self.path is None:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._times, f)
+        os.replace(temp_path, self.path)
+
+
+def lpt_order(jobs, render_times=None):
+    """
+    Order jobs longest expected render time first (LPT scheduling).
+
+    Handing the most expensive pages out first means the last pages any
+    worker picks up are cheap ones, instead of a large page started late
+    that everyone else ends up waiting for.
+
+    Args:
+        jobs (list[PageJob]): Pages to schedule
+        render_times (RenderTimes, optional): Costs; source size when None
+
+    Returns:
+        list[PageJob]: The jobs in scheduling order; ties keep path order
+    """
+    if render_times is None:
+        render_times = RenderTimes(None)
+    return sorted(jobs, key=lambda job: (-render_times.cost(job.source, job.size), job.rel_dest))
+
+
+def makespan(durations, workers):
+    """
+    Simulate greedy list scheduling: each task goes to the first free worker.
+
+    Args:
+        durations (list[float]): Task durations, in the order they are handed out
+        workers (int): Number of parallel workers
+
+    Returns:
+        float: Time at which the last task finishes
+    """
+    finish_times = [0.0] * max(1, workers)
+    for duration in durations:
+        heapq.heappush(finish_times, heapq.heappop(finish_times) + duration)
+    return max(finish_times)
+
+
+def report_schedule(discovery_jobs, scheduled_jobs, durations, workers):
+    """
+    Print how long the build's measured page times take in discovery order
+    versus the order actually used.
+
+    Args:
+        discovery_jobs (list[PageJob]): Jobs in discovery order
+        scheduled_jobs (list[PageJob]): Jobs in the order they were handed out
+        durations (dict[str, float]): Measured seconds by destination path
+        workers (int): Number of parallel workers
+
+    Returns:
+        tuple[float, float]: (makespan in discovery order, makespan as scheduled)
+    """
+    def times(jobs):
+        return [durations[job.dest] for job in jobs if job.dest in durations]
+
+    unordered = makespan(times(discovery_jobs), workers)
+    ordered = makespan(times(scheduled_jobs), workers)
+    saved = unordered - ordered
+    share = saved / unordered if unordered else 0.0
+    print(f"⏱️  Schedule: pages finish after {ordered:.2f}s of render time on {workers} workers, "
+          f"vs {unordered:.2f}s in discovery order ({saved:.2f}s / {share:.0%} of tail time saved)")
+    return unordered, ordered
+
+
+def generate_pages_parallel(dir_path_content, template_path, dest_dir_path, basepath="/",
+                            context=None, jobs=2):
+    """
+    Generate pages in several processes, most expensive pages first.
+
+    Worker processes pull pages from a shared queue, so a worker that
+    finishes early simply takes the next page. Each worker opens its own
+    caches from context.cache_dir; the pack stores they share are safe to
+    use from several processes.
+
+    Args:
+        dir_path_content (str): Root directory containing markdown content files
+        template_path (str): Path to the HTML template file
+        dest_dir_path (str): Root directory where HTML files will be generated
+        basepath (str): Base URL path for the site (default: "/")
+        context (BuildContext, optional): Build options and shared caches
+        jobs (int): Number of worker processes
+
+    Returns:
+        bool: True if every page was generated
+    """
+    plan = PagePlan(dir_path_content, template_path, dest_dir_path, basepath, context)
+    discovered = list(plan)
+    scheduled = lpt_order(discovered, plan.render_times)
+    print(f"🗂️  Scheduling {len(scheduled)} pages on {jobs} processes, longest first")
+
+    tasks = multiprocessing.Queue()
+    results = multiprocessing.Queue()
+    for index, job in enumerate(scheduled):
+        tasks.put((index, job.source, job.dest))
+    for _ in range(jobs):
+        tasks.put(None)
+
+    processes = [
+        multiprocessing.Process(target=_page_worker,
+                                args=(tasks, results, template_path, basepath, _worker_options(context)))
+        for _ in range(jobs)
+    ]
+    for process in processes:
+        process.start()
+
+    durations = {}
+    failed = 0
+    pending = set(range(len(scheduled)))
+    running = jobs
+    while running:
+        try:
+            message = results.get(timeout=1.0)
+        except queue.Empty:
+            if not any(process.is_alive() for process in processes):
+                break  # a worker died without reporting back
+            continue
+        if message[0] == "stats":
+            running -= 1
+            _add_cache_stats(context, message[1])
+            continue
+        index, seconds, error = message
+        pending.discard(index)
+        job = scheduled[index]
+        if error is None:
+            durations[job.dest] = seconds
+            print(f"   ✅ Generated {job.rel_dest} in {seconds:.3f}s")
+        else:
+            failed += 1
+            print(f"   ❌ Error generating page from {job.source}: {error}")
+        plan.finished(job, seconds, error)
+    for process in processes:
+        process.join()
+    for index in sorted(pending):
+        failed += 1
+        print(f"   ❌ No result for {scheduled[index].source}: worker process exited")
+        plan.finished(scheduled[index], error="worker process exited")
+
+    print(f"📊 Total pages generated: {len(durations)}, failed: {failed}")
+    if scheduled:
+        report_schedule(discovered, scheduled, durations, jobs)
+    failed += plan.close()
+    return failed == 0
+
+
+def _worker_options(context):
+    if context is None:
+        return None
+    inline = context.inline_cache
+    writer = context.output_writer
+    return {
+        "cache_dir": context.cache_dir if context.block_cache is not None else None,
+        "version": context.version,
+        "inline": (inline.max_entries, inline.max_bytes) if inline is not None else None,
+        "output": (writer.build_dir, writer.previous_dir, writer.durability),
+    }
+
+
+def _page_worker(tasks, results, template_path, basepath, options):
+    context = BuildContext()
+    if options is not None:
+        if options["inline"] is not None:
+            context.inline_cache = InlineCache(*options["inline"])
+        if options["cache_dir"] is not None:
+            context.block_cache = BlockCache(options["cache_dir"], version=options["version"])
+            context.document_cache = DocumentCache(options["cache_dir"], context.inline_cache,
+                                                   version=options["version"])
+        # Pages are written before their result is sent, so no background thread
+        build_dir, previous_dir, durability = options["output"]
+        context.output_writer = OutputWriter(build_dir, previous_dir, durability=durability)
+    try:
+        for index, source, dest in iter(tasks.get, None):
+            started = time.perf_counter()
+            try:
+                generate_page(source, template_path, dest, basepath, context)
+                results.put((index, time.perf_counter() - started, None))
+            except Exception as e:
+                results.put((index, time.perf_counter() - started, str(e)))
+    finally:
+        stats = {}
+        for name, cache in (("block_cache", context.block_cache), ("document_cache", context.document_cache),
+                            ("inline_cache", context.inline_cache)):
+            if cache is not None:
+                stats[name] = (cache.hits, cache.misses)
+                if name != "inline_cache":
+                    cache.close()
+        context.output_writer.close()
+        stats["output_writer"] = (context.output_writer.written, context.output_writer.unchanged)
+        results.put(("stats", stats))
+
+
+def _add_cache_stats(context, stats):
+    # Fold a worker's hit and miss counts into the main process's caches for the summary
+    if context is None:
+        return
+    context.output_writer.add_counts(*stats.pop("output_writer", (0, 0)))
+    for name, (hits, misses) in stats.items():
+        cache = getattr(context, name, None)
+        if cache is not None:
+            cache.hits += hits
+            cache.misses += misses
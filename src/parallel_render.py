@@ -0,0 +1,71 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+
+# Below this many characters of markdown, pickling blocks to worker processes
+# costs more than rendering them in place
+PARALLEL_THRESHOLD_CHARS = 512 * 1024
+
+# Number of blocks sent to a worker in one task
+BLOCKS_PER_CHUNK = 256
+
+
+def should_render_in_parallel(size, workers):
+    """
+    Decide whether a document is big enough to be worth a process pool.
+
+    Args:
+        size (int): Size of the markdown source (characters or bytes)
+        workers (int or None): Requested number of worker processes
+
+    Returns:
+        bool: True if block-level parallel rendering should be used
+    """
+    return bool(workers) and workers > 1 and size >= PARALLEL_THRESHOLD_CHARS
+
+
+def iter_chunks(items, chunk_size=BLOCKS_PER_CHUNK):
+    """
+    Group an iterable into lists of at most chunk_size items, lazily.
+
+    Args:
+        items (iterable): Items to group
+        chunk_size (int): Maximum items per chunk
+
+    Yields:
+        list: Consecutive chunks of items
+    """
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def ordered_parallel_map(function, items, workers):
+    """
+    Apply function to each item in a process pool, yielding results in order.
+
+    Unlike Executor.map, items are submitted lazily with at most two tasks per
+    worker in flight, so a streamed input is never materialized in full.
+
+    Args:
+        function (callable): A picklable module-level function
+        items (iterable): Arguments to pass to function, one per task
+        workers (int): Number of worker processes
+
+    Yields:
+        Results of function(item), in the order of items
+    """
+    max_in_flight = workers * 2
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for item in items:
+            pending.append(executor.submit(function, item))
+            if len(pending) >= max_in_flight:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
@@ -0,0 +1,54 @@
+import os
+
+
+def prune_stale_outputs(output_dir, file_index):
+    """
+    Delete outputs whose inputs are gone, and the directories they leave empty.
+
+    Replaces clearing the whole output directory in builds that keep it
+    (--incremental, --resume): only files the file index recorded for an
+    earlier build, and that this build neither wrote nor found current, are
+    removed. The work is proportional to what changed; files the generator
+    never wrote are left alone.
+
+    Args:
+        output_dir (str): The build's output directory
+        file_index (FileIndex): Index that recorded every output of this build
+
+    Returns:
+        tuple[int, int]: (files removed, directories removed)
+    """
+    files = 0
+    directories = set()
+    for path in file_index.stale_outputs(output_dir):
+        try:
+            os.remove(path)
+            files += 1
+            print(f"🗑️  Pruned stale output: {path}")
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"❌ Error pruning {path}: {e}")
+            continue
+        file_index.forget_output(path)
+        directories.add(os.path.dirname(path))
+
+    # The emptied directories and their parents, deepest first, so each is
+    # tried after everything inside it
+    root = os.path.abspath(output_dir)
+    candidates = set()
+    for directory in directories:
+        while os.path.abspath(directory) != root and directory not in candidates:
+            candidates.add(directory)
+            directory = os.path.dirname(directory)
+    removed_dirs = 0
+    for directory in sorted(candidates, key=lambda path: path.count(os.sep), reverse=True):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            continue  # not empty
+        removed_dirs += 1
+        print(f"🗑️  Pruned empty directory: {directory}")
+
+    print(f"🧹 Pruned {files} stale outputs and {removed_dirs} empty directories")
+    return files, removed_dirs
@@ -0,0 +1,183 @@
+import os
+import glob
+import errno
+import shutil
+import ctypes
+import threading
+
+from discovery import discover
+
+
+# From <linux/fs.h> and <fcntl.h>
+RENAME_EXCHANGE = 2
+AT_FDCWD = -100
+
+
+def staging_path(output_dir):
+    """
+    Args:
+        output_dir (str): The published output directory, e.g. "docs"
+
+    Returns:
+        str: Sibling directory the build writes into, e.g. ".docs.staging";
+            on the same filesystem, so it can be renamed into place
+    """
+    parent, name = os.path.split(os.path.normpath(output_dir))
+    return os.path.join(parent, f".{name}.staging")
+
+
+def _trash_pattern(output_dir):
+    parent, name = os.path.split(os.path.normpath(output_dir))
+    return os.path.join(parent, f".{name}.old-*")
+
+
+class Publisher:
+    """
+    Build into a staging directory and swap it into place when done.
+
+    The published directory is never half-built: a dev server or deploy
+    sync sees the old site until the new one replaces it in one rename.
+    On Linux the two directories are exchanged atomically with
+    renameat2(RENAME_EXCHANGE); elsewhere the old tree is renamed away
+    first, leaving a moment with no directory at all. The old tree is then
+    deleted on a background thread instead of holding up the build.
+
+    Incremental builds start from a hardlinked copy of the previous output,
+    so unchanged files cost one link each. Every writer replaces its
+    output file (write to a temporary file, then rename) rather than
+    rewriting it, so the published tree never changes through a link.
+    """
+
+    def __init__(self, output_dir):
+        """
+        Args:
+            output_dir (str): The published output directory
+        """
+        self.output_dir = os.path.normpath(output_dir)
+        self.staging_dir = staging_path(output_dir)
+        self._cleanup = None
+
+    def prepare(self, reuse=False, keep=False):
+        """
+        Create the staging directory.
+
+        Args:
+            reuse (bool): Hardlink the previous output into it
+            keep (bool): Continue in an existing staging directory (--resume)
+
+        Returns:
+            int: Number of files reused from the previous output
+        """
+        self._delete_in_background(glob.glob(_trash_pattern(self.output_dir)))
+        if keep and os.path.isdir(self.staging_dir):
+            return 0
+        if os.path.lexists(self.staging_dir):
+            shutil.rmtree(self.staging_dir)
+        if reuse and os.path.isdir(self.output_dir):
+            return link_tree(self.output_dir, self.staging_dir)
+        os.makedirs(self.staging_dir)
+        return 0
+
+    def publish(self):
+        """
+        Replace the output directory with the staging directory.
+
+        Returns:
+            str: "exchange" if the swap was atomic, otherwise "rename"
+        """
+        if not os.path.exists(self.output_dir):
+            os.rename(self.staging_dir, self.output_dir)
+            return "rename"
+
+        trash_dir = os.path.join(os.path.dirname(self.staging_dir),
+                                 f".{os.path.basename(self.output_dir)}.old-{os.getpid()}")
+        if exchange_paths(self.staging_dir, self.output_dir):
+            # The staging name now holds the previous output
+            os.rename(self.staging_dir, trash_dir)
+            method = "exchange"
+        else:
+            os.rename(self.output_dir, trash_dir)
+            os.rename(self.staging_dir, self.output_dir)
+            method = "rename"
+        self._delete_in_background([trash_dir])
+        return method
+
+    def wait(self):
+        """
+        Wait for the background deletion of old trees to finish.
+        """
+        if self._cleanup is not None:
+            self._cleanup.join()
+            self._cleanup = None
+
+    def _delete_in_background(self, paths):
+        if not paths:
+            return
+        previous = self._cleanup
+
+        def delete():
+            if previous is not None:
+                previous.join()
+            for path in paths:
+                shutil.rmtree(path, ignore_errors=True)
+
+        self._cleanup = threading.Thread(target=delete, name="delete-old-output")
+        self._cleanup.start()
+
+
+def link_tree(source_dir, dest_dir):
+    """
+    Recreate a directory tree with every file hardlinked to the original.
+
+    Files that can't be linked (another filesystem, no hardlink support)
+    are copied instead.
+
+    Args:
+        source_dir (str): Existing tree
+        dest_dir (str): Where to create the linked tree (must not exist)
+
+    Returns:
+        int: Number of files linked or copied
+    """
+    os.makedirs(dest_dir)
+    count = 0
+    for item in discover(source_dir, include_dirs=True):
+        dest_path = os.path.join(dest_dir, item.rel_dest)
+        if item.size is None:
+            os.makedirs(dest_path, exist_ok=True)
+            continue
+        try:
+            os.link(item.source, dest_path)
+        except OSError:
+            shutil.copy2(item.source, dest_path)
+        count += 1
+    return count
+
+
+def exchange_paths(first, second):
+    """
+    Atomically swap two paths with renameat2(RENAME_EXCHANGE).
+
+    Args:
+        first (str): Existing path
+        second (str): Existing path on the same filesystem
+
+    Returns:
+        bool: True if swapped; False if the platform, C library or
+            filesystem doesn't support exchanging
+
+    Raises:
+        OSError: If the exchange is supported but failed
+    """
+    try:
+        renameat2 = ctypes.CDLL(None, use_errno=True).renameat2
+    except (OSError, AttributeError, TypeError):
+        return False
+    renameat2.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_int, ctypes.c_char_p, ctypes.c_uint]
+    result = renameat2(AT_FDCWD, os.fsencode(first), AT_FDCWD, os.fsencode(second), RENAME_EXCHANGE)
+    if result == 0:
+        return True
+    error = ctypes.get_errno()
+    if error in (errno.ENOSYS, errno.EINVAL, errno.ENOTSUP):
+        return False
+    raise OSError(error, os.strerror(error), first, None, second)
@@ -0,0 +1,312 @@
+import os
+import json
+import heapq
+import shutil
+import hashlib
+import argparse
+
+from discovery import discover
+from file_index import hash_file
+
+
+# Written into each shard's output directory, and never into a merged one
+MANIFEST_FILE = ".shard-manifest.json"
+
+MANIFEST_VERSION = 1
+
+STRATEGIES = ("path", "size")
+
+
+class Shard:
+    """
+    One of N deterministic slices of the site's content pages.
+
+    With the "path" strategy a page belongs to shard sha256(path) % N, so
+    every machine agrees without coordinating and pages can be filtered as
+    discovery yields them. The "size" strategy balances total bytes instead:
+    pages are assigned largest first to the least loaded shard, which needs
+    the full page list before the first page is built.
+
+    The shard also collects what the merge step needs to verify the build:
+    a digest of every page in the site and the hash of each page it wrote.
+    """
+
+    def __init__(self, index, count, strategy="path"):
+        """
+        Args:
+            index (int): This shard, from 1 to count
+            count (int): Number of shards
+            strategy (str): "path" or "size"
+
+        Raises:
+            ValueError: If the index, count or strategy is invalid
+        """
+        if count < 1 or not 1 <= index <= count:
+            raise ValueError(f"Invalid shard {index}/{count}: expected 1 <= i <= N")
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown shard strategy: {strategy}")
+        self.index = index
+        self.count = count
+        self.strategy = strategy
+        self.site_pages = []
+        self.pages = {}
+        self.failed = []
+
+    @classmethod
+    def parse(cls, spec, strategy="path"):
+        """
+        Args:
+            spec (str): Shard as "i/N", e.g. "2/4"
+            strategy (str): "path" or "size"
+
+        Returns:
+            Shard: The parsed shard
+
+        Raises:
+            ValueError: If spec is not of the form i/N
+        """
+        index, sep, count = spec.partition("/")
+        if not sep or not index.isdigit() or not count.isdigit():
+            raise ValueError(f"Invalid shard '{spec}': expected i/N, e.g. 1/4")
+        return cls(int(index), int(count), strategy)
+
+    def select(self, pages):
+        """
+        Keep the pages that belong to this shard.
+
+        Args:
+            pages (iterable[SourceFile]): Every page in the site
+
+        Yields:
+            SourceFile: The pages this shard should build
+        """
+        if self.strategy == "size":
+            pages = list(pages)
+            owners = assign_by_size([(_manifest_path(page.rel_dest), page.size) for page in pages], self.count)
+            for page in pages:
+                name = _manifest_path(page.rel_dest)
+                self.site_pages.append(name)
+                if owners[name] == self.index:
+                    yield page
+            return
+
+        for page in pages:
+            name = _manifest_path(page.rel_dest)
+            self.site_pages.append(name)
+            if shard_of(name, self.count) == self.index:
+                yield page
+
+    def record_page(self, rel_dest, dest_path):
+        """
+        Record a page this shard wrote (or kept, in an incremental build).
+
+        Args:
+            rel_dest (str): Page path relative to the output directory
+            dest_path (str): Path of the written page
+        """
+        self.pages[_manifest_path(rel_dest)] = hash_file(dest_path)
+
+    def record_failure(self, rel_dest):
+        """
+        Args:
+            rel_dest (str): Page that this shard failed to generate
+        """
+        self.failed.append(_manifest_path(rel_dest))
+
+    def write_manifest(self, output_dir):
+        """
+        Write the partial manifest for this shard into its output directory.
+
+        Args:
+            output_dir (str): The shard's output directory
+        """
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "shard": self.index,
+            "count": self.count,
+            "strategy": self.strategy,
+            "site_pages": len(self.site_pages),
+            "site_digest": site_digest(self.site_pages),
+            "pages": dict(sorted(self.pages.items())),
+            "failed": sorted(self.failed),
+        }
+        path = os.path.join(output_dir, MANIFEST_FILE)
+        temp_path = path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(temp_path, path)
+        print(f"🧩 Shard {self.index}/{self.count}: {len(self.pages)} of {len(self.site_pages)} pages, "
+              f"manifest written to {path}")
+
+
+def shard_of(name, count):
+    """
+    Args:
+        name (str): Page path relative to the output directory, '/'-separated
+        count (int): Number of shards
+
+    Returns:
+        int: The shard (1 to count) that owns the page under the "path" strategy
+    """
+    digest = hashlib.sha256(name.encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], "big") % count + 1
+
+
+def assign_by_size(pages, count):
+    """
+    Assign pages to shards so that each shard gets a similar number of bytes.
+
+    Largest pages first, each to the shard with the fewest bytes so far;
+    ties go to the lower shard and equal sizes are ordered by name, so
+    every machine computes the same assignment.
+
+    Args:
+        pages (list[tuple[str, int]]): (name, size in bytes) for every page
+        count (int): Number of shards
+
+    Returns:
+        dict[str, int]: Shard (1 to count) for each page name
+    """
+    loads = [(0, index) for index in range(1, count + 1)]
+    owners = {}
+    for name, size in sorted(pages, key=lambda page: (-page[1], page[0])):
+        load, index = heapq.heappop(loads)
+        owners[name] = index
+        heapq.heappush(loads, (load + size, index))
+    return owners
+
+
+def site_digest(names):
+    """
+    Args:
+        names (iterable[str]): Page names
+
+    Returns:
+        str: Hex digest of the sorted, de-duplicated names
+    """
+    digest = hashlib.sha256()
+    for name in sorted(set(names)):
+        digest.update(name.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def merge_shards(shard_dirs, output_dir):
+    """
+    Verify a set of shard outputs and assemble them into one output directory.
+
+    Everything is checked before output_dir is touched: all N shards are
+    present exactly once and agree on the site, no page was built by two
+    shards, no page is missing or failed, every page matches its recorded
+    hash, and files that several shards wrote (static assets) are identical.
+
+    Args:
+        shard_dirs (list[str]): Output directories of the shard builds
+        output_dir (str): Directory for the merged site (replaced)
+
+    Returns:
+        tuple[int, int]: (pages merged, other files merged)
+
+    Raises:
+        ValueError: Describing the first problem found
+    """
+    manifests = [_load_manifest(shard_dir) for shard_dir in shard_dirs]
+    first = manifests[0]
+    for key in ("count", "strategy", "site_pages", "site_digest"):
+        for shard_dir, manifest in zip(shard_dirs, manifests):
+            if manifest[key] != first[key]:
+                raise ValueError(f"Shard {shard_dir} disagrees on {key}: {manifest[key]} != {first[key]}")
+
+    indexes = sorted(manifest["shard"] for manifest in manifests)
+    expected = list(range(1, first["count"] + 1))
+    if indexes != expected:
+        missing = sorted(set(expected) - set(indexes))
+        duplicated = sorted({index for index in indexes if indexes.count(index) > 1})
+        raise ValueError(f"Expected shards 1..{first['count']} once each; "
+                         f"missing {missing}, duplicated {duplicated}")
+
+    failed = sorted(name for manifest in manifests for name in manifest["failed"])
+    if failed:
+        raise ValueError(f"{len(failed)} pages failed to build: {', '.join(failed[:10])}")
+
+    owners = {}
+    for shard_dir, manifest in zip(shard_dirs, manifests):
+        for name in manifest["pages"]:
+            if name in owners:
+                raise ValueError(f"Page {name} was built by both {owners[name]} and {shard_dir}")
+            owners[name] = shard_dir
+
+    if len(owners) != first["site_pages"] or site_digest(owners) != first["site_digest"]:
+        raise ValueError(f"Shards built {len(owners)} of {first['site_pages']} pages; "
+                         f"some pages are missing or unexpected")
+
+    for shard_dir, manifest in zip(shard_dirs, manifests):
+        for name, expected_hash in manifest["pages"].items():
+            path = os.path.join(shard_dir, *name.split("/"))
+            if not os.path.isfile(path) or hash_file(path) != expected_hash:
+                raise ValueError(f"Page {name} in {shard_dir} is missing or doesn't match its manifest")
+
+    # Everything else (static assets) may come from several shards, but must agree
+    others = {}
+    for shard_dir in shard_dirs:
+        for item in discover(shard_dir):
+            name = _manifest_path(item.rel_dest)
+            if name == MANIFEST_FILE or name in owners:
+                continue
+            file_hash = hash_file(item.source)
+            if name in others and others[name][1] != file_hash:
+                raise ValueError(f"File {name} differs between {others[name][0]} and {item.source}")
+            others.setdefault(name, (item.source, file_hash))
+
+    if os.path.exists(output_dir):
+        shutil.rmtree(output_dir)
+    os.makedirs(output_dir)
+    sources = [(name, os.path.join(shard_dir, *name.split("/"))) for name, shard_dir in owners.items()]
+    sources.extend((name, source) for name, (source, _) in others.items())
+    for name, source in sources:
+        dest_path = os.path.join(output_dir, *name.split("/"))
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        shutil.copy2(source, dest_path)
+    return len(owners), len(others)
+
+
+def merge_main(argv):
+    """
+    Entry point for `main.py merge OUTPUT SHARD_DIR...`.
+
+    Args:
+        argv (list[str]): Arguments after the `merge` command
+
+    Returns:
+        int: Process exit status
+    """
+    parser = argparse.ArgumentParser(prog="main.py merge",
+                                     description="Verify shard builds and merge them into one site.")
+    parser.add_argument("output", help="Directory for the merged site (replaced)")
+    parser.add_argument("shards", nargs="+", metavar="SHARD_DIR", help="Output directory of each shard build")
+    args = parser.parse_args(argv)
+
+    try:
+        pages, others = merge_shards(args.shards, args.output)
+    except (ValueError, OSError) as e:
+        print(f"❌ Merge failed: {e}")
+        return 1
+    print(f"🧩 Merged {len(args.shards)} shards into {args.output}: {pages} pages, {others} other files")
+    return 0
+
+
+def _load_manifest(shard_dir):
+    path = os.path.join(shard_dir, MANIFEST_FILE)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ValueError(f"No readable shard manifest in {shard_dir}: {e}")
+    if manifest.get("version") != MANIFEST_VERSION:
+        raise ValueError(f"Unsupported shard manifest version in {shard_dir}")
+    return manifest
+
+
+def _manifest_path(rel_dest):
+    # Manifests are compared across machines, so always use '/'
+    return rel_dest.replace(os.sep, "/")
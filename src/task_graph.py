@@ -0,0 +1,141 @@
+import time
+import traceback
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+# Outcome of one task: status is "done", "failed" or "skipped" (a dependency
+# didn't finish); start and end are seconds since the graph started running
+TaskResult = namedtuple("TaskResult", ["name", "status", "start", "end", "error"])
+
+
+class TaskGraph:
+    """
+    Build phases as a graph of tasks with declared dependencies.
+
+    A task starts as soon as every task it depends on is done, so
+    independent phases (copying static files and rendering pages, or the
+    post-build checks) run at the same time on a thread pool. Tasks are
+    I/O bound or manage their own worker processes, so threads suffice.
+
+    Dependencies must be added before the tasks that use them, which keeps
+    the graph acyclic by construction. When a task raises, everything that
+    depends on it is skipped; unrelated tasks still run.
+    """
+
+    def __init__(self):
+        self._tasks = {}  # name -> (function, dependency names), in insertion order
+        self.results = {}
+        self.wall_seconds = 0.0
+
+    def add(self, name, function, deps=()):
+        """
+        Args:
+            name (str): Unique task name
+            function (callable): Called with no arguments to run the task
+            deps (iterable[str]): Names of tasks that must finish first
+
+        Raises:
+            ValueError: If the name is taken or a dependency is unknown
+        """
+        if name in self._tasks:
+            raise ValueError(f"Duplicate task: {name}")
+        deps = tuple(deps)
+        for dep in deps:
+            if dep not in self._tasks:
+                raise ValueError(f"Task {name} depends on unknown task {dep}")
+        self._tasks[name] = (function, deps)
+
+    def run(self, workers=4):
+        """
+        Run every task, each as soon as its dependencies are done.
+
+        Args:
+            workers (int): Maximum number of tasks running at once
+
+        Returns:
+            bool: True if every task finished without raising
+        """
+        started = time.perf_counter()
+        pending = dict(self._tasks)
+        running = {}
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="task") as executor:
+            while pending or running:
+                # Insertion order is a topological order, so one pass settles chains of skips
+                for name, (function, deps) in list(pending.items()):
+                    statuses = [self.results[dep].status if dep in self.results else None for dep in deps]
+                    if any(status in ("failed", "skipped") for status in statuses):
+                        now = time.perf_counter() - started
+                        self.results[name] = TaskResult(name, "skipped", now, now, None)
+                        del pending[name]
+                    elif all(status == "done" for status in statuses):
+                        running[executor.submit(_run_task, name, function, started)] = name
+                        del pending[name]
+                if not running:
+                    continue
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    result = future.result()
+                    self.results[result.name] = result
+                    del running[future]
+        self.wall_seconds = time.perf_counter() - started
+        return all(result.status == "done" for result in self.results.values())
+
+    def critical_path(self):
+        """
+        Find the chain of tasks that determined when the build finished.
+
+        Starts from the task that finished last and repeatedly steps to the
+        dependency that finished last, i.e. the one it was waiting for.
+
+        Returns:
+            list[str]: Task names along the critical path, first to last
+        """
+        finished = [result for result in self.results.values() if result.status != "skipped"]
+        if not finished:
+            return []
+        path = [max(finished, key=lambda result: result.end).name]
+        while True:
+            deps = [self.results[dep] for dep in self._tasks[path[-1]][1] if dep in self.results]
+            if not deps:
+                break
+            path.append(max(deps, key=lambda result: result.end).name)
+        path.reverse()
+        return path
+
+    def report(self):
+        """
+        Print when each task ran, the critical path and the overlap achieved.
+
+        Returns:
+            list[str]: The critical path, as from critical_path()
+        """
+        symbols = {"done": "✅", "failed": "❌", "skipped": "⏭️ "}
+        print(f"🕸️  Build graph: {len(self.results)} tasks in {self.wall_seconds:.2f}s")
+        for name in self._tasks:
+            result = self.results.get(name)
+            if result is None:
+                continue
+            deps = self._tasks[name][1]
+            after = f" after {', '.join(deps)}" if deps else ""
+            print(f"   {symbols[result.status]} {name}: {result.start:.2f}s → {result.end:.2f}s "
+                  f"({result.end - result.start:.2f}s){after}")
+        path = self.critical_path()
+        if path:
+            path_seconds = sum(self.results[name].end - self.results[name].start for name in path)
+            busy_seconds = sum(result.end - result.start for result in self.results.values())
+            overlap = busy_seconds / self.wall_seconds if self.wall_seconds > 0 else 0.0
+            print(f"   🧭 Critical path: {' → '.join(path)} ({path_seconds:.2f}s)")
+            print(f"   ⚡ {busy_seconds:.2f}s of task time in {self.wall_seconds:.2f}s ({overlap:.1f}x overlap)")
+        return path
+
+
+def _run_task(name, function, started):
+    start = time.perf_counter() - started
+    try:
+        function()
+    except Exception as e:
+        print(f"❌ Task {name} failed: {e}")
+        traceback.print_exc()
+        return TaskResult(name, "failed", start, time.perf_counter() - started, str(e))
+    return TaskResult(name, "done", start, time.perf_counter() - started, None)
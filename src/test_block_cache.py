@@ -0,0 +1,83 @@
+import unittest
+import sys
+import os
+import tempfile
+import shutil
+from unittest import mock
+
+# Add the src directory to Python path for relative imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import markdown_to_html
+from block_cache import BlockCache
+from block_type import BlockType
+from markdown_to_html import markdown_to_html_node
+
+
+class TestBlockCache(unittest.TestCase):
+    
+    def setUp(self):
+        """Set up a temporary cache directory"""
+        self.cache_dir = tempfile.mkdtemp()
+        # Cleanups run last-in first-out: caches are closed before the directory goes
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+    
+    def _cache(self, **kwargs):
+        """Open a cache, closing it when the test ends"""
+        cache = BlockCache(self.cache_dir, **kwargs)
+        self.addCleanup(cache.close)
+        return cache
+    
+    def test_key_depends_on_text_type_and_version(self):
+        """Test that every part of the key changes the hash"""
+        cache = self._cache()
+        key = cache.key(BlockType.PARAGRAPH, ["some text"])
+        
+        self.assertEqual(key, cache.key(BlockType.PARAGRAPH, ["some text"]))
+        self.assertNotEqual(key, cache.key(BlockType.PARAGRAPH, ["other text"]))
+        self.assertNotEqual(key, cache.key(BlockType.HEADING, ["some text"]))
+        other_version = BlockCache(self.cache_dir, store=cache.store, version="next")
+        self.assertNotEqual(key, other_version.key(BlockType.PARAGRAPH, ["some text"]))
+    
+    def test_get_and_put_count_hits_and_misses(self):
+        """Test lookups and the hit/miss counters"""
+        cache = self._cache()
+        key = cache.key(BlockType.PARAGRAPH, ["text"])
+        
+        self.assertIsNone(cache.get(key))
+        cache.put(key, "<p>text</p>")
+        self.assertEqual(cache.get(key), "<p>text</p>")
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual(cache.hit_rate(), 0.5)
+    
+    def test_cache_persists_across_instances(self):
+        """Test that a second build reuses blocks rendered by the first"""
+        md = "# Title\n\nParagraph with **bold**\n\n- a\n- b"
+        expected = markdown_to_html_node(md).to_html()
+        
+        first = self._cache()
+        self.assertEqual(markdown_to_html_node(md, cache=first).to_html(), expected)
+        self.assertEqual((first.hits, first.misses), (0, 3))
+        
+        second = self._cache()
+        self.assertEqual(markdown_to_html_node(md + "\n\nNew block", cache=second).to_html(),
+                         markdown_to_html_node(md + "\n\nNew block").to_html())
+        self.assertEqual((second.hits, second.misses), (3, 1))
+    
+    def test_cache_with_parallel_rendering(self):
+        """Test that cached and parallel rendering combine to identical output"""
+        md = "\n\n".join(f"Paragraph {i} with `code`" for i in range(600))
+        expected = markdown_to_html_node(md).to_html()
+        
+        with mock.patch.object(markdown_to_html, "should_render_in_parallel", return_value=True):
+            first = self._cache()
+            self.assertEqual(markdown_to_html_node(md, workers=2, cache=first).to_html(), expected)
+            second = self._cache()
+            self.assertEqual(markdown_to_html_node(md, workers=2, cache=second).to_html(), expected)
+        
+        self.assertEqual(first.misses, 600)
+        self.assertEqual((second.hits, second.misses), (600, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import io
+import unittest
+import sys
+import os
+
+# Add the src directory to Python path for relative imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from block_type import BlockType, block_to_block_type
+from block_parser import parse_blocks, iter_parsed_blocks, iter_blocks
+from markdown_to_blocks import markdown_to_blocks
+from markdown_to_html import markdown_to_html_node
+
+
+class TestBlockParser(unittest.TestCase):
+
+    def assertMatchesMultiPass(self, md):
+        """The fused parser must agree with markdown_to_blocks + block_to_block_type"""
+        expected = [(block_to_block_type(block), block.split('\n')) for block in markdown_to_blocks(md)]
+        self.assertEqual(parse_blocks(md), expected)
+
+    def test_all_block_types(self):
+        """Test classification of every block type"""
+        md = """# Heading
+
+Paragraph line one
+line two
+
+> quote
+> more
+
+- item
+- item
+
+1. one
+2. two
+
+```
+code
+```"""
+        blocks = parse_blocks(md)
+        self.assertEqual(
+            [block_type for block_type, _ in blocks],
+            [
+                BlockType.HEADING,
+                BlockType.PARAGRAPH,
+                BlockType.QUOTE,
+                BlockType.UNORDERED_LIST,
+                BlockType.ORDERED_LIST,
+                BlockType.CODE,
+            ],
+        )
+        self.assertEqual(blocks[1][1], ["Paragraph line one", "line two"])
+        self.assertMatchesMultiPass(md)
+
+    def test_whitespace_trimming_matches_multi_pass(self):
+        """Test that block edges are stripped exactly like markdown_to_blocks"""
+        for md in [
+            "   # Heading   ",
+            "\n\n\n  - a\n- b  \n   \n\n",
+            "text\n   \nmore",
+            "- \n\n1. \n\n# ",
+            "> quote\n  \n\n\n\nnext",
+            "\t\n\n",
+        ]:
+            with self.subTest(md=md):
+                self.assertMatchesMultiPass(md)
+
+    def test_empty_document(self):
+        """Test that empty and whitespace-only documents produce no blocks"""
+        self.assertEqual(parse_blocks(""), [])
+        self.assertEqual(parse_blocks("\n\n  \n\n"), [])
+
+    def test_fenced_code_keeps_blank_lines(self):
+        """Test that blank lines inside a fence do not split the block"""
+        md = "Intro\n\n```\nfirst\n\nsecond\n```\n\nOutro"
+        blocks = parse_blocks(md)
+        self.assertEqual(len(blocks), 3)
+        self.assertEqual(blocks[1], (BlockType.CODE, ["```", "first", "", "second", "```"]))
+
+        html = markdown_to_html_node(md).to_html()
+        self.assertEqual(
+            html,
+            "<div><p>Intro</p><pre><code>first\n\nsecond\n</code></pre><p>Outro</p></div>",
+        )
+
+    def test_unclosed_fence_falls_back_to_blank_line_splitting(self):
+        """Test that an unclosed fence renders like the multi-pass path"""
+        md = "```\nnever closed\n\nParagraph\n\n- item"
+        self.assertMatchesMultiPass(md)
+
+    def test_inline_code_line_does_not_open_fence(self):
+        """Test that a block starting with single-line inline code is not a fence"""
+        for md in [
+            "```inline```\n\nparagraph\n\n```\ncode\n```",
+            "  ```inline```  \nmore\n\nparagraph\n\nend```",
+        ]:
+            with self.subTest(md=md):
+                self.assertMatchesMultiPass(md)
+        html = markdown_to_html_node("```inline```\n\nparagraph\n\n```\ncode\n```").to_html()
+        self.assertIn("<p>paragraph</p>", html)
+
+    def test_iter_parsed_blocks_is_lazy(self):
+        """Test that blocks are yielded before the input is exhausted"""
+        def lines():
+            yield "# Title"
+            yield ""
+            raise AssertionError("parser read past the first block")
+
+        block_iter = iter_parsed_blocks(lines())
+        self.assertEqual(next(block_iter), (BlockType.HEADING, ["# Title"]))
+
+    def test_iter_blocks_from_file(self):
+        """Test streaming blocks from a file object matches parse_blocks"""
+        md = "# Title\n\nSome *text*\nmore\n\n```\na\n\nb\n```\n\n- x\n- y\n"
+        self.assertEqual(list(iter_blocks(io.StringIO(md))), parse_blocks(md))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+import sys
+import os
+import tempfile
+import shutil
+import hashlib
+
+# Add the src directory to Python path for relative imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from pack_store import PackStore
+from build_cache import collect_garbage, cache_stats, record_build, load_history, HISTORY_LENGTH
+
+
+def _key(name):
+    return hashlib.sha256(name.encode()).hexdigest()
+
+
+class TestBuildCache(unittest.TestCase):
+    
+    def setUp(self):
+        """Set up a temporary cache directory"""
+        self.cache_dir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        """Clean up test fixtures"""
+        if os.path.exists(self.cache_dir):
+            shutil.rmtree(self.cache_dir)
+    
+    def _put(self, store_name, name, size, when):
+        store = PackStore(os.path.join(self.cache_dir, store_name))
+        store._now = when
+        store.put(_key(name), b"x" * size)
+        store.close()
+    
+    def test_last_used_is_updated_on_read(self):
+        """Test that reading an entry refreshes its timestamp on disk"""
+        self._put("blocks", "a", 10, when=100)
+        
+        store = PackStore(os.path.join(self.cache_dir, "blocks"))
+        store._now = 500
+        store.get(_key("a"))
+        store.close()
+        
+        store = PackStore(os.path.join(self.cache_dir, "blocks"))
+        self.assertEqual(store.entries(), [(_key("a"), 10, 500)])
+        store.close()
+    
+    def test_gc_evicts_least_recently_used_across_stores(self):
+        """Test global LRU eviction down to the size limit"""
+        self._put("blocks", "old", 100, when=1)
+        self._put("documents", "middle", 100, when=2)
+        self._put("blocks", "new", 100, when=3)
+        
+        evicted, freed = collect_garbage(self.cache_dir, 150)
+        
+        self.assertEqual((evicted, freed), (2, 200))
+        blocks = PackStore(os.path.join(self.cache_dir, "blocks"))
+        documents = PackStore(os.path.join(self.cache_dir, "documents"))
+        self.assertEqual(blocks.keys(), [_key("new")])
+        self.assertEqual(len(documents), 0)
+        blocks.close()
+        documents.close()
+    
+    def test_gc_under_limit_does_nothing(self):
+        """Test that a cache within its limit is left alone"""
+        self._put("blocks", "a", 100, when=1)
+        self.assertEqual(collect_garbage(self.cache_dir, 1000), (0, 0))
+        self.assertEqual(collect_garbage(os.path.join(self.cache_dir, "missing"), 0), (0, 0))
+    
+    def test_stats(self):
+        """Test entry counts, sizes, hit rate and oldest entries"""
+        self._put("blocks", "a", 10, when=5)
+        self._put("documents", "b", 20, when=1)
+        record_build(self.cache_dir, hits=3, misses=1)
+        record_build(self.cache_dir, hits=1, misses=3)
+        
+        stats = cache_stats(self.cache_dir)
+        
+        self.assertEqual(stats["entries"], 2)
+        self.assertEqual(stats["live_bytes"], 30)
+        self.assertEqual(stats["stores"], {"blocks": (1, 10), "documents": (1, 20)})
+        self.assertEqual(stats["builds"], 2)
+        self.assertEqual(stats["hit_rate"], 0.5)
+        self.assertEqual(stats["oldest"][0], (1, "documents", _key("b"), 20))
+    
+    def test_history_is_bounded(self):
+        """Test that only the most recent builds are kept"""
+        for i in range(HISTORY_LENGTH + 5):
+            record_build(self.cache_dir, hits=i, misses=0)
+        history = load_history(self.cache_dir)
+        self.assertEqual(len(history), HISTORY_LENGTH)
+        self.assertEqual(history[-1]["hits"], HISTORY_LENGTH + 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
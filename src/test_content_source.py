@@ -0,0 +1,151 @@
+import unittest
+import sys
+import os
+import io
+import tarfile
+import zipfile
+import tempfile
+import shutil
+from io import StringIO
+from contextlib import redirect_stdout
+
+# Add the src directory to Python path for relative imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from content_source import (FilesystemSource, TarSource, ZipSource,
+                            open_content_source, is_content_archive)
+from discovery import discover_pages
+from build_context import BuildContext
+from file_index import FileIndex
+from generate_pages_recursive import generate_pages_recursive
+from thread_render import generate_pages_threaded
+
+
+PAGES = {
+    "index.md": "# Home\n\nSee [the post](/blog/post)\n",
+    "blog/post.md": "# Post\n\n- one\n- two\n\n![logo](/images/logo.png)\n",
+    "blog/notes.txt": "not a page\n",
+}
+
+
+class TestContentSources(unittest.TestCase):
+
+    def setUp(self):
+        """Set up the same content as a directory, a tar.gz and a zip archive"""
+        self.test_dir = tempfile.mkdtemp()
+        self.content_dir = os.path.join(self.test_dir, "content")
+        for name, text in PAGES.items():
+            path = os.path.join(self.content_dir, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(text)
+        self.tar_path = os.path.join(self.test_dir, "content.tar.gz")
+        with tarfile.open(self.tar_path, "w:gz") as tar:
+            tar.add(self.content_dir, arcname=".")
+        self.zip_path = os.path.join(self.test_dir, "content.zip")
+        with zipfile.ZipFile(self.zip_path, "w") as archive:
+            archive.writestr("blog/", b"")
+            for name, text in PAGES.items():
+                archive.writestr(name, text)
+        self.template_path = os.path.join(self.test_dir, "template.html")
+        with open(self.template_path, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def _pages(self, source):
+        return {page.rel_dest: page for page in source.pages()}
+
+    def test_open_content_source(self):
+        """Test that the source is picked by the path's suffix"""
+        self.assertIsInstance(open_content_source("content"), FilesystemSource)
+        self.assertIsInstance(open_content_source("export.tgz"), TarSource)
+        self.assertIsInstance(open_content_source("export.tar.xz"), TarSource)
+        self.assertIsInstance(open_content_source("export.zip"), ZipSource)
+        self.assertTrue(is_content_archive("export.tar.bz2"))
+        self.assertFalse(is_content_archive("content"))
+
+    def test_filesystem_source(self):
+        """Test that the filesystem source finds what discovery finds, read from disk"""
+        source = FilesystemSource(self.content_dir)
+        self.assertIsNone(source.check())
+        self.assertEqual(list(source.pages()), list(discover_pages(self.content_dir)))
+        self.assertTrue(all(page.data is None for page in source.pages()))
+        self.assertIn("does not exist", FilesystemSource(os.path.join(self.test_dir, "missing")).check())
+        self.assertIn("not a directory", FilesystemSource(self.template_path).check())
+
+    def test_archive_sources(self):
+        """Test that archive members keep their relative paths and carry their bytes"""
+        expected = {os.path.join("blog", "post.html"), "index.html"}
+        for source in (TarSource(self.tar_path), ZipSource(self.zip_path)):
+            self.assertIsNone(source.check())
+            pages = self._pages(source)
+            self.assertEqual(set(pages), expected)
+            page = pages[os.path.join("blog", "post.html")]
+            self.assertEqual(page.data, PAGES["blog/post.md"].encode())
+            self.assertEqual(page.size, len(page.data))
+            self.assertEqual(page.source, os.path.join(source.path, "blog", "post.md"))
+        self.assertIn("does not exist", TarSource(os.path.join(self.test_dir, "missing.tar")).check())
+
+    def test_members_outside_content_root_are_skipped(self):
+        """Test that absolute and parent-relative member names never become outputs"""
+        path = os.path.join(self.test_dir, "evil.tar")
+        with tarfile.open(path, "w") as tar:
+            for name in ("../escape.md", "/abs.md", "ok/../page.md"):
+                info = tarfile.TarInfo(name)
+                info.size = 8
+                tar.addfile(info, io.BytesIO(b"# Title\n"))
+        with redirect_stdout(StringIO()) as output:
+            pages = self._pages(TarSource(path))
+        self.assertEqual(set(pages), {"page.html"})
+        self.assertIn("outside the content root", output.getvalue())
+
+    def _build(self, content, name, threaded=False, context=None):
+        dest_dir = os.path.join(self.test_dir, name)
+        with redirect_stdout(StringIO()):
+            if threaded:
+                generate_pages_threaded(content, self.template_path, dest_dir, "/site/", context, threads=2)
+            else:
+                generate_pages_recursive(content, self.template_path, dest_dir, "/site/", context)
+        outputs = {}
+        for dirpath, _, filenames in os.walk(dest_dir):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                with open(path) as f:
+                    outputs[os.path.relpath(path, dest_dir)] = f.read()
+        return outputs
+
+    def test_build_from_archives_matches_directory_build(self):
+        """Test that pages rendered from archive members match pages rendered from files"""
+        expected = self._build(self.content_dir, "from-dir")
+        self.assertEqual(len(expected), 2)
+        self.assertIn('src="/site/images/logo.png"', expected[os.path.join("blog", "post.html")])
+        self.assertEqual(self._build(self.tar_path, "from-tar"), expected)
+        self.assertEqual(self._build(self.zip_path, "from-zip"), expected)
+        self.assertEqual(self._build(self.tar_path, "from-tar-threads", threaded=True), expected)
+
+    def test_incremental_build_from_archive(self):
+        """Test that archive pages are keyed by their bytes, so unchanged pages are skipped"""
+        file_index = FileIndex(os.path.join(self.test_dir, "cache"))
+        context = BuildContext(file_index=file_index, incremental=True, version="test")
+        self._build(self.tar_path, "public", context=context)
+        context = BuildContext(file_index=file_index, incremental=True, version="test")
+        with redirect_stdout(StringIO()) as output:
+            generate_pages_recursive(self.tar_path, self.template_path, os.path.join(self.test_dir, "public"),
+                                     "/site/", context)
+        self.assertIn("Unchanged pages skipped: 2", output.getvalue())
+
+    def test_missing_archive(self):
+        """Test that a missing content archive is reported and nothing is built"""
+        with redirect_stdout(StringIO()) as output:
+            generate_pages_recursive(os.path.join(self.test_dir, "missing.zip"), self.template_path,
+                                     os.path.join(self.test_dir, "public"))
+        self.assertIn("Content archive does not exist", output.getvalue())
+        self.assertFalse(os.path.exists(os.path.join(self.test_dir, "public")))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,11 +3,18 @@ import sys
 import os
 import tempfile
 import shutil
+from io import StringIO
+from contextlib import redirect_stdout
+from unittest import mock
 
 # Add the src directory to Python path for relative imports
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from copy_static import copy_files_recursive
+from build_context import BuildContext
+import output_writer
+from file_index import FileIndex
+from output_writer import OutputWriter
 
 
 class TestCopyStatic(unittest.TestCase):
@@ -96,6 +103,78 @@ class TestCopyStatic(unittest.TestCase):
         self.assertTrue(os.path.exists(self.dest_dir))
         self.assertEqual(len(os.listdir(self.dest_dir)), 0)
 
+    
+    def test_incremental_copy_skips_unchanged_files(self):
+        """Test that an incremental copy keeps the destination and skips current files"""
+        with open(os.path.join(self.source_dir, "style.css"), "w") as f:
+            f.write("body {}")
+        cache_dir = os.path.join(self.test_dir, "cache")
+        context = BuildContext(file_index=FileIndex(cache_dir), incremental=True)
+        copy_files_recursive(self.source_dir, self.dest_dir, context)
+        
+        extra_file = os.path.join(self.dest_dir, "generated.html")
+        with open(extra_file, "w") as f:
+            f.write("kept")
+        context.file_index.save()
+        
+        context = BuildContext(file_index=FileIndex(cache_dir), incremental=True)
+        copy_files_recursive(self.source_dir, self.dest_dir, context)
+        self.assertTrue(os.path.exists(extra_file))
+        self.assertEqual(context.file_index.hashed + context.file_index.unchanged, 1)
+    
+    def test_changed_file_is_hashed_from_the_copy_mapping(self):
+        """Test that a file the index must hash is read once, through the writer's mapping"""
+        source = os.path.join(self.source_dir, "style.css")
+        with open(source, "w") as f:
+            f.write("body {}")
+        file_index = FileIndex(os.path.join(self.test_dir, "cache"))
+        writer = OutputWriter(self.dest_dir, queue_size=4)
+        context = BuildContext(file_index=file_index, output_writer=writer)
+        mapped = []
+        real_map_file = output_writer.map_file
+        
+        def counting_map_file(path):
+            mapped.append(path)
+            return real_map_file(path)
+        
+        with mock.patch.object(output_writer, "map_file", counting_map_file), \
+                mock.patch("file_index.hash_file", side_effect=AssertionError("read again to hash")), \
+                redirect_stdout(StringIO()):
+            copy_files_recursive(self.source_dir, self.dest_dir, context)
+        writer.close()
+        
+        self.assertEqual(mapped, [source])
+        self.assertEqual(file_index.hashed, 1)
+        dest = os.path.join(self.dest_dir, "style.css")
+        self.assertTrue(file_index.output_is_current(dest, file_index.digest(source)))
+    
+    def test_copy_replaces_hardlinked_destination(self):
+        """Test that copying over a hardlinked file leaves the other link alone"""
+        os.makedirs(self.dest_dir)
+        published = os.path.join(self.test_dir, "published.css")
+        with open(published, "w") as f:
+            f.write("old")
+        os.link(published, os.path.join(self.dest_dir, "style.css"))
+        with open(os.path.join(self.source_dir, "style.css"), "w") as f:
+            f.write("new")
+        copy_files_recursive(self.source_dir, self.dest_dir, clean=False)
+        with open(published) as f:
+            self.assertEqual(f.read(), "old")
+        with open(os.path.join(self.dest_dir, "style.css")) as f:
+            self.assertEqual(f.read(), "new")
+    
+    def test_copy_without_clean_keeps_destination(self):
+        """Test that clean=False copies into the destination without removing its files"""
+        os.makedirs(self.dest_dir)
+        page = os.path.join(self.dest_dir, "index.html")
+        with open(page, "w") as f:
+            f.write("<p>page</p>")
+        with open(os.path.join(self.source_dir, "style.css"), "w") as f:
+            f.write("body {}")
+        copy_files_recursive(self.source_dir, self.dest_dir, clean=False)
+        self.assertTrue(os.path.exists(page))
+        self.assertTrue(os.path.exists(os.path.join(self.dest_dir, "style.css")))
+
 
 if __name__ == "__main__":
     unittest.main()
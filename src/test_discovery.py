@@ -0,0 +1,89 @@
+import unittest
+import sys
+import os
+import tempfile
+import shutil
+
+# Add the src directory to Python path for relative imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from discovery import discover, discover_pages, SourceFile
+
+
+class TestDiscovery(unittest.TestCase):
+    
+    def setUp(self):
+        """Set up a small content tree"""
+        self.root = tempfile.mkdtemp()
+        self._write("index.md", "# Home")
+        self._write("notes.txt", "not a page")
+        self._write(os.path.join("blog", "b.md"), "# B")
+        self._write(os.path.join("blog", "a.md"), "# A")
+        self._write(os.path.join("blog", "deep", "c.md"), "# C")
+        os.makedirs(os.path.join(self.root, "empty"))
+    
+    def tearDown(self):
+        """Clean up test fixtures"""
+        if os.path.exists(self.root):
+            shutil.rmtree(self.root)
+    
+    def _write(self, rel_path, content):
+        path = os.path.join(self.root, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+    
+    def test_discover_all_files(self):
+        """Test that every file is found with its size and mtime"""
+        records = list(discover(self.root))
+        self.assertEqual([record.rel_dest for record in records], [
+            "index.md",
+            "notes.txt",
+            os.path.join("blog", "a.md"),
+            os.path.join("blog", "b.md"),
+            os.path.join("blog", "deep", "c.md"),
+        ])
+        index = records[0]
+        self.assertIsInstance(index, SourceFile)
+        self.assertEqual(index.source, os.path.join(self.root, "index.md"))
+        self.assertEqual(index.size, len("# Home"))
+        self.assertEqual(index.mtime, os.stat(index.source).st_mtime)
+    
+    def test_discover_pages(self):
+        """Test that only markdown files are yielded, mapped to .html"""
+        pages = [page.rel_dest for page in discover_pages(self.root)]
+        self.assertEqual(pages, [
+            "index.html",
+            os.path.join("blog", "a.html"),
+            os.path.join("blog", "b.html"),
+            os.path.join("blog", "deep", "c.html"),
+        ])
+    
+    def test_include_dirs_precede_contents(self):
+        """Test that directory records come before the files inside them"""
+        records = [(record.rel_dest, record.size) for record in discover(self.root, include_dirs=True)]
+        self.assertIn(("empty", None), records)
+        names = [name for name, _ in records]
+        self.assertLess(names.index("blog"), names.index(os.path.join("blog", "a.md")))
+        self.assertLess(names.index(os.path.join("blog", "deep")), names.index(os.path.join("blog", "deep", "c.md")))
+    
+    def test_is_lazy(self):
+        """Test that records are yielded before the walk finishes"""
+        records = discover(self.root)
+        first = next(records)
+        self.assertEqual(first.rel_dest, "index.md")
+        records.close()
+    
+    def test_symlink_loop_is_walked_once(self):
+        """Test that a directory symlink pointing back up doesn't loop"""
+        os.symlink(self.root, os.path.join(self.root, "blog", "loop"))
+        records = [record.rel_dest for record in discover(self.root)]
+        self.assertEqual(len(records), 5)
+    
+    def test_missing_root(self):
+        """Test that a missing directory yields nothing"""
+        self.assertEqual(list(discover(os.path.join(self.root, "missing"))), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
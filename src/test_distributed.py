@@ -0,0 +1,206 @@
+import unittest
+import sys
+import os
+import json
+import socket
+import tempfile
+import shutil
+import time
+import multiprocessing
+
+# Add the src directory to Python path for relative imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from distributed import Coordinator, run_worker, parse_address
+from generate_page import generate_page
+
+TEMPLATE = '<title>{{ Title }}</title><a href="/">home</a>{{ Content }}'
+
+
+class _RawWorker:
+    """Speaks the protocol by hand, to act as a slow or broken worker."""
+    
+    def __init__(self, address):
+        family, connect_address = parse_address(address)
+        self.sock = socket.create_connection(connect_address)
+        self.reader = self.sock.makefile('r', encoding='utf-8')
+        self.send({"type": "hello", "worker": "raw"})
+        self.receive()
+    
+    def send(self, message):
+        self.sock.sendall((json.dumps(message) + "\n").encode('utf-8'))
+    
+    def receive(self):
+        return json.loads(self.reader.readline())
+    
+    def request(self):
+        self.send({"type": "request"})
+        return self.receive()
+    
+    def close(self):
+        self.reader.close()
+        self.sock.close()
+
+
+class TestDistributed(unittest.TestCase):
+    
+    def setUp(self):
+        """Set up markdown pages and their destinations"""
+        self.test_dir = tempfile.mkdtemp()
+        self.pages = []
+        for i in range(12):
+            source = os.path.join(self.test_dir, "content", f"page{i}.md")
+            os.makedirs(os.path.dirname(source), exist_ok=True)
+            with open(source, "w") as f:
+                f.write(f"# Page {i}\n\nSee [next](/page{i + 1}.html)\n\n- one\n- two\n")
+            self.pages.append((source, os.path.join(self.test_dir, "out", f"page{i}.html")))
+    
+    def tearDown(self):
+        """Clean up test fixtures"""
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+    
+    def _start_workers(self, address, count):
+        processes = [multiprocessing.Process(target=run_worker, args=(address, f"w{i}")) for i in range(count)]
+        for process in processes:
+            process.start()
+        return processes
+    
+    def _join(self, processes):
+        for process in processes:
+            process.join(30)
+            self.assertEqual(process.exitcode, 0)
+    
+    def _expected(self, source):
+        template_path = os.path.join(self.test_dir, "template.html")
+        with open(template_path, "w") as f:
+            f.write(TEMPLATE)
+        dest = os.path.join(self.test_dir, "expected.html")
+        generate_page(source, template_path, dest, "/site/")
+        with open(dest) as f:
+            return f.read()
+    
+    def _assert_all_written(self):
+        for source, dest in self.pages:
+            with open(dest) as f:
+                self.assertEqual(f.read(), self._expected(source))
+    
+    def test_parse_address(self):
+        """Test TCP and Unix socket addresses"""
+        self.assertEqual(parse_address("127.0.0.1:8000"), (socket.AF_INET, ("127.0.0.1", 8000)))
+        self.assertEqual(parse_address(":0"), (socket.AF_INET, ("127.0.0.1", 0)))
+        self.assertEqual(parse_address("unix:/tmp/s.sock"), (socket.AF_UNIX, "/tmp/s.sock"))
+        with self.assertRaises(ValueError):
+            parse_address("localhost")
+    
+    def test_several_local_workers(self):
+        """Test that worker processes on localhost render every page"""
+        coordinator = Coordinator(self.pages, TEMPLATE, "/site/")
+        processes = self._start_workers(coordinator.address, 3)
+        self.assertTrue(coordinator.serve(timeout=30))
+        self._join(processes)
+        
+        self.assertEqual(sorted(coordinator.completed), sorted(dest for _, dest in self.pages))
+        self.assertEqual(coordinator.failed, {})
+        self.assertEqual(sum(coordinator.per_worker.values()), len(self.pages))
+        self._assert_all_written()
+    
+    def test_unix_socket(self):
+        """Test that workers can connect over a Unix socket"""
+        address = "unix:" + os.path.join(self.test_dir, "coordinator.sock")
+        coordinator = Coordinator(self.pages, TEMPLATE, "/site/", address)
+        processes = self._start_workers(address, 2)
+        self.assertTrue(coordinator.serve(timeout=30))
+        self._join(processes)
+        self._assert_all_written()
+    
+    def test_batches_shrink_as_queue_drains(self):
+        """Test that batch sizes follow the remaining queue"""
+        coordinator = Coordinator(self.pages[:10], TEMPLATE)
+        coordinator.start()
+        worker = _RawWorker(coordinator.address)
+        sizes = []
+        while True:
+            batch = worker.request()
+            if batch["type"] != "batch":
+                break
+            sizes.append(len(batch["pages"]))
+        worker.close()
+        self.assertFalse(coordinator.wait(timeout=0))
+        self.assertEqual(sizes, [5, 3, 1, 1])
+    
+    def test_stalled_worker_is_covered_by_speculation(self):
+        """Test that pages held by a worker that never answers are re-issued"""
+        coordinator = Coordinator(self.pages, TEMPLATE, "/site/")
+        coordinator.start()
+        stalled = _RawWorker(coordinator.address)
+        held = stalled.request()["pages"]
+        self.assertTrue(held)
+        
+        processes = self._start_workers(coordinator.address, 2)
+        self.assertTrue(coordinator.wait(timeout=30))
+        self._join(processes)
+        stalled.close()
+        
+        self.assertGreaterEqual(coordinator.speculative, len(held))
+        self._assert_all_written()
+    
+    def test_disconnected_worker_pages_are_requeued(self):
+        """Test that pages of a worker that disconnects go back in the queue"""
+        coordinator = Coordinator(self.pages, TEMPLATE, "/site/")
+        coordinator.start()
+        quitter = _RawWorker(coordinator.address)
+        self.assertTrue(quitter.request()["pages"])
+        quitter.close()
+        
+        processes = self._start_workers(coordinator.address, 1)
+        self.assertTrue(coordinator.wait(timeout=30))
+        self._join(processes)
+        self._assert_all_written()
+    
+    def test_render_errors_are_reported(self):
+        """Test that a page that fails to render is recorded as failed"""
+        with open(self.pages[0][0], "w") as f:
+            f.write("no title here\n")
+        coordinator = Coordinator(self.pages, TEMPLATE, "/site/")
+        processes = self._start_workers(coordinator.address, 2)
+        self.assertTrue(coordinator.serve(timeout=30))
+        self._join(processes)
+        
+        self.assertEqual(list(coordinator.failed), [self.pages[0][1]])
+        self.assertIn("h1", coordinator.failed[self.pages[0][1]])
+        self.assertEqual(len(coordinator.completed), len(self.pages) - 1)
+    
+    def test_dead_local_workers_fail_the_build(self):
+        """Test that pages fail instead of waiting forever once every local worker has died"""
+        coordinator = Coordinator(self.pages, TEMPLATE, "/site/")
+        processes = [multiprocessing.Process(target=os._exit, args=(3,)) for _ in range(2)]
+        for process in processes:
+            process.start()
+        started = time.monotonic()
+        self.assertTrue(coordinator.serve(timeout=30, local_processes=processes))
+        for process in processes:
+            process.join(30)
+        
+        self.assertLess(time.monotonic() - started, 10)
+        self.assertEqual(coordinator.completed, [])
+        self.assertEqual(sorted(coordinator.failed), sorted(dest for _, dest in self.pages))
+        self.assertIn("exit codes 3, 3", coordinator.failed[self.pages[0][1]])
+    
+    def test_live_local_workers_are_waited_for(self):
+        """Test that liveness checks don't cut short a build whose workers are running"""
+        coordinator = Coordinator(self.pages, TEMPLATE, "/site/")
+        processes = self._start_workers(coordinator.address, 2)
+        self.assertTrue(coordinator.serve(timeout=30, local_processes=processes))
+        self._join(processes)
+        self.assertEqual(coordinator.failed, {})
+        self._assert_all_written()
+    
+    def test_no_pages(self):
+        """Test that a coordinator with nothing to do finishes at once"""
+        coordinator = Coordinator([], TEMPLATE)
+        self.assertTrue(coordinator.serve(timeout=5))
+
+
+if __name__ == "__main__":
+    unittest.main()
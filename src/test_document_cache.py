@@ -0,0 +1,134 @@
+import unittest
+import sys
+import os
+import tempfile
+import shutil
+from unittest import mock
+
+# Add the src directory to Python path for relative imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import document_cache
+from document_cache import DocumentCache, node_to_tuple, tuple_to_node
+from markdown_to_html import markdown_to_html_node
+from parentnode import ParentNode
+from block_cache import BlockCache
+from build_context import BuildContext
+from generate_page import generate_page
+
+
+class TestDocumentCache(unittest.TestCase):
+    
+    MARKDOWN = "# Title\n\nA [link](/a) and ![img](/b.png)\n\n```\ncode\n```\n\n1. one\n2. two\n"
+    
+    def setUp(self):
+        """Set up a temporary cache and content directory"""
+        self.test_dir = tempfile.mkdtemp()
+        # Cleanups run last-in first-out: caches are closed before the directory goes
+        self.addCleanup(shutil.rmtree, self.test_dir, ignore_errors=True)
+        self.cache_dir = os.path.join(self.test_dir, "cache")
+        self.md_path = os.path.join(self.test_dir, "page.md")
+        self._write(self.MARKDOWN)
+    
+    def _cache(self):
+        """Open a document cache, closing it when the test ends"""
+        cache = DocumentCache(self.cache_dir)
+        self.addCleanup(cache.close)
+        return cache
+    
+    def _write(self, content):
+        with open(self.md_path, "w") as f:
+            f.write(content)
+    
+    def test_tuple_round_trip(self):
+        """Test that serializing and rebuilding a tree preserves its HTML"""
+        node = markdown_to_html_node(self.MARKDOWN)
+        rebuilt = tuple_to_node(node_to_tuple(node))
+        
+        self.assertIsInstance(rebuilt, ParentNode)
+        self.assertEqual(rebuilt.to_html(), node.to_html())
+    
+    def test_load_hits_on_unchanged_file(self):
+        """Test that a second cache instance loads the tree without parsing"""
+        expected = markdown_to_html_node(self.MARKDOWN).to_html()
+        
+        first = self._cache()
+        self.assertEqual(first.load(self.md_path).to_html(), expected)
+        self.assertEqual((first.hits, first.misses), (0, 1))
+        
+        second = self._cache()
+        self.assertEqual(second.load(self.md_path).to_html(), expected)
+        self.assertEqual((second.hits, second.misses), (1, 0))
+    
+    def test_changed_file_misses(self):
+        """Test that the key follows the file content"""
+        cache = self._cache()
+        cache.load(self.md_path)
+        self._write(self.MARKDOWN + "\nMore text\n")
+        
+        self.assertIn("<p>More text</p>", cache.load(self.md_path).to_html())
+        self.assertEqual(cache.misses, 2)
+    
+    def test_corrupt_entry_is_a_miss(self):
+        """Test that an unreadable entry is ignored and the file is parsed"""
+        cache = self._cache()
+        with open(self.md_path, "rb") as f:
+            cache.store.put(cache.key(f.read()), b"not marshal data")
+        
+        self.assertEqual(cache.load(self.md_path).to_html(), markdown_to_html_node(self.MARKDOWN).to_html())
+        self.assertEqual(cache.misses, 1)
+    
+    def test_edited_page_reuses_cached_blocks(self):
+        """Test that a document cache miss takes unchanged blocks' trees from the block cache"""
+        template_path = os.path.join(self.test_dir, "template.html")
+        with open(template_path, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+        dest_path = os.path.join(self.test_dir, "public", "page.html")
+        
+        def build():
+            block_cache = BlockCache(self.cache_dir, version="test")
+            document_cache = DocumentCache(self.cache_dir, version="test")
+            context = BuildContext(block_cache=block_cache, document_cache=document_cache, log=lambda message: None)
+            try:
+                generate_page(self.md_path, template_path, dest_path, "/", context)
+            finally:
+                block_cache.close()
+                document_cache.close()
+            with open(dest_path) as f:
+                return block_cache, document_cache, f.read()
+        
+        block_cache, _, _ = build()
+        self.assertEqual(block_cache.hits, 0)
+        self.assertGreater(block_cache.misses, 0)
+        
+        self._write(self.MARKDOWN + "\nMore text\n")
+        block_cache, document_cache, html = build()
+        self.assertEqual(document_cache.misses, 1)
+        self.assertEqual(block_cache.misses, 1)
+        self.assertGreater(block_cache.hits, 0)
+        self.assertIn("<p>More text</p>", html)
+        expected = markdown_to_html_node(self.MARKDOWN + "\nMore text\n")
+        self.assertIn(expected.to_html(), html)
+        
+        # The cached document is the full tree, whether or not a block cache built it
+        tree = self._cache().load(self.md_path)
+        self.assertEqual(node_to_tuple(tree), node_to_tuple(expected))
+        self.assertEqual([child.tag for child in tree.children], ["h1", "p", "pre", "ol", "p"])
+        self.assertEqual(tree.children[1].children[1].props, {"href": "/a"})
+    
+    def test_tree_built_by_workers(self):
+        """Test that block workers build the same tree as markdown_to_html_node()"""
+        markdown = "\n\n".join(f"Paragraph {i} with [a link](/{i})" for i in range(300))
+        self._write(markdown)
+        block_cache = BlockCache(self.cache_dir, version="test")
+        self.addCleanup(block_cache.close)
+        
+        with mock.patch.object(document_cache, "should_render_in_parallel", return_value=True):
+            tree = self._cache().load(self.md_path, block_cache=block_cache, workers=2)
+        
+        self.assertEqual(node_to_tuple(tree), node_to_tuple(markdown_to_html_node(markdown)))
+        self.assertEqual(block_cache.misses, 300)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,204 @@
+import unittest
+import sys
+import os
+import time
+import hashlib
+import tempfile
+import shutil
+import threading
+
+# Add the src directory to Python path for relative imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from file_index import FileIndex, hash_file, RACY_WINDOW_NS
+
+
+class TestFileIndex(unittest.TestCase):
+    
+    def setUp(self):
+        """Set up a cache directory and an old source file"""
+        self.test_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.test_dir, "cache")
+        self.source = os.path.join(self.test_dir, "page.md")
+        self._write(self.source, "# Page")
+    
+    def tearDown(self):
+        """Clean up test fixtures"""
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+    
+    def _write(self, path, content):
+        with open(path, "w") as f:
+            f.write(content)
+        # Older than the racy window, so the index may trust its stat
+        old = time.time() - 2 * RACY_WINDOW_NS / 1e9
+        os.utime(path, (old, old))
+    
+    def test_hash_file(self):
+        """Test that hash_file is a plain SHA-256 of the contents"""
+        self.assertEqual(hash_file(self.source), hashlib.sha256(b"# Page").hexdigest())
+    
+    def test_unchanged_file_is_not_rehashed(self):
+        """Test that a matching stat signature skips hashing"""
+        index = FileIndex(self.cache_dir)
+        digest = index.digest(self.source)
+        self.assertEqual(index.hashed, 1)
+        index.save()
+        
+        index = FileIndex(self.cache_dir)
+        self.assertEqual(index.digest(self.source), digest)
+        self.assertEqual((index.hashed, index.unchanged), (0, 1))
+    
+    def test_changed_file_is_rehashed(self):
+        """Test that a different size or mtime triggers hashing"""
+        index = FileIndex(self.cache_dir)
+        digest = index.digest(self.source)
+        index.save()
+        
+        self._write(self.source, "# Changed")
+        index = FileIndex(self.cache_dir)
+        self.assertNotEqual(index.digest(self.source), digest)
+        self.assertEqual(index.hashed, 1)
+    
+    def test_recently_modified_file_is_rehashed(self):
+        """Test that entries inside the racy window are not trusted"""
+        with open(self.source, "w") as f:
+            f.write("# Fresh")
+        index = FileIndex(self.cache_dir)
+        index.digest(self.source)
+        index.save()
+        
+        index = FileIndex(self.cache_dir)
+        index.digest(self.source)
+        self.assertEqual(index.hashed, 1)
+    
+    def test_output_records(self):
+        """Test that outputs are current only for the same key and file"""
+        output = os.path.join(self.test_dir, "page.html")
+        self._write(output, "<h1>Page</h1>")
+        index = FileIndex(self.cache_dir)
+        index.record_output(output, "key-1")
+        index.save()
+        
+        index = FileIndex(self.cache_dir)
+        self.assertTrue(index.output_is_current(output, "key-1"))
+        self.assertFalse(index.output_is_current(output, "key-2"))
+        
+        self._write(output, "<h1>Edited by hand</h1>")
+        self.assertFalse(index.output_is_current(output, "key-1"))
+        os.remove(output)
+        self.assertFalse(index.output_is_current(output, "key-1"))
+    
+    def test_save_drops_deleted_files(self):
+        """Test that entries for deleted files are pruned"""
+        index = FileIndex(self.cache_dir)
+        index.digest(self.source)
+        index.save()
+        
+        os.remove(self.source)
+        index = FileIndex(self.cache_dir)
+        index.save()
+        self.assertEqual(FileIndex(self.cache_dir)._files, {})
+    
+    def test_changed_paths_vouch_for_other_files(self):
+        """Test that files outside changed_paths reuse their hash without a stat check"""
+        index = FileIndex(self.cache_dir)
+        digest = index.digest(self.source)
+        index.vcs_state = ("commit-1", ())
+        index.save()
+        
+        # Touched but reported unchanged: the recorded hash is reused
+        os.utime(self.source)
+        index = FileIndex(self.cache_dir)
+        self.assertEqual(index.previous_vcs_state, ("commit-1", ()))
+        index.changed_paths = set()
+        self.assertEqual(index.digest(self.source), digest)
+        self.assertEqual(index.hashed, 0)
+        
+        index.changed_paths = {os.path.abspath(self.source)}
+        index.digest(self.source)
+        self.assertEqual(index.hashed, 1)
+    
+    def test_entries_changed_without_snapshot_drop_it(self):
+        """Test that a build without a change source invalidates the stored snapshot"""
+        index = FileIndex(self.cache_dir)
+        index.vcs_state = ("commit-1", ())
+        index.save()
+        
+        index = FileIndex(self.cache_dir)
+        index.digest(self.source)
+        index.save()
+        self.assertIsNone(FileIndex(self.cache_dir).previous_vcs_state)
+    
+    def test_corrupt_index_starts_empty(self):
+        """Test that an unreadable index file is ignored"""
+        os.makedirs(self.cache_dir)
+        with open(os.path.join(self.cache_dir, "files.index"), "wb") as f:
+            f.write(b"not marshal data")
+        index = FileIndex(self.cache_dir)
+        index.digest(self.source)
+        self.assertEqual(index.hashed, 1)
+    
+    def test_move_outputs(self):
+        """Test that output records follow files renamed to another directory"""
+        output = os.path.join(self.test_dir, "docs")
+        staging = os.path.join(self.test_dir, ".docs.staging")
+        os.makedirs(output)
+        page = os.path.join(output, "index.html")
+        self._write(page, "<p>page</p>")
+        index = FileIndex(self.cache_dir)
+        index.record_output(page, "key")
+        
+        shutil.copytree(output, staging, copy_function=os.link)
+        index.move_outputs(output, staging)
+        self.assertFalse(index.output_is_current(page, "key"))
+        self.assertTrue(index.output_is_current(os.path.join(staging, "index.html"), "key"))
+    
+    def test_stale_outputs(self):
+        """Test that outputs recorded by an earlier build and not seen since are stale"""
+        output = os.path.join(self.test_dir, "docs")
+        os.makedirs(output)
+        kept = os.path.join(output, "kept.html")
+        removed = os.path.join(output, "removed.html")
+        outside = os.path.join(self.test_dir, "other.html")
+        for path in (kept, removed, outside):
+            self._write(path, "<p>page</p>")
+        index = FileIndex(self.cache_dir)
+        for path in (kept, removed, outside):
+            index.record_output(path, "key")
+        index.save()
+        
+        index = FileIndex(self.cache_dir)
+        self.assertTrue(index.output_is_current(kept, "key"))
+        self.assertEqual(index.stale_outputs(output), [removed])
+        index.forget_output(removed)
+        self.assertEqual(index.stale_outputs(output), [])
+        self.assertFalse(index.output_is_current(removed, "key"))
+    
+    def test_concurrent_records(self):
+        """Test that threads hashing different files keep every entry and count"""
+        paths = [os.path.join(self.test_dir, f"file{i}.txt") for i in range(200)]
+        for i, path in enumerate(paths):
+            self._write(path, f"content {i}")
+        index = FileIndex(self.cache_dir)
+        
+        def work(offset):
+            for path in paths[offset::4]:
+                index.digest(path)
+        
+        threads = [threading.Thread(target=work, args=(offset,)) for offset in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        index.save()
+        
+        self.assertEqual(index.hashed, 200)
+        index = FileIndex(self.cache_dir)
+        for path in paths:
+            index.digest(path)
+        self.assertEqual((index.hashed, index.unchanged), (0, 200))
+
+
+if __name__ == "__main__":
+    unittest.main()
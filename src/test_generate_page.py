@@ -0,0 +1,80 @@
+import unittest
+import sys
+import os
+import tempfile
+import shutil
+
+# Add the src directory to Python path for relative imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from generate_page import generate_page, render_page
+
+
+class TestGeneratePage(unittest.TestCase):
+    
+    def setUp(self):
+        """Set up a temporary directory with a template"""
+        self.test_dir = tempfile.mkdtemp()
+        self.template_path = os.path.join(self.test_dir, "template.html")
+        with open(self.template_path, "w") as f:
+            f.write('<title>{{ Title }}</title><link href="/index.css"><article>{{ Content }}</article>')
+    
+    def tearDown(self):
+        """Clean up test fixtures"""
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+    
+    def _write_markdown(self, content):
+        path = os.path.join(self.test_dir, "page.md")
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+    
+    def _read(self, path):
+        with open(path) as f:
+            return f.read()
+    
+    def test_generates_page_with_basepath(self):
+        """Test title, content and basepath are all applied"""
+        md_path = self._write_markdown("# Hello\n\nSee [home](/index.html) and ![pic](/images/a.png)\n")
+        dest = os.path.join(self.test_dir, "out", "nested", "index.html")
+        
+        generate_page(md_path, self.template_path, dest, "/site/")
+        
+        self.assertEqual(
+            self._read(dest),
+            '<title>Hello</title><link href="/site/index.css"><article><div><h1>Hello</h1>'
+            '<p>See <a href="/site/index.html">home</a> and <img src="/site/images/a.png" alt="pic"></img></p>'
+            '</div></article>',
+        )
+    
+    def test_failed_render_leaves_no_output(self):
+        """Test that a conversion error does not leave a partial page behind"""
+        md_path = self._write_markdown("# Title\n\nUnclosed **bold\n")
+        dest = os.path.join(self.test_dir, "index.html")
+        
+        with self.assertRaises(Exception):
+            generate_page(md_path, self.template_path, dest)
+        
+        self.assertFalse(os.path.exists(dest))
+        self.assertFalse(os.path.exists(dest + ".tmp"))
+    
+    def test_render_page_matches_generate_page(self):
+        """Test that in-memory rendering produces the same page as generate_page"""
+        markdown = "# Hello\n\n```\ncode\n\nmore\n```\n\n- [a](/a.html)\n- b\n\n> quote\n"
+        md_path = self._write_markdown(markdown)
+        dest = os.path.join(self.test_dir, "index.html")
+        generate_page(md_path, self.template_path, dest, "/site/")
+        
+        template = self._read(self.template_path)
+        self.assertEqual(render_page(markdown, template, "/site/"), self._read(dest))
+    
+    def test_missing_markdown_file(self):
+        """Test that a missing source raises FileNotFoundError"""
+        with self.assertRaises(FileNotFoundError):
+            generate_page(os.path.join(self.test_dir, "missing.md"), self.template_path,
+                          os.path.join(self.test_dir, "index.html"))
+
+
+if __name__ == "__main__":
+    unittest.main()
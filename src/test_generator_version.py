@@ -0,0 +1,52 @@
+import unittest
+import sys
+import os
+import tempfile
+import shutil
+
+# Add the src directory to Python path for relative imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from generator_version import generator_version, GENERATOR_VERSION
+
+
+class TestGeneratorVersion(unittest.TestCase):
+    
+    def setUp(self):
+        """Set up a fake source directory"""
+        self.source_dir = tempfile.mkdtemp()
+        self._write("module.py", "x = 1\n")
+        self._write("test_module.py", "y = 1\n")
+        self._write("notes.txt", "ignored\n")
+    
+    def tearDown(self):
+        """Clean up test fixtures"""
+        if os.path.exists(self.source_dir):
+            shutil.rmtree(self.source_dir)
+    
+    def _write(self, name, content):
+        with open(os.path.join(self.source_dir, name), "w") as f:
+            f.write(content)
+    
+    def test_version_is_stable(self):
+        """Test that unchanged sources give the same version"""
+        version = generator_version(self.source_dir)
+        self.assertTrue(version.startswith(GENERATOR_VERSION + "-"))
+        self.assertEqual(version, generator_version(self.source_dir))
+    
+    def test_source_change_changes_version(self):
+        """Test that editing a source file invalidates the version"""
+        version = generator_version(self.source_dir)
+        self._write("module.py", "x = 2\n")
+        self.assertNotEqual(version, generator_version(self.source_dir))
+    
+    def test_tests_and_other_files_are_ignored(self):
+        """Test that only non-test Python sources count"""
+        version = generator_version(self.source_dir)
+        self._write("test_module.py", "y = 2\n")
+        self._write("notes.txt", "changed\n")
+        self.assertEqual(version, generator_version(self.source_dir))
+
+
+if __name__ == "__main__":
+    unittest.main()
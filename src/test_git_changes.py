@@ -0,0 +1,105 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import subprocess
+
+# Add the src directory to Python path for relative imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from git_changes import GitChangeSource
+
+
+@unittest.skipIf(shutil.which("git") is None, "git is not installed")
+class TestGitChangeSource(unittest.TestCase):
+    
+    def setUp(self):
+        """Set up a repository with one committed page"""
+        self.repo = os.path.realpath(tempfile.mkdtemp())
+        self._git("init", "-q")
+        self._git("config", "user.email", "test@example.com")
+        self._git("config", "user.name", "Test")
+        self._write("content/index.md", "# Home")
+        self._write("content/about.md", "# About")
+        self._write("notes.txt", "not an input")
+        self._commit()
+        self.source = GitChangeSource(self.repo, pathspecs=("content",))
+    
+    def tearDown(self):
+        """Clean up test fixtures"""
+        if os.path.exists(self.repo):
+            shutil.rmtree(self.repo)
+    
+    def _git(self, *args):
+        subprocess.run(["git", "-C", self.repo, *args], check=True, capture_output=True)
+    
+    def _write(self, rel_path, content):
+        path = os.path.join(self.repo, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+    
+    def _commit(self):
+        self._git("add", "-A")
+        self._git("commit", "-q", "-m", "change")
+    
+    def _path(self, rel_path):
+        return os.path.join(self.repo, rel_path)
+    
+    def test_clean_tree_has_no_changes(self):
+        """Test that nothing changed between identical snapshots"""
+        snapshot = self.source.snapshot()
+        self.assertEqual(snapshot[1], ())
+        self.assertEqual(self.source.changed_since(snapshot, self.source.snapshot()), set())
+    
+    def test_committed_changes(self):
+        """Test that files changed between commits are reported"""
+        previous = self.source.snapshot()
+        self._write("content/index.md", "# New home")
+        self._write("notes.txt", "outside the pathspecs")
+        self._commit()
+        self.assertEqual(self.source.changed_since(previous, self.source.snapshot()),
+                         {self._path("content/index.md")})
+    
+    def test_renames_report_both_paths(self):
+        """Test that a rename marks the old and new path as changed"""
+        previous = self.source.snapshot()
+        self._git("mv", "content/about.md", "content/team.md")
+        self._commit()
+        self.assertEqual(self.source.changed_since(previous, self.source.snapshot()),
+                         {self._path("content/about.md"), self._path("content/team.md")})
+    
+    def test_dirty_and_untracked_files(self):
+        """Test that uncommitted and untracked inputs are reported"""
+        previous = self.source.snapshot()
+        self._write("content/index.md", "# Edited")
+        self._write("content/draft.md", "# Draft")
+        self.assertEqual(self.source.changed_since(previous, self.source.snapshot()),
+                         {self._path("content/index.md"), self._path("content/draft.md")})
+    
+    def test_reverted_edit_is_still_changed(self):
+        """Test that a file dirty at the last build counts after it is reverted"""
+        self._write("content/index.md", "# Edited")
+        previous = self.source.snapshot()
+        self._git("checkout", "content/index.md")
+        self.assertEqual(self.source.changed_since(previous, self.source.snapshot()),
+                         {self._path("content/index.md")})
+    
+    def test_unknown_previous_commit(self):
+        """Test that a commit git doesn't know falls back to None"""
+        previous = ("0" * 40, ())
+        self.assertIsNone(self.source.changed_since(previous, self.source.snapshot()))
+        self.assertIsNone(self.source.changed_since(None, self.source.snapshot()))
+    
+    def test_not_a_repository(self):
+        """Test that a directory outside git has no snapshot"""
+        outside = tempfile.mkdtemp()
+        try:
+            self.assertIsNone(GitChangeSource(outside).snapshot())
+        finally:
+            shutil.rmtree(outside)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+import sys
+import os
+import threading
+
+# Add the src directory to Python path for relative imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from textnode import TextNode, TextType
+from text_to_textnodes import text_to_textnodes
+from inline_cache import InlineCache
+from markdown_to_html import markdown_to_html_node
+
+
+class TestInlineCache(unittest.TestCase):
+    
+    def test_cached_result_matches_parser(self):
+        """Test that hits and misses both match text_to_textnodes"""
+        cache = InlineCache()
+        text = "Some **bold** and a [link](https://boot.dev)"
+        
+        self.assertEqual(cache.text_to_textnodes(text), text_to_textnodes(text))
+        self.assertEqual(cache.text_to_textnodes(text), text_to_textnodes(text))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual(cache.hit_rate(), 0.5)
+    
+    def test_results_are_not_shared(self):
+        """Test that mutating a returned node does not corrupt the cache"""
+        cache = InlineCache()
+        nodes = cache.text_to_textnodes("plain text")
+        nodes[0].text = "changed"
+        
+        self.assertEqual(cache.text_to_textnodes("plain text"), [TextNode("plain text", TextType.NORMAL)])
+    
+    def test_entry_limit_evicts_least_recently_used(self):
+        """Test LRU eviction by entry count"""
+        cache = InlineCache(max_entries=2)
+        cache.text_to_textnodes("a")
+        cache.text_to_textnodes("b")
+        cache.text_to_textnodes("a")  # a is now most recently used
+        cache.text_to_textnodes("c")  # evicts b
+        
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.evictions, 1)
+        cache.text_to_textnodes("a")
+        self.assertEqual(cache.hits, 2)
+        cache.text_to_textnodes("b")
+        self.assertEqual(cache.misses, 4)
+    
+    def test_memory_limit(self):
+        """Test that the byte limit is enforced and oversized entries are skipped"""
+        cache = InlineCache(max_entries=1000, max_bytes=2000)
+        for i in range(50):
+            cache.text_to_textnodes(f"line number {i}")
+        self.assertLessEqual(cache.current_bytes, 2000)
+        self.assertGreater(cache.evictions, 0)
+        
+        cache.text_to_textnodes("x" * 5000)
+        self.assertLessEqual(cache.current_bytes, 2000)
+    
+    def test_invalid_markdown_still_raises(self):
+        """Test that parse errors are not cached as results"""
+        cache = InlineCache()
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                cache.text_to_textnodes("unclosed **bold")
+    
+    def test_markdown_to_html_with_inline_cache(self):
+        """Test repeated list items render identically through the cache"""
+        md = "- **Home** | [About](/about)\n- **Home** | [About](/about)\n\n**Home** | [About](/about)"
+        cache = InlineCache()
+        
+        self.assertEqual(markdown_to_html_node(md, inline_cache=cache).to_html(),
+                         markdown_to_html_node(md).to_html())
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+    
+    def test_shared_between_threads(self):
+        """Test that concurrent lookups keep the counters and size consistent"""
+        cache = InlineCache(max_entries=20)
+        texts = [f"item **{i}** of [the list](/list/{i})" for i in range(40)]
+        
+        def work():
+            for _ in range(5):
+                for text in texts:
+                    self.assertEqual(cache.text_to_textnodes(text), text_to_textnodes(text))
+        
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(cache.hits + cache.misses, 4 * 5 * 40)
+        self.assertLessEqual(len(cache), 20)
+        self.assertEqual(cache.current_bytes, sum(size for _, size in cache._entries.values()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,184 @@
+import unittest
+import sys
+import os
+import tempfile
+import shutil
+import json
+from io import StringIO
+from contextlib import redirect_stdout
+from unittest import mock
+
+# Add the src directory to Python path for relative imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from journal import BuildJournal, journal_path, SYNC_EVERY_PAGES
+from build_context import BuildContext
+from file_index import FileIndex
+from generate_pages_recursive import generate_pages_recursive
+
+HEADER = {"output": "/site/public", "basepath": "/", "generator": "1-test", "shard": None}
+
+
+class TestBuildJournal(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a cache directory and one written page"""
+        self.test_dir = tempfile.mkdtemp()
+        self.path = journal_path(os.path.join(self.test_dir, "cache"), "public")
+        self.page = os.path.join(self.test_dir, "index.html")
+        with open(self.page, "w") as f:
+            f.write("<p>done</p>")
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def test_journal_path_depends_on_output(self):
+        """Test that different output directories get different journals"""
+        self.assertNotEqual(journal_path("cache", "public"), journal_path("cache", "docs"))
+
+    def test_resume_after_interruption(self):
+        """Test that records of a closed but unfinished build are reused"""
+        journal = BuildJournal(self.path, HEADER)
+        journal.record("index.html", "key1", self.page)
+        journal.close()
+
+        journal = BuildJournal(self.path, HEADER, resume=True)
+        self.assertTrue(journal.is_complete("index.html", "key1", self.page))
+        self.assertFalse(journal.is_complete("index.html", "key2", self.page))
+        self.assertFalse(journal.is_complete("other.html", "key1", self.page))
+        self.assertEqual(journal.resumed, 1)
+        journal.close()
+
+    def test_modified_output_is_not_complete(self):
+        """Test that an output changed after it was journaled is rebuilt"""
+        journal = BuildJournal(self.path, HEADER)
+        journal.record("index.html", "key1", self.page)
+        journal.close()
+        with open(self.page, "w") as f:
+            f.write("<p>DONE</p>")
+        # Same size; make sure the rewrite isn't within the filesystem's timestamp granularity
+        stat = os.stat(self.page)
+        os.utime(self.page, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        journal = BuildJournal(self.path, HEADER, resume=True)
+        self.assertFalse(journal.is_complete("index.html", "key1", self.page))
+        journal.close()
+
+    def test_record_does_not_read_the_output(self):
+        """Test that journaling a page stats its output instead of hashing it"""
+        journal = BuildJournal(self.path, HEADER)
+        with mock.patch("builtins.open", side_effect=AssertionError("output read")):
+            journal.record("index.html", "key1", self.page)
+        journal.close()
+        with open(self.path) as f:
+            record = json.loads(f.read().splitlines()[1])
+        self.assertEqual((record["size"], record["mtime_ns"]),
+                         (os.path.getsize(self.page), os.stat(self.page).st_mtime_ns))
+
+    def test_torn_tail_is_ignored(self):
+        """Test that a partly written last record doesn't break resuming"""
+        journal = BuildJournal(self.path, HEADER)
+        journal.record("index.html", "key1", self.page)
+        journal.close()
+        with open(self.path, "a") as f:
+            f.write('{"page": "half.ht')
+
+        journal = BuildJournal(self.path, HEADER, resume=True)
+        self.assertEqual(list(journal.previous), ["index.html"])
+        journal.record("second.html", "key2", self.page)
+        journal.close()
+        journal = BuildJournal(self.path, HEADER, resume=True)
+        self.assertEqual(sorted(journal.previous), ["index.html", "second.html"])
+        journal.close()
+
+    def test_other_build_is_not_resumed(self):
+        """Test that a journal for another basepath or generator is ignored"""
+        journal = BuildJournal(self.path, HEADER)
+        journal.record("index.html", "key1", self.page)
+        journal.close()
+        journal = BuildJournal(self.path, dict(HEADER, basepath="/repo/"), resume=True)
+        self.assertEqual(journal.previous, {})
+        self.assertTrue(journal.mismatch)
+        journal.close()
+
+    def test_without_resume_starts_over(self):
+        """Test that a normal build replaces the old journal"""
+        journal = BuildJournal(self.path, HEADER)
+        journal.record("index.html", "key1", self.page)
+        journal.close()
+        BuildJournal(self.path, HEADER).close()
+        journal = BuildJournal(self.path, HEADER, resume=True)
+        self.assertEqual(journal.previous, {})
+        self.assertFalse(journal.mismatch)
+        journal.close()
+
+    def test_complete_removes_journal(self):
+        """Test that a finished build leaves nothing to resume"""
+        journal = BuildJournal(self.path, HEADER)
+        journal.record("index.html", "key1", self.page)
+        journal.complete()
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_fsync_is_batched(self):
+        """Test that records are synced once per batch, not once per page"""
+        journal = BuildJournal(self.path, HEADER)
+        with mock.patch("journal.os.fsync") as fsync, mock.patch("journal.SYNC_EVERY_SECONDS", 3600):
+            for i in range(SYNC_EVERY_PAGES * 2 + 10):
+                journal.record(f"page{i}.html", "key", self.page)
+            self.assertEqual(fsync.call_count, 2)
+            journal.close()
+            self.assertEqual(fsync.call_count, 3)
+
+
+class TestResumeBuild(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a small site"""
+        self.test_dir = tempfile.mkdtemp()
+        self.content_dir = os.path.join(self.test_dir, "content")
+        self.cache_dir = os.path.join(self.test_dir, "cache")
+        self.output = os.path.join(self.test_dir, "public")
+        self.template_path = os.path.join(self.test_dir, "template.html")
+        with open(self.template_path, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+        for i in range(4):
+            self._write_page(f"page{i}.md", f"# Page {i}\n\nText {i}\n")
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def _write_page(self, name, text):
+        os.makedirs(self.content_dir, exist_ok=True)
+        with open(os.path.join(self.content_dir, name), "w") as f:
+            f.write(text)
+
+    def _build(self, resume):
+        # A fresh index each time: an interrupted build never saved its own
+        journal = BuildJournal(journal_path(self.cache_dir, self.output), HEADER, resume=resume)
+        context = BuildContext(file_index=FileIndex(self.cache_dir), version="1-test", journal=journal)
+        output = StringIO()
+        with redirect_stdout(output):
+            generate_pages_recursive(self.content_dir, self.template_path, self.output, "/", context)
+        journal.close()
+        return journal, output.getvalue()
+
+    def test_resume_skips_completed_pages(self):
+        """Test that only pages the interrupted build didn't finish are rebuilt"""
+        self._build(resume=False)
+        self._write_page("page1.md", "# Page 1\n\nEdited\n")
+        os.remove(os.path.join(self.output, "page2.html"))
+
+        journal, output = self._build(resume=True)
+        self.assertEqual(journal.resumed, 2)
+        self.assertIn("Resumed: 2 pages", output)
+        self.assertIn("page1.md → page1.html", output)
+        self.assertIn("page2.md → page2.html", output)
+        with open(os.path.join(self.output, "page1.html")) as f:
+            self.assertIn("Edited", f.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
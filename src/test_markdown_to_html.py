@@ -5,7 +5,8 @@ import os
 # Add the src directory to Python path for relative imports
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from markdown_to_html import markdown_to_html_node
+from markdown_to_html import markdown_to_html_node, iter_html_chunks
+from block_parser import parse_blocks
 
 
 class TestMarkdownToHTML(unittest.TestCase):
@@ -210,6 +211,13 @@ And an ordered list:
         self.assertTrue(html.startswith("<div><p>"))
         self.assertTrue(html.endswith("</p></div>"))
 
+    def test_iter_html_chunks_matches_node(self):
+        """Test that streamed HTML chunks join to the same HTML as the node tree"""
+        for md in ["# Title\n\nText with **bold**\n\n- a\n- b", "", "\n\n\n"]:
+            with self.subTest(md=md):
+                streamed = "".join(iter_html_chunks(parse_blocks(md)))
+                self.assertEqual(streamed, markdown_to_html_node(md).to_html())
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+import sys
+import os
+import random
+import tempfile
+import shutil
+
+# Add the src directory to Python path for relative imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from mmap_reader import map_file, iter_segments, iter_mapped_lines
+from block_parser import iter_blocks, iter_parsed_blocks
+
+
+class TestMmapReader(unittest.TestCase):
+    
+    def setUp(self):
+        """Set up a scratch directory"""
+        self.test_dir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        """Clean up test fixtures"""
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+    
+    def _write(self, data):
+        path = os.path.join(self.test_dir, "page.md")
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+    
+    def _text_mode_lines(self, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return [line[:-1] if line.endswith("\n") else line for line in f]
+    
+    def test_map_file(self):
+        """Test that the mapping exposes the file bytes"""
+        path = self._write(b"# Title\n\nBody\n")
+        with map_file(path) as data:
+            self.assertEqual(data[:], b"# Title\n\nBody\n")
+    
+    def test_map_empty_file(self):
+        """Test that an empty file yields empty bytes"""
+        path = self._write(b"")
+        with map_file(path) as data:
+            self.assertEqual(data, b"")
+            self.assertEqual(list(iter_mapped_lines(data)), [])
+    
+    def test_segments_end_at_blank_lines(self):
+        """Test that segments are cut at the last blank line that fits"""
+        data = b"one\ntwo\n\nthree\n\nfour"
+        self.assertEqual(list(iter_segments(data, 10)), ["one\ntwo\n", "\nthree\n", "\nfour"])
+    
+    def test_long_line_is_kept_whole(self):
+        """Test that a line longer than a segment isn't split"""
+        data = b"x" * 50 + b"\ny"
+        self.assertEqual(list(iter_segments(data, 8)), ["x" * 50 + "\n", "y"])
+    
+    def test_lines_match_text_mode(self):
+        """Test that mapped lines match a text-mode read, across segment sizes"""
+        samples = [
+            b"# Title\n\nParagraph\nmore\n\n```\ncode\n\nstill code\n```\n",
+            b"no trailing newline",
+            b"crlf\r\nlines\r\n\r\nnext\r\n",
+            b"old\rmac\r\rbreaks",
+            b"\n\n\nleading blanks\n\n\n",
+            "unicode café — 漢字\n\nééé\n".encode("utf-8"),
+        ]
+        rng = random.Random(38)
+        pieces = ["# H", "", "text", "- item", "> quote", "```", "1. one", "   "]
+        for _ in range(20):
+            lines = [rng.choice(pieces) for _ in range(rng.randint(0, 60))]
+            samples.append("\n".join(lines).encode("utf-8"))
+        
+        for data in samples:
+            path = self._write(data)
+            expected = self._text_mode_lines(path)
+            for segment_bytes in (1, 3, 16, 1024):
+                with map_file(path) as mapped:
+                    self.assertEqual(list(iter_mapped_lines(mapped, segment_bytes)), expected,
+                                     f"{data!r} with segments of {segment_bytes}")
+    
+    def test_blocks_match_streaming_parser(self):
+        """Test that blocks parsed from the mapping match iter_blocks()"""
+        data = b"# Title\n\n```\na\n\nb\n```\n\n- one\n- two\n\n> quote\n"
+        path = self._write(data)
+        with open(path, "r", encoding="utf-8") as f:
+            expected = list(iter_blocks(f))
+        with map_file(path) as mapped:
+            self.assertEqual(list(iter_parsed_blocks(iter_mapped_lines(mapped, 4))), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
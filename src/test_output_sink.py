@@ -0,0 +1,128 @@
+import unittest
+import sys
+import os
+import tarfile
+import zipfile
+import tempfile
+import shutil
+from io import StringIO
+from contextlib import redirect_stdout
+
+# Add the src directory to Python path for relative imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from output_sink import MemorySink, ArchiveSink, archive_format
+from output_writer import OutputWriter
+from build_context import BuildContext
+from copy_static import copy_files_recursive
+from generate_pages_recursive import generate_pages_recursive
+
+
+class TestOutputSinks(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a small site: content, static files and a template"""
+        self.test_dir = tempfile.mkdtemp()
+        self.content_dir = os.path.join(self.test_dir, "content")
+        self.static_dir = os.path.join(self.test_dir, "static")
+        self.template_path = os.path.join(self.test_dir, "template.html")
+        self.build_dir = os.path.join(self.test_dir, "public")
+        with open(self.template_path, "w") as f:
+            f.write('<title>{{ Title }}</title><link href="/index.css">{{ Content }}')
+        files = {os.path.join(self.content_dir, "index.md"): "# Home\n\nSee [the post](/blog/post)\n",
+                 os.path.join(self.content_dir, "blog", "post.md"): "# Post\n\n- one\n- two\n",
+                 os.path.join(self.static_dir, "index.css"): "body { margin: 0 }\n",
+                 os.path.join(self.static_dir, "images", "logo.png"): "\x89PNG"}
+        for path, text in files.items():
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(text)
+        os.makedirs(os.path.join(self.static_dir, "empty"))
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def _build(self, sink, queue_size=0):
+        writer = OutputWriter(self.build_dir, queue_size=queue_size, sink=sink)
+        context = BuildContext(output_writer=writer)
+        with redirect_stdout(StringIO()):
+            copy_files_recursive(self.static_dir, self.build_dir, context, clean=False)
+            generate_pages_recursive(self.content_dir, self.template_path, self.build_dir, "/site/", context)
+        writer.close()
+        return writer
+
+    def _read_tree(self, root):
+        files = {}
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                with open(path, "rb") as f:
+                    files[os.path.relpath(path, root).replace(os.sep, "/")] = f.read()
+        return files
+
+    def test_memory_sink_matches_directory_build(self):
+        """Test that a build into memory holds what a directory build writes, without writing it"""
+        sink = MemorySink(self.build_dir)
+        writer = self._build(sink, queue_size=4)
+        self.assertFalse(os.path.exists(self.build_dir))
+        self.assertEqual(writer.written, 4)
+        self.assertIn('<link href="/site/index.css">', sink.read("index.html"))
+        self.assertIn("empty", sink.dirs)
+
+        self._build(None)
+        self.assertEqual(sink.files, self._read_tree(self.build_dir))
+
+    def test_memory_sink_reports_unchanged(self):
+        """Test that storing the same bytes again counts as unchanged"""
+        sink = MemorySink("out")
+        self.assertTrue(sink.write(os.path.join("out", "a.html"), b"a"))
+        self.assertFalse(sink.write(os.path.join("out", "a.html"), b"a"))
+        self.assertEqual(sink.files, {"a.html": b"a"})
+
+    def test_tar_archive(self):
+        """Test that a streamed tar.gz holds every output, empty directories and static file modes"""
+        path = os.path.join(self.test_dir, "site.tar.gz")
+        os.chmod(os.path.join(self.static_dir, "index.css"), 0o640)
+        self._build(ArchiveSink(path, self.build_dir))
+        self.assertFalse(os.path.exists(self.build_dir))
+        with tarfile.open(path) as tar:
+            members = {member.name: member for member in tar.getmembers()}
+            self.assertTrue(members["empty"].isdir())
+            self.assertEqual(members["index.css"].mode, 0o640)
+            page = tar.extractfile("blog/post.html").read().decode()
+        self.assertIn("<li>one</li>", page)
+        self.assertEqual(len([m for m in members.values() if m.isfile()]), 4)
+
+    def test_zip_archive(self):
+        """Test that a zip archive holds the same files as a directory build"""
+        path = os.path.join(self.test_dir, "site.zip")
+        self._build(ArchiveSink(path, self.build_dir))
+        with zipfile.ZipFile(path) as archive:
+            self.assertIsNone(archive.testzip())
+            files = {name: archive.read(name) for name in archive.namelist() if not name.endswith("/")}
+        self._build(None)
+        self.assertEqual(files, self._read_tree(self.build_dir))
+
+    def test_discarded_archive(self):
+        """Test that a failed build leaves neither the archive nor its temporary file"""
+        path = os.path.join(self.test_dir, "site.tar")
+        sink = ArchiveSink(path, self.build_dir)
+        sink.write(os.path.join(self.build_dir, "index.html"), b"<p>partial</p>")
+        sink.close(commit=False)
+        sink.close()
+        self.assertEqual(os.listdir(self.test_dir).count("site.tar"), 0)
+        self.assertFalse([name for name in os.listdir(self.test_dir) if name.endswith(".tmp")])
+
+    def test_archive_format(self):
+        """Test that the archive type follows the suffix"""
+        self.assertEqual(archive_format("site.zip"), "zip")
+        self.assertEqual(archive_format("site.tgz"), "w|gz")
+        self.assertEqual(archive_format("dist/site.tar.xz"), "w|xz")
+        with self.assertRaises(ValueError):
+            archive_format("site.rar")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,181 @@
+import unittest
+import sys
+import os
+import tempfile
+import shutil
+from io import StringIO
+from contextlib import redirect_stdout
+
+# Add the src directory to Python path for relative imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from output_writer import OutputWriter
+from build_context import BuildContext
+from file_index import FileIndex
+from generate_pages_recursive import generate_pages_recursive
+
+
+class TestOutputWriter(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a build directory and a previously published one"""
+        self.test_dir = tempfile.mkdtemp()
+        self.build_dir = os.path.join(self.test_dir, ".docs.staging")
+        self.previous_dir = os.path.join(self.test_dir, "docs")
+        os.makedirs(self.build_dir)
+        os.makedirs(self.previous_dir)
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def _write(self, path, content):
+        with open(path, "wb") as f:
+            f.write(content)
+        # An old mtime, so a rewrite would show
+        os.utime(path, (1000000000, 1000000000))
+
+    def _read(self, path):
+        with open(path, "rb") as f:
+            return f.read()
+
+    def test_commit_keeps_identical_output(self):
+        """Test that an unchanged output keeps its inode and mtime"""
+        dest = os.path.join(self.build_dir, "index.html")
+        temp = dest + ".tmp"
+        self._write(dest, b"<p>same</p>")
+        before = os.stat(dest)
+        self._write(temp, b"<p>same</p>")
+        writer = OutputWriter()
+        self.assertFalse(writer.commit(temp, dest))
+        after = os.stat(dest)
+        self.assertEqual((after.st_ino, after.st_mtime_ns), (before.st_ino, before.st_mtime_ns))
+        self.assertFalse(os.path.exists(temp))
+        self.assertEqual((writer.written, writer.unchanged), (0, 1))
+
+    def test_commit_replaces_changed_output(self):
+        """Test that an output with the same size but other bytes is replaced"""
+        dest = os.path.join(self.build_dir, "index.html")
+        temp = dest + ".tmp"
+        self._write(dest, b"<p>old</p>")
+        self._write(temp, b"<p>new</p>")
+        writer = OutputWriter()
+        self.assertTrue(writer.commit(temp, dest))
+        self.assertEqual(self._read(dest), b"<p>new</p>")
+        self.assertEqual((writer.written, writer.unchanged), (1, 0))
+
+    def test_write_new_and_resized_outputs(self):
+        """Test that missing and differently sized outputs are written"""
+        dest = os.path.join(self.build_dir, "style.css")
+        writer = OutputWriter()
+        self.assertTrue(writer.write(dest, b"body {}"))
+        self.assertTrue(writer.write(dest, b"body { margin: 0 }"))
+        self.assertFalse(writer.write(dest, b"body { margin: 0 }"))
+        self.assertEqual(self._read(dest), b"body { margin: 0 }")
+        self.assertEqual((writer.written, writer.unchanged), (2, 1))
+
+    def test_write_takes_source_stat(self):
+        """Test that a written copy takes the source file's mtime"""
+        source = os.path.join(self.test_dir, "source.css")
+        self._write(source, b"body {}")
+        dest = os.path.join(self.build_dir, "style.css")
+        OutputWriter().write(dest, b"body {}", stat_source=source)
+        self.assertEqual(os.stat(dest).st_mtime, 1000000000)
+
+    def test_links_identical_published_output(self):
+        """Test that an output identical to the published one becomes a link to it"""
+        published = os.path.join(self.previous_dir, "index.html")
+        self._write(published, b"<p>page</p>")
+        dest = os.path.join(self.build_dir, "index.html")
+        writer = OutputWriter(self.build_dir, self.previous_dir)
+        self.assertFalse(writer.write(dest, b"<p>page</p>"))
+        self.assertEqual(os.stat(dest).st_ino, os.stat(published).st_ino)
+        self.assertTrue(writer.write(os.path.join(self.build_dir, "other.html"), b"<p>page</p>"))
+        self._write(published, b"<p>old page</p>")
+        self.assertTrue(writer.write(dest, b"<p>new page</p>"))
+        self.assertEqual(self._read(published), b"<p>old page</p>")
+
+
+    def test_ensure_dir_is_cached(self):
+        """Test that a directory and its parents are only created and checked once"""
+        writer = OutputWriter()
+        nested = os.path.join(self.build_dir, "blog", "post")
+        self.assertTrue(writer.ensure_dir(nested))
+        self.assertTrue(os.path.isdir(nested))
+        self.assertFalse(writer.ensure_dir(nested))
+        self.assertFalse(writer.ensure_dir(os.path.join(self.build_dir, "blog")))
+        self.assertFalse(writer.ensure_dir(""))
+
+    def test_background_writes(self):
+        """Test that queued writes and copies complete and report their outcome"""
+        source = os.path.join(self.test_dir, "logo.png")
+        self._write(source, b"\x89PNG")
+        writer = OutputWriter(queue_size=2)
+        self.assertTrue(writer.background)
+        pages = [os.path.join(self.build_dir, f"page{i}.html") for i in range(10)]
+        for i, dest in enumerate(pages):
+            writer.submit(dest, f"<p>{i}</p>".encode())
+        copy = os.path.join(self.build_dir, "logo.png")
+        writer.submit(copy, source=source)
+        self.assertTrue(writer.take(copy).result())
+        for dest in pages:
+            self.assertTrue(writer.take(dest).result())
+        self.assertIsNone(writer.take(pages[0]))
+        writer.close()
+        self.assertFalse(writer.background)
+        self.assertEqual(self._read(pages[3]), b"<p>3</p>")
+        self.assertEqual(os.stat(copy).st_mtime, 1000000000)
+        self.assertEqual(writer.written, 11)
+
+    def test_failed_write_is_reported(self):
+        """Test that a write error reaches whoever takes the outcome"""
+        writer = OutputWriter(queue_size=4)
+        dest = os.path.join(self.build_dir, "missing", "index.html")
+        writer.submit(dest, b"<p>page</p>")
+        with self.assertRaises(OSError):
+            writer.take(dest).result()
+        writer.close()
+        self.assertFalse(os.path.exists(dest + ".tmp"))
+
+    def test_durability_policies(self):
+        """Test that the end policy syncs every written file once, at close"""
+        with self.assertRaises(ValueError):
+            OutputWriter(durability="sometimes")
+        writer = OutputWriter(durability="end")
+        writer.write(os.path.join(self.build_dir, "a.html"), b"a")
+        writer.write(os.path.join(self.build_dir, "b.html"), b"b")
+        writer.write(os.path.join(self.build_dir, "b.html"), b"b")
+        self.assertEqual(writer.synced, 0)
+        writer.close()
+        self.assertEqual(writer.synced, 2)
+        writer = OutputWriter(durability="per-file")
+        self.assertTrue(writer.write(os.path.join(self.build_dir, "c.html"), b"c"))
+        writer.close()
+        self.assertEqual(writer.synced, 0)
+
+    def test_pages_recorded_after_background_write(self):
+        """Test that queued pages reach the file index once they are written"""
+        content_dir = os.path.join(self.test_dir, "content")
+        template_path = os.path.join(self.test_dir, "template.html")
+        with open(template_path, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+        for name in ("index.md", os.path.join("blog", "post.md")):
+            path = os.path.join(content_dir, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(f"# {name}\n\ntext\n")
+        file_index = FileIndex(os.path.join(self.test_dir, "cache"))
+        writer = OutputWriter(queue_size=1)
+        context = BuildContext(file_index=file_index, output_writer=writer)
+        with redirect_stdout(StringIO()):
+            generate_pages_recursive(content_dir, template_path, self.build_dir, context=context)
+        writer.close()
+        self.assertEqual(writer.written, 2)
+        output = os.path.join(self.build_dir, "blog", "post.html")
+        self.assertIn(b"<h1>blog/post.md</h1>", self._read(output))
+        self.assertEqual(file_index.stale_outputs(self.build_dir), [])
+        self.assertEqual(len(file_index._outputs), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,222 @@
+import unittest
+import sys
+import os
+import tempfile
+import shutil
+import gc
+import hashlib
+import warnings
+import threading
+import multiprocessing
+
+# Add the src directory to Python path for relative imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from pack_store import PackStore
+
+
+def _key(name):
+    return hashlib.sha256(name.encode()).hexdigest()
+
+
+def _write_entries(path, worker, count):
+    store = PackStore(path)
+    for i in range(count):
+        # Every worker also writes the shared keys, racing the others
+        store.put(_key(f"shared-{i}"), f"shared {i}".encode())
+        store.put(_key(f"{worker}-{i}"), f"value {worker} {i}".encode())
+    store.close()
+
+
+class TestPackStore(unittest.TestCase):
+    
+    def setUp(self):
+        """Set up a temporary store location"""
+        self.test_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.test_dir, "store")
+        # Cleanups run last-in first-out: stores are closed before the directory goes
+        self.addCleanup(shutil.rmtree, self.test_dir, ignore_errors=True)
+    
+    def _open(self):
+        """Open the store, closing it when the test ends (closing twice is harmless)"""
+        store = PackStore(self.path)
+        self.addCleanup(store.close)
+        return store
+    
+    def test_put_get_before_and_after_flush(self):
+        """Test lookups from the in-memory tail and from the mmap index"""
+        store = self._open()
+        for i in range(100):
+            store.put(_key(str(i)), f"value {i}".encode())
+        self.assertEqual(store.get(_key("42")), b"value 42")
+        
+        store.close()
+        reopened = self._open()
+        self.assertEqual(len(reopened), 100)
+        for i in range(100):
+            self.assertEqual(reopened.get(_key(str(i))), f"value {i}".encode())
+        self.assertIsNone(reopened.get(_key("missing")))
+        self.assertIn(_key("0"), reopened)
+        reopened.close()
+    
+    def test_single_data_file(self):
+        """Test that many entries produce only the pack, index and lock files"""
+        store = self._open()
+        for i in range(500):
+            store.put(_key(str(i)), b"x")
+        store.close()
+        self.assertEqual(sorted(os.listdir(self.test_dir)), ["store.idx", "store.lock", "store.pack"])
+    
+    def test_unindexed_records_are_recovered(self):
+        """Test that records appended after the last index write survive a crash"""
+        store = self._open()
+        store.put(_key("a"), b"indexed")
+        store.flush()
+        store.put(_key("b"), b"not indexed")
+        # Simulate a crash: drop the handle without close()
+        store._close_files()
+        
+        reopened = self._open()
+        self.assertEqual(reopened.get(_key("a")), b"indexed")
+        self.assertEqual(reopened.get(_key("b")), b"not indexed")
+        reopened.close()
+    
+    def test_torn_tail_is_truncated(self):
+        """Test that a partially written final record is discarded"""
+        store = self._open()
+        store.put(_key("good"), b"complete record")
+        store.put(_key("torn"), b"this record is cut short")
+        store._close_files()
+        size = os.path.getsize(self.path + ".pack")
+        with open(self.path + ".pack", "r+b") as f:
+            f.truncate(size - 5)
+        
+        reopened = self._open()
+        self.assertEqual(reopened.get(_key("good")), b"complete record")
+        self.assertIsNone(reopened.get(_key("torn")))
+        reopened.put(_key("next"), b"appended after recovery")
+        reopened.close()
+        
+        again = self._open()
+        self.assertEqual(again.get(_key("next")), b"appended after recovery")
+        again.close()
+    
+    def test_stale_index_is_ignored(self):
+        """Test that an index from another pack is rebuilt from the data file"""
+        store = self._open()
+        store.put(_key("a"), b"one")
+        store.close()
+        os.remove(self.path + ".pack")
+        
+        store = self._open()
+        self.assertIsNone(store.get(_key("a")))
+        store.put(_key("b"), b"two")
+        store.close()
+        self.assertEqual(self._open().keys(), [_key("b")])
+    
+    def test_compact_drops_entries(self):
+        """Test compaction with a keep predicate"""
+        store = self._open()
+        for name in ["a", "b", "c"]:
+            store.put(_key(name), name.encode() * 100)
+        before = store.file_bytes()
+        
+        store.compact(keep=lambda key: key != _key("b"))
+        
+        self.assertLess(store.file_bytes(), before)
+        self.assertEqual(store.get(_key("a")), b"a" * 100)
+        self.assertIsNone(store.get(_key("b")))
+        self.assertEqual(store.live_bytes(), 200)
+        store.close()
+        self.assertEqual(self._open().get(_key("c")), b"c" * 100)
+    
+    def test_failed_open_releases_lock_file(self):
+        """Test that a store that can't open its pack leaves no file handle behind"""
+        os.makedirs(self.path + ".pack")
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always", ResourceWarning)
+            try:
+                PackStore(self.path)
+            except OSError:
+                pass
+            else:
+                self.fail("opening a directory as the pack should fail")
+            gc.collect()
+        self.assertEqual([str(warning.message) for warning in caught
+                          if issubclass(warning.category, ResourceWarning)], [])
+    
+    def test_duplicate_put_is_ignored(self):
+        """Test that re-adding a key does not grow the pack"""
+        store = self._open()
+        store.put(_key("a"), b"value")
+        size = store.file_bytes()
+        store.put(_key("a"), b"value")
+        self.assertEqual(store.file_bytes(), size)
+        store.close()
+
+    def test_concurrent_writers_share_one_store(self):
+        """Test several processes appending to the same store at once"""
+        workers = [
+            multiprocessing.Process(target=_write_entries, args=(self.path, worker, 50))
+            for worker in range(4)
+        ]
+        for process in workers:
+            process.start()
+        for process in workers:
+            process.join()
+            self.assertEqual(process.exitcode, 0)
+        
+        store = self._open()
+        self.assertEqual(len(store), 50 + 4 * 50)
+        for worker in range(4):
+            for i in range(50):
+                self.assertEqual(store.get(_key(f"{worker}-{i}")), f"value {worker} {i}".encode())
+                self.assertEqual(store.get(_key(f"shared-{i}")), f"shared {i}".encode())
+        store.close()
+    
+    def test_reopens_after_compaction_by_another_instance(self):
+        """Test that a store notices its pack was replaced and keeps working"""
+        first = self._open()
+        second = self._open()
+        first.put(_key("a"), b"one")
+        first.compact()
+        
+        second.put(_key("b"), b"two")
+        self.assertEqual(second.get(_key("a")), b"one")
+        second.close()
+        first.close()
+        
+        reopened = self._open()
+        self.assertEqual(reopened.keys(), sorted([_key("a"), _key("b")]))
+        reopened.close()
+    
+    def test_threads_share_one_instance(self):
+        """Test several threads reading and writing one store object"""
+        store = self._open()
+        errors = []
+        
+        def work(worker):
+            try:
+                for i in range(100):
+                    store.put(_key(f"shared-{i}"), f"shared {i}".encode())
+                    store.put(_key(f"{worker}-{i}"), f"value {worker} {i}".encode())
+                    if store.get(_key(f"{worker}-{i}")) != f"value {worker} {i}".encode():
+                        errors.append((worker, i))
+            except Exception as e:
+                errors.append(e)
+        
+        threads = [threading.Thread(target=work, args=(worker,)) for worker in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        store.close()
+        
+        self.assertEqual(errors, [])
+        reopened = self._open()
+        self.assertEqual(len(reopened), 100 + 4 * 100)
+        reopened.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
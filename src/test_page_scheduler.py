@@ -0,0 +1,151 @@
+import unittest
+import sys
+import os
+import tempfile
+import shutil
+from io import StringIO
+from contextlib import redirect_stdout
+
+# Add the src directory to Python path for relative imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from page_scheduler import RenderTimes, lpt_order, makespan, generate_pages_parallel, DEFAULT_SECONDS_PER_BYTE
+from generate_pages_recursive import PageJob, generate_pages_recursive
+from build_context import BuildContext
+from block_cache import BlockCache
+from document_cache import DocumentCache
+
+
+def _job(name, size):
+    return PageJob(os.path.join("content", name), name, os.path.join("public", name), size, None)
+
+
+class TestRenderTimes(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a temporary cache directory"""
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def test_size_fallback(self):
+        """Test that untimed pages are estimated from their size"""
+        times = RenderTimes(None)
+        self.assertEqual(times.cost("a.md", 1000), 1000 * DEFAULT_SECONDS_PER_BYTE)
+        times.record("a.md", 1000, 0.5)
+        self.assertEqual(times.cost("a.md", 1000), 0.5)
+        # The untimed page uses the measured rate of the timed ones
+        self.assertAlmostEqual(times.cost("b.md", 2000), 1.0)
+
+    def test_smoothing(self):
+        """Test that repeated measurements are averaged"""
+        times = RenderTimes(None)
+        times.record("a.md", 10, 1.0)
+        times.record("a.md", 10, 3.0)
+        self.assertAlmostEqual(times.cost("a.md", 10), 2.0)
+
+    def test_persistence(self):
+        """Test that times survive a save and reload"""
+        times = RenderTimes(self.test_dir)
+        times.record("a.md", 10, 0.25)
+        times.save()
+        self.assertEqual(RenderTimes(self.test_dir).cost("a.md", 10), 0.25)
+
+    def test_corrupt_file(self):
+        """Test that an unreadable times file starts from scratch"""
+        times = RenderTimes(self.test_dir)
+        with open(times.path, "w") as f:
+            f.write("{not json")
+        self.assertEqual(RenderTimes(self.test_dir).cost("a.md", 10), 10 * DEFAULT_SECONDS_PER_BYTE)
+
+
+class TestScheduling(unittest.TestCase):
+
+    def test_lpt_order(self):
+        """Test that the most expensive pages come first"""
+        jobs = [_job("a.html", 10), _job("b.html", 30), _job("c.html", 20), _job("d.html", 30)]
+        self.assertEqual([job.rel_dest for job in lpt_order(jobs)], ["b.html", "d.html", "c.html", "a.html"])
+        times = RenderTimes(None)
+        times.record(jobs[0].source, 10, 5.0)
+        times.record(jobs[1].source, 30, 0.1)
+        # Measured times win over size, and untimed pages use the measured rate
+        self.assertEqual([job.rel_dest for job in lpt_order(jobs, times)], ["a.html", "d.html", "c.html", "b.html"])
+
+    def test_makespan(self):
+        """Test the greedy schedule simulation"""
+        self.assertEqual(makespan([], 4), 0.0)
+        self.assertEqual(makespan([1, 1, 1, 1], 2), 2)
+        self.assertEqual(makespan([3, 1], 1), 4)
+
+    def test_lpt_shortens_tail(self):
+        """Test that a large page found last no longer finishes last"""
+        discovery_order = [1, 1, 1, 1, 1, 1, 6]
+        self.assertEqual(makespan(discovery_order, 2), 9)
+        self.assertEqual(makespan(sorted(discovery_order, reverse=True), 2), 6)
+
+
+class TestGeneratePagesParallel(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a small site"""
+        self.test_dir = tempfile.mkdtemp()
+        self.content_dir = os.path.join(self.test_dir, "content")
+        self.template_path = os.path.join(self.test_dir, "template.html")
+        self.cache_dir = os.path.join(self.test_dir, "cache")
+        with open(self.template_path, "w") as f:
+            f.write("<html><title>{{ Title }}</title><body>{{ Content }}</body></html>")
+        pages = {"index.md": "# Home\n\nWelcome to [the blog](/blog/a)\n",
+                 os.path.join("blog", "a.md"): "# Post A\n\n" + "Some **bold** text.\n\n" * 200,
+                 os.path.join("blog", "b.md"): "# Post B\n\n- one\n- two\n"}
+        for name, text in pages.items():
+            path = os.path.join(self.content_dir, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(text)
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def _read_tree(self, root):
+        files = {}
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                with open(path) as f:
+                    files[os.path.relpath(path, root)] = f.read()
+        return files
+
+    def test_matches_serial_build(self):
+        """Test that the process pool writes the same pages as the serial build"""
+        serial = os.path.join(self.test_dir, "serial")
+        parallel = os.path.join(self.test_dir, "parallel")
+        with redirect_stdout(StringIO()):
+            generate_pages_recursive(self.content_dir, self.template_path, serial, "/site/")
+            self.assertTrue(generate_pages_parallel(self.content_dir, self.template_path, parallel, "/site/", jobs=2))
+        self.assertEqual(len(self._read_tree(serial)), 3)
+        self.assertEqual(self._read_tree(parallel), self._read_tree(serial))
+
+    def test_records_render_times(self):
+        """Test that every generated page gets a measured render time"""
+        render_times = RenderTimes(self.cache_dir)
+        context = BuildContext(block_cache=BlockCache(self.cache_dir), document_cache=DocumentCache(self.cache_dir),
+                               render_times=render_times, cache_dir=self.cache_dir)
+        output = StringIO()
+        with redirect_stdout(output):
+            generate_pages_parallel(self.content_dir, self.template_path,
+                                    os.path.join(self.test_dir, "out"), context=context, jobs=2)
+        context.block_cache.close()
+        context.document_cache.close()
+        render_times.save()
+        self.assertIn("Schedule:", output.getvalue())
+        self.assertEqual(len(RenderTimes(self.cache_dir)._times), 3)
+        self.assertEqual(context.document_cache.misses, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
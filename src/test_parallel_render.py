@@ -0,0 +1,65 @@
+import unittest
+import sys
+import os
+from unittest import mock
+
+# Add the src directory to Python path for relative imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import markdown_to_html
+from markdown_to_html import markdown_to_html_node, iter_html_chunks
+from block_parser import parse_blocks
+from parallel_render import should_render_in_parallel, iter_chunks, ordered_parallel_map
+
+
+def _square(x):
+    return x * x
+
+
+class TestParallelRender(unittest.TestCase):
+    
+    def _large_markdown(self, sections=300):
+        parts = []
+        for i in range(sections):
+            parts.append(f"## Section {i}")
+            parts.append(f"Paragraph **{i}** with a [link](/page/{i}) and `code`.")
+            parts.append(f"- item {i}\n- item {i + 1}")
+            parts.append(f"```\nblock {i}\n\nwith blank line\n```")
+        return "\n\n".join(parts)
+    
+    def test_should_render_in_parallel(self):
+        """Test the size threshold and worker count gate"""
+        self.assertFalse(should_render_in_parallel(10, 4))
+        self.assertFalse(should_render_in_parallel(10 ** 9, None))
+        self.assertFalse(should_render_in_parallel(10 ** 9, 1))
+        self.assertTrue(should_render_in_parallel(10 ** 9, 2))
+    
+    def test_iter_chunks(self):
+        """Test chunking keeps order and the final partial chunk"""
+        self.assertEqual(list(iter_chunks(range(7), 3)), [[0, 1, 2], [3, 4, 5], [6]])
+        self.assertEqual(list(iter_chunks([], 3)), [])
+    
+    def test_ordered_parallel_map_keeps_order(self):
+        """Test results come back in input order"""
+        self.assertEqual(list(ordered_parallel_map(_square, range(20), 2)), [x * x for x in range(20)])
+    
+    def test_parallel_node_is_byte_identical(self):
+        """Test the process pool path produces the same HTML as the serial path"""
+        md = self._large_markdown()
+        serial = markdown_to_html_node(md).to_html()
+        
+        with mock.patch.object(markdown_to_html, "should_render_in_parallel", return_value=True):
+            parallel = markdown_to_html_node(md, workers=2).to_html()
+        
+        self.assertEqual(parallel, serial)
+    
+    def test_parallel_stream_is_byte_identical(self):
+        """Test streamed parallel rendering matches the serial path"""
+        md = self._large_markdown(50)
+        serial = markdown_to_html_node(md).to_html()
+        self.assertEqual("".join(iter_html_chunks(parse_blocks(md), workers=2)), serial)
+        self.assertEqual("".join(iter_html_chunks([], workers=2)), "<div><p></p></div>")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+import sys
+import os
+import tempfile
+import shutil
+from io import StringIO
+from contextlib import redirect_stdout
+
+# Add the src directory to Python path for relative imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from prune import prune_stale_outputs
+from file_index import FileIndex
+
+
+class TestPruneStaleOutputs(unittest.TestCase):
+
+    def setUp(self):
+        """Set up an output directory recorded by an earlier build"""
+        self.test_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.test_dir, "cache")
+        self.output_dir = os.path.join(self.test_dir, "docs")
+        self.pages = [os.path.join(self.output_dir, "index.html"),
+                      os.path.join(self.output_dir, "blog", "old", "index.html"),
+                      os.path.join(self.output_dir, "blog", "new", "index.html")]
+        index = FileIndex(self.cache_dir)
+        for path in self.pages:
+            self._write(path)
+            index.record_output(path, "key")
+        index.save()
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def _write(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write("<p>page</p>")
+
+    def _prune(self, index):
+        with redirect_stdout(StringIO()):
+            return prune_stale_outputs(self.output_dir, index)
+
+    def test_removes_unseen_outputs_and_empty_directories(self):
+        """Test that an output this build didn't produce is removed with its empty directory"""
+        index = FileIndex(self.cache_dir)
+        index.output_is_current(self.pages[0], "key")
+        index.output_is_current(self.pages[2], "key")
+        self.assertEqual(self._prune(index), (1, 1))
+        self.assertFalse(os.path.exists(os.path.dirname(self.pages[1])))
+        self.assertTrue(os.path.exists(self.pages[0]))
+        self.assertTrue(os.path.exists(self.pages[2]))
+        self.assertEqual(index.stale_outputs(self.output_dir), [])
+
+    def test_removes_nested_empty_directories(self):
+        """Test that a directory emptied of subdirectories is removed too"""
+        index = FileIndex(self.cache_dir)
+        index.output_is_current(self.pages[0], "key")
+        self.assertEqual(self._prune(index), (2, 3))
+        self.assertFalse(os.path.exists(os.path.join(self.output_dir, "blog")))
+        self.assertTrue(os.path.isdir(self.output_dir))
+
+    def test_keeps_unrecorded_files(self):
+        """Test that files the generator never wrote are left alone"""
+        extra = os.path.join(self.output_dir, "blog", "old", "CNAME")
+        self._write(extra)
+        index = FileIndex(self.cache_dir)
+        index.output_is_current(self.pages[0], "key")
+        index.output_is_current(self.pages[2], "key")
+        self.assertEqual(self._prune(index), (1, 0))
+        self.assertTrue(os.path.exists(extra))
+
+    def test_nothing_stale(self):
+        """Test that a build that saw every output prunes nothing"""
+        index = FileIndex(self.cache_dir)
+        for path in self.pages:
+            index.output_is_current(path, "key")
+        self.assertEqual(self._prune(index), (0, 0))
+        for path in self.pages:
+            self.assertTrue(os.path.exists(path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import unittest
+import sys
+import os
+import tempfile
+import shutil
+from unittest import mock
+
+# Add the src directory to Python path for relative imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from publish import Publisher, staging_path, link_tree, exchange_paths
+
+
+class TestPublisher(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a published output directory"""
+        self.test_dir = tempfile.mkdtemp()
+        self.output = os.path.join(self.test_dir, "docs")
+        self._write(self.output, "index.html", "old index")
+        self._write(self.output, os.path.join("blog", "post.html"), "old post")
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def _write(self, directory, rel_path, content):
+        path = os.path.join(directory, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def _read(self, directory, rel_path):
+        with open(os.path.join(directory, rel_path)) as f:
+            return f.read()
+
+    def test_staging_path_is_a_hidden_sibling(self):
+        """Test that staging sits next to the output, on the same filesystem"""
+        self.assertEqual(staging_path("docs"), ".docs.staging")
+        self.assertEqual(staging_path(os.path.join("site", "public") + os.sep),
+                         os.path.join("site", ".public.staging"))
+
+    def test_link_tree_shares_files(self):
+        """Test that a linked tree reuses the original files"""
+        linked = os.path.join(self.test_dir, "linked")
+        self.assertEqual(link_tree(self.output, linked), 2)
+        original = os.stat(os.path.join(self.output, "blog", "post.html"))
+        copy = os.stat(os.path.join(linked, "blog", "post.html"))
+        self.assertEqual((copy.st_ino, copy.st_dev), (original.st_ino, original.st_dev))
+
+    def test_publish_swaps_in_new_build(self):
+        """Test that publishing replaces the output and removes the old tree"""
+        publisher = Publisher(self.output)
+        publisher.prepare()
+        self.assertEqual(os.listdir(publisher.staging_dir), [])
+        self._write(publisher.staging_dir, "index.html", "new index")
+        self.assertEqual(self._read(self.output, "index.html"), "old index")
+
+        self.assertIn(publisher.publish(), ("exchange", "rename"))
+        publisher.wait()
+        self.assertEqual(self._read(self.output, "index.html"), "new index")
+        self.assertFalse(os.path.exists(os.path.join(self.output, "blog")))
+        self.assertEqual(sorted(os.listdir(self.test_dir)), ["docs"])
+
+    def test_publish_without_exchange(self):
+        """Test the two-rename fallback where renameat2 isn't available"""
+        publisher = Publisher(self.output)
+        publisher.prepare()
+        self._write(publisher.staging_dir, "index.html", "new index")
+        with mock.patch("publish.exchange_paths", return_value=False):
+            self.assertEqual(publisher.publish(), "rename")
+        publisher.wait()
+        self.assertEqual(self._read(self.output, "index.html"), "new index")
+        self.assertEqual(sorted(os.listdir(self.test_dir)), ["docs"])
+
+    def test_first_publish(self):
+        """Test publishing when there is no previous output"""
+        shutil.rmtree(self.output)
+        publisher = Publisher(self.output)
+        publisher.prepare(reuse=True)
+        self._write(publisher.staging_dir, "index.html", "first")
+        self.assertEqual(publisher.publish(), "rename")
+        self.assertEqual(self._read(self.output, "index.html"), "first")
+
+    def test_reuse_replacing_a_file_keeps_published_copy(self):
+        """Test that replacing a hardlinked staging file doesn't touch the published one"""
+        publisher = Publisher(self.output)
+        self.assertEqual(publisher.prepare(reuse=True), 2)
+        temp_path = self._write(publisher.staging_dir, "index.html.tmp", "new index")
+        os.replace(temp_path, os.path.join(publisher.staging_dir, "index.html"))
+        self.assertEqual(self._read(self.output, "index.html"), "old index")
+
+        publisher.publish()
+        publisher.wait()
+        self.assertEqual(self._read(self.output, "index.html"), "new index")
+        self.assertEqual(self._read(self.output, os.path.join("blog", "post.html")), "old post")
+
+    def test_prepare_keep_continues_staging(self):
+        """Test that --resume keeps a partial staging directory"""
+        publisher = Publisher(self.output)
+        publisher.prepare()
+        self._write(publisher.staging_dir, "done.html", "finished before the crash")
+        Publisher(self.output).prepare(reuse=True, keep=True)
+        self.assertEqual(os.listdir(publisher.staging_dir), ["done.html"])
+        Publisher(self.output).prepare()
+        self.assertEqual(os.listdir(publisher.staging_dir), [])
+
+    def test_prepare_removes_leftover_trees(self):
+        """Test that old trees left by a crashed build are cleaned up"""
+        leftover = os.path.join(self.test_dir, ".docs.old-12345")
+        self._write(leftover, "index.html", "stale")
+        publisher = Publisher(self.output)
+        publisher.prepare()
+        publisher.wait()
+        self.assertFalse(os.path.exists(leftover))
+
+    def test_exchange_paths(self):
+        """Test that exchanging either swaps both paths or reports no support"""
+        other = os.path.join(self.test_dir, "other")
+        self._write(other, "index.html", "other index")
+        if exchange_paths(other, self.output):
+            self.assertEqual(self._read(self.output, "index.html"), "other index")
+            self.assertEqual(self._read(other, "index.html"), "old index")
+        else:
+            self.assertEqual(self._read(self.output, "index.html"), "old index")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+import shutil
+
+# Add the src directory to Python path for relative imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from sharding import Shard, shard_of, assign_by_size, merge_shards, MANIFEST_FILE
+from discovery import SourceFile
+
+
+def _page(name, size=10):
+    return SourceFile(os.path.join("content", name), name, size, 0.0, None)
+
+
+class TestShardAssignment(unittest.TestCase):
+    
+    def test_parse(self):
+        """Test parsing i/N shard specs"""
+        shard = Shard.parse("2/4", "size")
+        self.assertEqual((shard.index, shard.count, shard.strategy), (2, 4, "size"))
+        for spec in ("0/4", "5/4", "1", "a/b", "1/0", "-1/2"):
+            with self.assertRaises(ValueError):
+                Shard.parse(spec)
+        with self.assertRaises(ValueError):
+            Shard.parse("1/2", "random")
+    
+    def test_shard_of_is_stable(self):
+        """Test that the path hash doesn't depend on the process"""
+        self.assertEqual(shard_of("blog/a.html", 1), 1)
+        self.assertEqual(shard_of("index.html", 7), shard_of("index.html", 7))
+        self.assertIn(shard_of("index.html", 7), range(1, 8))
+    
+    def test_every_page_in_exactly_one_shard(self):
+        """Test that the shards partition the pages"""
+        pages = [_page(f"p{i}.html", i) for i in range(200)]
+        for strategy in ("path", "size"):
+            selected = []
+            for index in range(1, 5):
+                shard = Shard(index, 4, strategy)
+                selected.extend(page.rel_dest for page in shard.select(iter(pages)))
+                self.assertEqual(len(shard.site_pages), 200)
+            self.assertEqual(sorted(selected), sorted(page.rel_dest for page in pages))
+    
+    def test_assign_by_size_balances_bytes(self):
+        """Test that size weighting spreads large pages across shards"""
+        pages = [("big1", 1000), ("big2", 1000), ("big3", 1000)] + [(f"small{i}", 10) for i in range(30)]
+        owners = assign_by_size(pages, 3)
+        loads = {index: 0 for index in (1, 2, 3)}
+        for name, size in pages:
+            loads[owners[name]] += size
+        self.assertEqual(sorted(loads.values()), [1100, 1100, 1100])
+        self.assertEqual(owners, assign_by_size(list(reversed(pages)), 3))
+
+
+class TestMergeShards(unittest.TestCase):
+    
+    def setUp(self):
+        """Build two fake shard outputs of a three-page site"""
+        self.test_dir = tempfile.mkdtemp()
+        self.output = os.path.join(self.test_dir, "merged")
+        pages = [_page("index.html"), _page(os.path.join("blog", "a.html")), _page(os.path.join("blog", "b.html"))]
+        self.shard_dirs = []
+        for index in (1, 2):
+            shard_dir = os.path.join(self.test_dir, f"shard{index}")
+            shard = Shard(index, 2)
+            for page in shard.select(iter(pages)):
+                path = self._write(shard_dir, page.rel_dest, f"<p>{page.rel_dest}</p>")
+                shard.record_page(page.rel_dest, path)
+            self._write(shard_dir, "index.css", "body {}")
+            shard.write_manifest(shard_dir)
+            self.shard_dirs.append(shard_dir)
+    
+    def tearDown(self):
+        """Clean up test fixtures"""
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+    
+    def _write(self, directory, rel_path, content):
+        path = os.path.join(directory, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+    
+    def _edit_manifest(self, shard_dir, change):
+        path = os.path.join(shard_dir, MANIFEST_FILE)
+        with open(path) as f:
+            manifest = json.load(f)
+        change(manifest)
+        with open(path, "w") as f:
+            json.dump(manifest, f)
+    
+    def test_merge(self):
+        """Test that a complete set of shards merges into the full site"""
+        self.assertEqual(merge_shards(self.shard_dirs, self.output), (3, 1))
+        for name in ("index.html", os.path.join("blog", "a.html"), os.path.join("blog", "b.html"), "index.css"):
+            self.assertTrue(os.path.isfile(os.path.join(self.output, name)))
+        self.assertFalse(os.path.exists(os.path.join(self.output, MANIFEST_FILE)))
+    
+    def test_missing_shard(self):
+        """Test that merging without every shard fails"""
+        with self.assertRaisesRegex(ValueError, "missing \\[2\\]"):
+            merge_shards(self.shard_dirs[:1], self.output)
+        self.assertFalse(os.path.exists(self.output))
+    
+    def test_duplicate_page(self):
+        """Test that a page claimed by two shards fails the merge"""
+        page = next(iter(self._manifest(self.shard_dirs[0])["pages"]))
+        self._write(self.shard_dirs[1], page, "<p>again</p>")
+        self._edit_manifest(self.shard_dirs[1], lambda m: m["pages"].update({page: "x"}))
+        with self.assertRaisesRegex(ValueError, "built by both"):
+            merge_shards(self.shard_dirs, self.output)
+    
+    def test_missing_page(self):
+        """Test that a page no shard built fails the merge"""
+        self._edit_manifest(self.shard_dirs[0], lambda m: m["pages"].popitem())
+        with self.assertRaisesRegex(ValueError, "missing"):
+            merge_shards(self.shard_dirs, self.output)
+    
+    def test_failed_page(self):
+        """Test that pages a shard failed to build are reported"""
+        self._edit_manifest(self.shard_dirs[0], lambda m: m["failed"].append("broken.html"))
+        with self.assertRaisesRegex(ValueError, "broken.html"):
+            merge_shards(self.shard_dirs, self.output)
+    
+    def test_modified_page(self):
+        """Test that a page that doesn't match its manifest hash fails the merge"""
+        page = next(iter(self._manifest(self.shard_dirs[0])["pages"]))
+        self._write(self.shard_dirs[0], page, "<p>tampered</p>")
+        with self.assertRaisesRegex(ValueError, "doesn't match"):
+            merge_shards(self.shard_dirs, self.output)
+    
+    def test_conflicting_static_file(self):
+        """Test that shards must agree on files outside the manifests"""
+        self._write(self.shard_dirs[1], "index.css", "body { color: red }")
+        with self.assertRaisesRegex(ValueError, "index.css differs"):
+            merge_shards(self.shard_dirs, self.output)
+    
+    def _manifest(self, shard_dir):
+        with open(os.path.join(shard_dir, MANIFEST_FILE)) as f:
+            return json.load(f)
+
+
+if __name__ == "__main__":
+    unittest.main()
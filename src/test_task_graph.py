@@ -0,0 +1,87 @@
+import unittest
+import sys
+import os
+import time
+import threading
+from io import StringIO
+from contextlib import redirect_stdout, redirect_stderr
+
+# Add the src directory to Python path for relative imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from task_graph import TaskGraph
+
+
+class TestTaskGraph(unittest.TestCase):
+
+    def test_dependencies_run_first(self):
+        """Test that a task only starts after its dependencies finish"""
+        order = []
+        graph = TaskGraph()
+        graph.add("a", lambda: order.append("a"))
+        graph.add("b", lambda: order.append("b"), deps=["a"])
+        graph.add("c", lambda: order.append("c"), deps=["a", "b"])
+        self.assertTrue(graph.run(workers=4))
+        self.assertEqual(order, ["a", "b", "c"])
+        self.assertEqual({result.status for result in graph.results.values()}, {"done"})
+
+    def test_independent_tasks_run_concurrently(self):
+        """Test that tasks without dependencies between them overlap"""
+        barrier = threading.Barrier(2, timeout=5)
+        graph = TaskGraph()
+        graph.add("static", barrier.wait)
+        graph.add("pages", barrier.wait)
+        self.assertTrue(graph.run(workers=2))
+
+    def test_failure_skips_dependents_only(self):
+        """Test that a failed task skips what depends on it and nothing else"""
+        def fail():
+            raise RuntimeError("boom")
+        ran = []
+        graph = TaskGraph()
+        graph.add("pages", fail)
+        graph.add("verify", lambda: ran.append("verify"), deps=["pages"])
+        graph.add("report", lambda: ran.append("report"), deps=["verify"])
+        graph.add("system", lambda: ran.append("system"))
+        with redirect_stdout(StringIO()), redirect_stderr(StringIO()):
+            self.assertFalse(graph.run())
+        self.assertEqual(ran, ["system"])
+        self.assertEqual(graph.results["pages"].status, "failed")
+        self.assertEqual(graph.results["pages"].error, "boom")
+        self.assertEqual(graph.results["verify"].status, "skipped")
+        self.assertEqual(graph.results["report"].status, "skipped")
+
+    def test_invalid_graphs(self):
+        """Test that unknown dependencies and duplicate names are rejected"""
+        graph = TaskGraph()
+        graph.add("a", lambda: None)
+        with self.assertRaises(ValueError):
+            graph.add("a", lambda: None)
+        with self.assertRaises(ValueError):
+            graph.add("b", lambda: None, deps=["missing"])
+
+    def test_critical_path(self):
+        """Test that the critical path follows the dependencies that finished last"""
+        graph = TaskGraph()
+        graph.add("prepare", lambda: None)
+        graph.add("static", lambda: None, deps=["prepare"])
+        graph.add("pages", lambda: time.sleep(0.2), deps=["prepare"])
+        graph.add("verify", lambda: None, deps=["static", "pages"])
+        graph.add("system", lambda: None)
+        graph.run(workers=4)
+        self.assertEqual(graph.critical_path(), ["prepare", "pages", "verify"])
+
+        output = StringIO()
+        with redirect_stdout(output):
+            self.assertEqual(graph.report(), ["prepare", "pages", "verify"])
+        self.assertIn("Critical path: prepare → pages → verify", output.getvalue())
+
+    def test_empty_graph(self):
+        """Test that an empty graph runs and reports nothing"""
+        graph = TaskGraph()
+        self.assertTrue(graph.run())
+        self.assertEqual(graph.critical_path(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import unittest
+import sys
+import os
+import tempfile
+import shutil
+import time
+from io import StringIO
+from unittest import mock
+from contextlib import redirect_stdout
+
+# Add the src directory to Python path for relative imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import thread_render
+from thread_render import gil_enabled, describe_interpreter, generate_pages_threaded, report_speedup
+from generate_pages_recursive import generate_pages_recursive
+from build_context import BuildContext
+from block_cache import BlockCache
+from document_cache import DocumentCache
+from inline_cache import InlineCache
+from page_scheduler import RenderTimes
+
+
+class TestInterpreter(unittest.TestCase):
+
+    def test_gil_detection(self):
+        """Test that GIL detection works on any build"""
+        self.assertIsInstance(gil_enabled(), bool)
+        if not hasattr(sys, "_is_gil_enabled"):
+            self.assertTrue(gil_enabled())
+        self.assertIn("GIL", describe_interpreter())
+
+    def test_report_speedup(self):
+        """Test the effective speedup calculation"""
+        with redirect_stdout(StringIO()):
+            self.assertEqual(report_speedup(3.0, 1.5, 4), 2.0)
+            self.assertEqual(report_speedup(0.0, 0.0, 4), 0.0)
+
+
+class TestGeneratePagesThreaded(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a small site"""
+        self.test_dir = tempfile.mkdtemp()
+        self.content_dir = os.path.join(self.test_dir, "content")
+        self.template_path = os.path.join(self.test_dir, "template.html")
+        self.cache_dir = os.path.join(self.test_dir, "cache")
+        with open(self.template_path, "w") as f:
+            f.write("<html><title>{{ Title }}</title><body>{{ Content }}</body></html>")
+        for i in range(12):
+            path = os.path.join(self.content_dir, f"section{i % 3}", f"page{i}.md")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(f"# Page {i}\n\n" + "- **shared** item with [a link](/home)\n" * (i + 1) + "\nText.\n")
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def _read_tree(self, root):
+        files = {}
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                with open(path) as f:
+                    files[os.path.relpath(path, root)] = f.read()
+        return files
+
+    def test_matches_serial_build_with_shared_caches(self):
+        """Test that threads sharing every cache write the same pages as the serial build"""
+        serial = os.path.join(self.test_dir, "serial")
+        threaded = os.path.join(self.test_dir, "threaded")
+        inline_cache = InlineCache()
+        context = BuildContext(block_cache=BlockCache(self.cache_dir), inline_cache=inline_cache,
+                               document_cache=DocumentCache(self.cache_dir, inline_cache))
+        output = StringIO()
+        with redirect_stdout(output):
+            generate_pages_recursive(self.content_dir, self.template_path, serial, "/site/")
+            self.assertTrue(generate_pages_threaded(self.content_dir, self.template_path, threaded,
+                                                    "/site/", context, threads=4))
+        context.block_cache.close()
+        context.document_cache.close()
+
+        self.assertEqual(len(self._read_tree(serial)), 12)
+        self.assertEqual(self._read_tree(threaded), self._read_tree(serial))
+        self.assertEqual(context.document_cache.misses, 12)
+        self.assertIn("effective speedup", output.getvalue())
+
+    def test_page_logs_are_not_interleaved(self):
+        """Test that each page's messages are printed together"""
+        output = StringIO()
+        with redirect_stdout(output):
+            generate_pages_threaded(self.content_dir, self.template_path,
+                                    os.path.join(self.test_dir, "out"), threads=4)
+        lines = output.getvalue().splitlines()
+        starts = [i for i, line in enumerate(lines) if line.startswith("📄 Generating page from")]
+        self.assertEqual(len(starts), 12)
+        for start in starts:
+            page = lines[start].split(" from ")[1].split(" to ")[0]
+            self.assertIn(page, lines[start + 4])  # "Extracting title from markdown: <page>"
+
+    def test_render_times_are_wall_seconds(self):
+        """Test that render times record wall time, as the other modes do, not thread CPU time"""
+        render_times = RenderTimes(None)
+        context = BuildContext(render_times=render_times)
+        real_generate_page = thread_render.generate_page
+
+        def slow_generate_page(*args, **kwargs):
+            time.sleep(0.05)  # waiting costs wall time but no CPU time
+            return real_generate_page(*args, **kwargs)
+
+        with mock.patch.object(thread_render, "generate_page", slow_generate_page):
+            with redirect_stdout(StringIO()):
+                self.assertTrue(generate_pages_threaded(self.content_dir, self.template_path,
+                                                        os.path.join(self.test_dir, "out"), context=context,
+                                                        threads=4))
+        page = os.path.join(self.content_dir, "section0", "page0.md")
+        self.assertGreaterEqual(render_times.cost(page, 0), 0.05)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import sys
+import copy
+import time
+import sysconfig
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from build_context import BuildContext
+from generate_page import generate_page
+from generate_pages_recursive import PagePlan
+from page_scheduler import lpt_order
+
+
+def gil_enabled():
+    """
+    Returns:
+        bool: True if the GIL is active in this process. Free-threaded builds
+            (3.13t and later) can re-enable it at runtime, e.g. for an
+            extension module that doesn't support running without it.
+    """
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return True if is_gil_enabled is None else is_gil_enabled()
+
+
+def describe_interpreter():
+    """
+    Returns:
+        str: Whether this is a free-threaded build and whether the GIL is on
+    """
+    if not sysconfig.get_config_var("Py_GIL_DISABLED"):
+        return "regular build, GIL enabled"
+    if gil_enabled():
+        return "free-threaded build, GIL re-enabled at runtime"
+    return "free-threaded build, GIL disabled"
+
+
+def generate_pages_threaded(dir_path_content, template_path, dest_dir_path, basepath="/",
+                            context=None, threads=2):
+    """
+    Generate pages on a thread pool, most expensive pages first.
+
+    Threads share the context's caches, which lock themselves, and need no
+    pickling or process start-up. Without the GIL (free-threaded builds)
+    pages render in parallel; with it, threads only overlap file I/O and
+    the build still produces the same site.
+
+    Each thread collects its page's log messages, and the main thread
+    prints them as one block when the page is done, so logs of concurrent
+    pages never interleave. The file index, shard and render times are only
+    updated from the main thread.
+
+    Args:
+        dir_path_content (str): Root directory containing markdown content files
+        template_path (str): Path to the HTML template file
+        dest_dir_path (str): Root directory where HTML files will be generated
+        basepath (str): Base URL path for the site (default: "/")
+        context (BuildContext, optional): Build options and shared caches
+        threads (int): Number of worker threads
+
+    Returns:
+        bool: True if every page was generated
+    """
+    if context is None:
+        context = BuildContext()
+    plan = PagePlan(dir_path_content, template_path, dest_dir_path, basepath, context)
+    scheduled = lpt_order(list(plan), plan.render_times)
+    print(f"🧵 Rendering {len(scheduled)} pages on {threads} threads ({describe_interpreter()})")
+    if gil_enabled():
+        print(f"   ⚠️  With the GIL, threads take turns rendering; --jobs N renders in processes instead")
+
+    generated = 0
+    failed = 0
+    cpu_seconds = 0.0
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads, thread_name_prefix="page") as executor:
+        futures = {executor.submit(_render_job, job, template_path, basepath, context): job
+                   for job in scheduled}
+        for future in as_completed(futures):
+            job = futures[future]
+            messages, seconds, thread_seconds, error = future.result()
+            for message in messages:
+                print(message)
+            cpu_seconds += thread_seconds
+            if error is None:
+                generated += 1
+                print(f"   ✅ Successfully generated: {job.dest}")
+            else:
+                failed += 1
+                print(f"   ❌ Error generating page from {job.source}: {error}")
+            plan.finished(job, seconds, error)
+    wall_seconds = time.perf_counter() - started
+
+    print(f"📊 Total pages generated: {generated}, failed: {failed}")
+    if scheduled:
+        report_speedup(cpu_seconds, wall_seconds, threads)
+    failed += plan.close()
+    return failed == 0
+
+
+def report_speedup(cpu_seconds, wall_seconds, threads):
+    """
+    Print how much page rendering actually overlapped.
+
+    Args:
+        cpu_seconds (float): CPU time the worker threads spent on pages
+        wall_seconds (float): Elapsed time of the whole pool
+        threads (int): Number of worker threads
+
+    Returns:
+        float: Effective speedup, CPU time per second of wall time
+    """
+    speedup = cpu_seconds / wall_seconds if wall_seconds > 0 else 0.0
+    print(f"⚡ Threads: {cpu_seconds:.2f}s of rendering CPU time in {wall_seconds:.2f}s, "
+          f"{speedup:.1f}x effective speedup on {threads} threads")
+    return speedup
+
+
+def _render_job(job, template_path, basepath, context):
+    # Runs on a pool thread: a private log, shared caches. Returns wall
+    # seconds, which render times record as every other mode does, and this
+    # thread's CPU seconds, which only the speedup report uses
+    messages = []
+    page_context = copy.copy(context)
+    page_context.log = messages.append
+    started = time.perf_counter()
+    cpu_started = time.thread_time()
+    error = None
+    try:
+        generate_page(job.source, template_path, job.dest, basepath, page_context, markdown=job.data)
+    except Exception as e:
+        error = str(e)
+    return messages, time.perf_counter() - started, time.thread_time() - cpu_started, error